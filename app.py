@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 from src.pipeline import ExtractionPipeline
+from src.ocr import ImageSource
+from src.utils import get_logger
 
 # Load environment variables
 load_dotenv()
@@ -30,11 +32,60 @@ Extract structured data from installment credit agreement images using:
 # For Railway: Use GOOGLE_APPLICATION_CREDENTIALS env var or credentials file
 credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or "matt-481014-e5ff3d867b2a.json"
 openai_key = os.getenv("OPENAI_API_KEY")
+# Speculative mode starts OpenAI Vision alongside OCR: lower latency, but
+# every extraction pays for a vision call even when OCR alone would do
+speculative = os.getenv("SPECULATIVE_EXTRACTION", "false").lower() == "true"
 
 if not openai_key:
     st.error("⚠️ OPENAI_API_KEY not found in environment variables. Please add it to continue.")
     st.stop()
 
+# Number of extraction results kept in memory, keyed by image content
+RESULT_CACHE_SIZE = 64
+
+
+@st.cache_resource(show_spinner="Connecting to Google Cloud Vision and OpenAI...")
+def get_pipeline(credentials_path: str, openai_key: str, speculative: bool = False) -> ExtractionPipeline:
+    """Create the pipeline once per server process and warm up its connections."""
+    # For Railway: GOOGLE_APPLICATION_CREDENTIALS may be JSON content or file path
+    # VisionOCRClient will handle both cases automatically
+    creds_path = None
+    if credentials_path and Path(credentials_path).exists():
+        # Use local file if it exists
+        creds_path = credentials_path
+    elif os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+        # Railway sets this - may be JSON content or file path
+        # VisionOCRClient will handle it
+        creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    # If creds_path is None, VisionOCRClient will check GOOGLE_APPLICATION_CREDENTIALS env var
+    
+    pipeline = ExtractionPipeline(
+        credentials_path=creds_path,
+        openai_api_key=openai_key,
+        force_openai=True,  # Always use OpenAI
+        speculative=speculative
+    )
+    for backend, status in pipeline.warm_up().items():
+        if status['error']:
+            get_logger().warning(f"{backend} warm-up failed: {status['error']}")
+    return pipeline
+
+
+@st.cache_resource(max_entries=RESULT_CACHE_SIZE, show_spinner=False)
+def extract_cached(image_hash: str, _pipeline: ExtractionPipeline, _image: ImageSource):
+    """Extract an image once; reruns with the same content reuse the result."""
+    return _pipeline.extract_image(_image)
+
+
+# Start connecting on first page load, not on the first click
+try:
+    pipeline = get_pipeline(credentials_path, openai_key, speculative)
+except Exception as e:
+    st.error(f"Pipeline initialization error: {e}")
+    import traceback
+    st.code(traceback.format_exc())
+    st.stop()
+
 st.divider()
 
 # Main content area
@@ -77,55 +128,34 @@ with col2:
     
     # Run extraction
     if extract_button:
-        try:
-            # Initialize pipeline (always use OpenAI, force enabled)
-            # For Railway: GOOGLE_APPLICATION_CREDENTIALS may be JSON content or file path
-            # VisionOCRClient will handle both cases automatically
-            creds_path = None
-            if credentials_path and Path(credentials_path).exists():
-                # Use local file if it exists
-                creds_path = credentials_path
-            elif os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
-                # Railway sets this - may be JSON content or file path
-                # VisionOCRClient will handle it
-                creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-            # If creds_path is None, VisionOCRClient will check GOOGLE_APPLICATION_CREDENTIALS env var
-            
-            pipeline = ExtractionPipeline(
-                credentials_path=creds_path,
-                openai_api_key=openai_key,
-                force_openai=True  # Always use OpenAI
-            )
-            with st.spinner("Extracting data... This may take a few seconds."):
-                try:
-                    # Determine image source
-                    if uploaded_file is not None:
-                        # Extract from uploaded file
-                        image_bytes = uploaded_file.read()
-                        result = pipeline.extract_from_bytes(
-                            image_bytes,
-                            image_format=uploaded_file.type.split('/')[-1].upper()
-                        )
-                    elif test_image_path and Path(test_image_path).exists():
-                        # Extract from test image
-                        result = pipeline.extract(test_image_path)
-                    else:
-                        st.error("No image selected")
-                        result = None
+        with st.spinner("Extracting data... This may take a few seconds."):
+            try:
+                # Determine image source
+                if uploaded_file is not None:
+                    # Extract from uploaded file
+                    image = ImageSource.from_bytes(
+                        uploaded_file.getvalue(),
+                        image_format=uploaded_file.type.split('/')[-1].upper(),
+                        name=uploaded_file.name
+                    )
+                elif test_image_path and Path(test_image_path).exists():
+                    # Extract from test image
+                    image = ImageSource.from_path(test_image_path)
+                else:
+                    st.error("No image selected")
+                    image = None
+                
+                result = extract_cached(image.sha256, pipeline, image) if image else None
+                
+                if result:
+                    st.session_state.extraction_result = result
+                    st.success("✅ Extraction complete!")
+                    st.rerun()
                     
-                    if result:
-                        st.session_state.extraction_result = result
-                        st.success("✅ Extraction complete!")
-                        st.rerun()
-                        
-                except Exception as e:
-                    st.error(f"Extraction error: {e}")
-                    import traceback
-                    st.code(traceback.format_exc())
-        except Exception as e:
-            st.error(f"Pipeline initialization error: {e}")
-            import traceback
-            st.code(traceback.format_exc())
+            except Exception as e:
+                st.error(f"Extraction error: {e}")
+                import traceback
+                st.code(traceback.format_exc())
     
     # Display results
     if 'extraction_result' in st.session_state:
@@ -137,8 +167,8 @@ with col2:
             with col_meta1:
                 st.metric("Processing Time", f"{result.processing_time:.2f}s")
                 st.metric("OpenAI Used", "Yes" if result.used_openai else "No")
-                if result.validation_result and result.validation_result.used_ai:
-                    st.metric("AI Corrections", len(result.validation_result.corrections_applied))
+                if result.validation_result and (result.validation_result.used_ai or result.validation_result.used_rules):
+                    st.metric("Corrections", len(result.validation_result.corrections_applied))
             with col_meta2:
                 if result.confidence_scores:
                     word_level = result.confidence_scores.get('word_level', {})
@@ -157,6 +187,11 @@ with col2:
                 st.markdown("### Corrections Applied")
                 for correction in result.validation_result.corrections_applied:
                     st.success(f"✓ {correction}")
+            
+            # Show stage timings if recorded
+            if result.timings:
+                st.markdown("### Stage Timings")
+                st.json(result.timings.to_dict())
         
         # Results tabs
         tab1, tab2, tab3 = st.tabs(["📋 Fields", "📄 JSON", "🔍 Raw OCR"])
@@ -5,7 +5,12 @@ from typing import Dict, List, Optional, Tuple, Any
 from decimal import Decimal
 
 from src.ocr import OCRResult
-from src.schema import InstallmentAgreementSchema
+from src.schema import InstallmentAgreementSchema, FieldTypes
+from .label_matcher import LabelMatcher
+from .word_table import WordTable
+from .line_index import LineIndex
+from .token_types import TokenType, classify_token, has_types
+from .layout import LayoutClassifier, LayoutFingerprint, LayoutMatch, PageFrame
 
 
 class FieldCandidate:
@@ -156,58 +161,104 @@ class DeterministicExtractor:
         ],
     }
     
-    def __init__(self, ocr_result: OCRResult):
+    # All label patterns compiled once, matched in a single pass per document
+    LABEL_MATCHER = LabelMatcher(FIELD_LABELS)
+    
+    # TokenType bits a single word must have to be a value of a field
+    # (fields not listed accept any non-empty word)
+    FIELD_VALUE_TYPES = {
+        'phone_number': TokenType.PHONE,
+        'seller_phone_number': TokenType.PHONE,
+        'amount_financed': TokenType.CURRENCY,
+        'finance_charge': TokenType.CURRENCY,
+        'total_of_payments': TokenType.CURRENCY,
+        'amount_of_payments': TokenType.CURRENCY,
+        'apr': TokenType.DIGIT,
+        'quantity': TokenType.INTEGER,
+        'number_of_payments': TokenType.INTEGER,
+        'buyer_name': TokenType.ALPHA | TokenType.MULTI_CHAR,
+        'co_buyer_name': TokenType.ALPHA | TokenType.MULTI_CHAR,
+        'seller_name': TokenType.ALPHA | TokenType.MULTI_CHAR,
+        'street_address': TokenType.DIGIT | TokenType.ALPHA,
+        'seller_address': TokenType.DIGIT | TokenType.ALPHA,
+        'seller_city': TokenType.ALPHA | TokenType.MULTI_CHAR,
+        'seller_state': TokenType.ALPHA | TokenType.MULTI_CHAR,
+        'seller_zip_code': TokenType.ZIP,
+    }
+    
+    # Fields extract_all_fields reads when filling in another field: seller
+    # city/state/zip parsed from the seller address (unless a city was found),
+    # and buyer address/phone taken from the legacy fields
+    FIELD_DEPENDENCIES = {
+        'seller_city': ['seller_address'],
+        'seller_state': ['seller_address', 'seller_city'],
+        'seller_zip_code': ['seller_address', 'seller_city'],
+        'buyer_address': ['street_address'],
+        'buyer_phone_number': ['phone_number'],
+    }
+    
+    def __init__(self, ocr_result: OCRResult, layout_classifier: Optional[LayoutClassifier] = None):
         """
         Initialize extractor with OCR result.
         
         Args:
             ocr_result: OCRResult from VisionOCRClient
+            layout_classifier: Optional LayoutClassifier of known form layouts. Fields
+                               of a recognized form are read from the template's
+                               regions; other documents use the proximity search.
         """
         self.ocr_result = ocr_result
+        self.layout_classifier = layout_classifier
         self.full_text = ocr_result.full_text
         self.word_annotations = ocr_result.word_annotations
         self.block_annotations = ocr_result.block_annotations
         
         # Build searchable text with positions
         self._build_text_index()
+        
+        # Label matches for all fields, found on first use
+        self._label_hits = None
+        
+        # Candidates per field, found on first use and shared with callers such
+        # as EnhancedExtractor so each field is searched once per document
+        self._candidates: Dict[str, List[FieldCandidate]] = {}
+        
+        # First match of each label pattern, the layout fingerprint and the
+        # recognized layout, found on first use
+        self._anchor_labels = None
+        self._fingerprint: Optional[LayoutFingerprint] = None
+        self._layout_checked = False
+        self._layout: Optional[LayoutMatch] = None
     
     def _build_text_index(self):
         """Build index of text with positions for proximity search."""
-        self.text_index = []
-        self.char_to_word_map = {}  # Map character positions to word indices
+        # Columnar word table: centers, boxes, confidences and character offsets
+        # aligned with full_text, so label regex matches map straight to words
+        self.text_index = WordTable(self.word_annotations, self.full_text)
         
-        char_pos = 0
-        for i, word in enumerate(self.word_annotations):
-            center_x = sum(v['x'] for v in word['bounding_box']) / len(word['bounding_box'])
-            center_y = sum(v['y'] for v in word['bounding_box']) / len(word['bounding_box'])
-            
-            word_text = word['text']
-            word_len = len(word_text)
-            
-            # Map character positions to this word
-            for char_idx in range(char_pos, char_pos + word_len):
-                self.char_to_word_map[char_idx] = i
-            
-            self.text_index.append({
-                'text': word_text,
-                'index': i,
-                'center': (center_x, center_y),
-                'bounding_box': word['bounding_box'],
-                'confidence': word.get('confidence', 1.0),
-                'char_start': char_pos,
-                'char_end': char_pos + word_len
-            })
-            
-            # Move past word and space
-            char_pos += word_len + 1
+        # Words clustered into reading-order lines, shared by the layout heuristics
+        self.line_index = LineIndex(self.text_index)
     
-    def extract_all_fields(self) -> InstallmentAgreementSchema:
+    def extract_all_fields(self, fields: Optional[List[str]] = None) -> InstallmentAgreementSchema:
         """
         Extract all fields and return as InstallmentAgreementSchema.
         
+        Args:
+            fields: Optional subset of field names to extract. Only these fields
+                    (and the fields they are derived from) are searched; the
+                    other fields of the schema are left as None.
+        
         Returns:
             InstallmentAgreementSchema with extracted values
+        
+        Raises:
+            ValueError: If fields contains a name that is not a schema field
         """
+        requested = FieldTypes.select_fields(fields)
+        searched = set(requested)
+        for field_name in requested:
+            searched.update(self.FIELD_DEPENDENCIES.get(field_name, ()))
+        
         try:
             from src.utils import get_logger, log_extraction_candidates, log_field_extraction
             logger = get_logger()
@@ -220,6 +271,8 @@ class DeterministicExtractor:
         extracted = {}
         
         for field_name in InstallmentAgreementSchema.model_fields.keys():
+            if field_name not in searched:
+                continue
             candidates = self._find_field_candidates(field_name)
             
             # Log candidates in debug mode
@@ -253,7 +306,7 @@ class DeterministicExtractor:
         if logger:
             logger.info("=" * 60)
         
-        return InstallmentAgreementSchema(**extracted)
+        return InstallmentAgreementSchema(**{name: extracted.get(name) for name in requested})
     
     def _parse_address(self, address: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
@@ -307,20 +360,161 @@ class DeterministicExtractor:
         """
         Find candidate values for a field using label proximity.
         
+        The search runs once per field; later calls return the same list, so
+        callers must not modify it.
+        
         Args:
             field_name: Name of the field to extract
         
         Returns:
             List of FieldCandidate objects
         """
+        candidates = self._candidates.get(field_name)
+        if candidates is None:
+            # A recognized layout's plan, else the generic proximity search
+            candidates = self._plan_candidates(field_name) or self._search_field_candidates(field_name)
+            self._candidates[field_name] = candidates
+        return candidates
+    
+    @property
+    def layout(self) -> Optional[LayoutMatch]:
+        """Known form layout recognized in the document, or None."""
+        if not self._layout_checked:
+            self._layout_checked = True
+            if self.layout_classifier is not None and self.layout_classifier.templates:
+                self._layout = self.layout_classifier.classify(self.fingerprint())
+        return self._layout
+    
+    def anchor_labels(self) -> Dict[str, Dict[str, Any]]:
+        """
+        First match of each label pattern found in the document.
+        
+        Returns:
+            Pattern -> {'match_text', 'position', 'start', 'end'}, in the format of
+            the label matches used by the proximity search
+        """
+        if self._anchor_labels is None:
+            self._anchor_labels = {}
+            for pattern, matches in self._get_label_hits().items():
+                for match in matches:
+                    label_pos = self._find_text_position(match.start(), match.end())
+                    if label_pos:
+                        self._anchor_labels[pattern] = {
+                            'match_text': match.group(),
+                            'position': label_pos,
+                            'start': match.start(),
+                            'end': match.end()
+                        }
+                        break
+        return self._anchor_labels
+    
+    def label_spans(self, fields: Optional[List[str]] = None) -> List[Tuple[int, int]]:
+        """
+        Character spans of every label match of some fields in full_text.
+        
+        Args:
+            fields: Field names (None: all fields). The fields they are derived
+                    from (FIELD_DEPENDENCIES) are included.
+        
+        Returns:
+            Sorted (start, end) offsets
+        """
+        requested = set(FieldTypes.select_fields(fields))
+        for field_name in list(requested):
+            requested.update(self.FIELD_DEPENDENCIES.get(field_name, ()))
+        patterns = {
+            pattern for field_name in requested
+            for pattern in self.FIELD_LABELS.get(field_name, [])
+        }
+        return sorted({
+            (match.start(), match.end())
+            for pattern, matches in self._get_label_hits().items() if pattern in patterns
+            for match in matches
+        })
+    
+    def fingerprint(self) -> LayoutFingerprint:
+        """Layout fingerprint: normalized anchor label and text block positions."""
+        if self._fingerprint is not None:
+            return self._fingerprint
+        
+        words = self.text_index
+        block_boxes = []
+        for block in self.block_annotations:
+            xs = [v['x'] for v in block['bounding_box']]
+            ys = [v['y'] for v in block['bounding_box']]
+            if xs:
+                block_boxes.append((min(xs), min(ys), max(xs), max(ys)))
+        
+        if block_boxes:
+            frame = PageFrame.from_boxes(block_boxes)
+        else:
+            frame = PageFrame.from_boxes(
+                (float(words.x0[i]), float(words.y0[i]), float(words.x1[i]), float(words.y1[i]))
+                for i in range(len(words))
+            )
+        
+        anchors = {
+            pattern: frame.normalize(*anchor['position']['center'])
+            for pattern, anchor in self.anchor_labels().items()
+        }
+        blocks = [
+            frame.normalize((x0 + x1) / 2, (y0 + y1) / 2)
+            for x0, y0, x1, y1 in block_boxes
+        ]
+        self._fingerprint = LayoutFingerprint(frame, anchors, blocks)
+        return self._fingerprint
+    
+    def _plan_candidates(self, field_name: str) -> List[FieldCandidate]:
+        """Candidate read from the region the recognized layout's plan gives for a field."""
+        layout = self.layout
+        if layout is None:
+            return []
+        region = layout.template.regions.get(field_name)
+        anchor = self.anchor_labels().get(region.anchor) if region else None
+        if anchor is None:
+            return []
+        
+        frame = self.fingerprint().frame
+        anchor_x, anchor_y = anchor['position']['center']
+        words = self.text_index
+        window = words.window(
+            anchor_x + region.x_min * frame.width, anchor_x + region.x_max * frame.width,
+            anchor_y + region.y_min * frame.height, anchor_y + region.y_max * frame.height
+        )
+        # Leave out the label's own words
+        label_words = set(words.in_char_range(anchor['start'], anchor['end'] - 1))
+        window = [i for i in window if i not in label_words]
+        window.sort(key=self.line_index.reading_order)
+        window = window[:region.max_words]
+        if not window:
+            return []
+        
+        value_text = ' '.join(words.texts[i].strip() for i in window).strip()
+        if not self._is_valid_value(field_name, value_text):
+            return []
+        
+        confidences = [words.confidence_at(i) for i in window]
+        confidences = [c for c in confidences if c is not None]
+        avg_x = sum(float(words.x[i]) for i in window) / len(window)
+        avg_y = sum(float(words.y[i]) for i in window) / len(window)
+        return [FieldCandidate(
+            value=value_text,
+            confidence=sum(confidences) / len(confidences) if confidences else 1.0,
+            distance=0.0,
+            label_match=f"layout:{layout.template.name}",
+            position={'x': avg_x, 'y': avg_y}
+        )]
+    
+    def _search_field_candidates(self, field_name: str) -> List[FieldCandidate]:
+        """Search the document for candidate values of a field."""
         candidates = []
         label_patterns = self.FIELD_LABELS.get(field_name, [])
         
-        # Search for label matches in text
+        # Look up label matches in the shared per-document table
+        label_hits = self._get_label_hits()
         label_matches = []
         for pattern in label_patterns:
-            regex = re.compile(pattern, re.IGNORECASE)
-            for match in regex.finditer(self.full_text):
+            for match in label_hits.get(pattern, ()):
                 # Find the word index for this label
                 label_pos = self._find_text_position(match.start(), match.end())
                 if label_pos:
@@ -369,23 +563,25 @@ class DeterministicExtractor:
         
         return candidates
     
+    def _get_label_hits(self) -> Dict[str, List["re.Match"]]:
+        """Matches of every label pattern in the full text, keyed by pattern."""
+        if self._label_hits is None:
+            matcher = self.LABEL_MATCHER
+            if matcher.field_labels is not self.FIELD_LABELS:
+                # Subclass with its own labels
+                matcher = LabelMatcher(self.FIELD_LABELS)
+            self._label_hits = matcher.find_all(self.full_text)
+        return self._label_hits
+    
     def _find_text_position(self, start_char: int, end_char: int) -> Optional[Dict[str, Any]]:
         """Find the word position in text_index for a character range."""
-        # Use character map to find word index
-        word_idx = self.char_to_word_map.get(start_char)
-        if word_idx is None:
-            # Try to find closest word
-            for idx, item in enumerate(self.text_index):
-                if item['char_start'] <= start_char <= item['char_end']:
-                    word_idx = idx
-                    break
+        word_idx = self.text_index.word_at_char(start_char)
         
-        if word_idx is not None and word_idx < len(self.text_index):
-            item = self.text_index[word_idx]
+        if word_idx is not None:
             return {
-                'center': item['center'],
-                'index': item['index'],
-                'bounding_box': item['bounding_box']
+                'center': self.text_index.center(word_idx),
+                'index': word_idx,
+                'bounding_box': self.text_index.bounding_box(word_idx)
             }
         return None
     
@@ -423,44 +619,32 @@ class DeterministicExtractor:
         search_radius_x = 500  # pixels
         search_radius_y = 200  # pixels
         
-        for i, item in enumerate(self.text_index):
-            item_x, item_y = item['center']
-            
-            # Calculate distance from label
-            dx = item_x - label_x
-            dy = item_y - label_y
-            
-            # For seller fields with labels like "Seller's Name", also look before the label
-            if look_before_label:
-                # Look above/left of label (values come before labels in this format)
-                if dx > 50 or dx < -search_radius_x:
-                    continue
-                if abs(dy) > search_radius_y:
-                    continue
-                # Prefer items that are above the label (negative dy) or on same line
-                if dy > 100:  # Too far below
-                    continue
-            else:
-                # Only consider items to the right and below (or slightly above)
-                if dx < -50 or dx > search_radius_x:
-                    continue
-                if abs(dy) > search_radius_y:
-                    continue
-            
-            # Calculate distance
-            distance = (dx**2 + dy**2)**0.5
-            
-            # Check if this looks like a value for this field
-            value_text = item['text']
-            if self._is_valid_value(field_name, value_text):
-                confidence = item.get('confidence', 1.0)
-                candidates.append(FieldCandidate(
-                    value=value_text,
-                    confidence=confidence,
-                    distance=distance,
-                    label_match=label_text,
-                    position={'x': item_x, 'y': item_y}
-                ))
+        words = self.text_index
+        if look_before_label:
+            # Look above/left of label (values come before labels in this format),
+            # preferring items above the label (negative dy) or on the same line
+            window = words.window(
+                label_x - search_radius_x, label_x + 50,
+                label_y - search_radius_y, label_y + 100
+            )
+        else:
+            # Only consider items to the right and below (or slightly above)
+            window = words.window(
+                label_x - 50, label_x + search_radius_x,
+                label_y - search_radius_y, label_y + search_radius_y
+            )
+        
+        # Keep words that look like a value for this field (types classified at index build)
+        window = words.of_type(window, self._value_types(field_name))
+        for i, distance in zip(window, words.distances(window, label_x, label_y)):
+            item_x, item_y = words.center(i)
+            candidates.append(FieldCandidate(
+                value=words.texts[i],
+                confidence=words.confidence_at(i),
+                distance=distance,
+                label_match=label_text,
+                position={'x': item_x, 'y': item_y}
+            ))
         
         # Also try to extract multi-word values (e.g., full names, addresses)
         if field_name in ['buyer_name', 'co_buyer_name', 'buyer_address', 'co_buyer_address', 'street_address', 'seller_name', 'seller_address', 'items_purchased', 'make_or_model']:
@@ -489,34 +673,29 @@ class DeterministicExtractor:
         label_center = label_position['center']
         label_x, label_y = label_center
         
+        # For seller_address, also look below the label (address can be below in some formats)
+        max_dy_below = 50 if field_name == 'seller_address' else 100
+        
         # Find words that are spatially near the label (above, same line, or below)
-        nearby_words = []
-        for i, item in enumerate(self.text_index):
-            item_x, item_y = item['center']
-            
-            # Calculate distance from label
-            dx = item_x - label_x
-            dy = item_y - label_y
-            
-            # For seller_address, also look below the label (address can be below in some formats)
-            max_dy_below = 50 if field_name == 'seller_address' else 100
-            
-            # Look for words above, on same line, or slightly below the label
-            if dy > max_dy_below:  # Too far below the label
-                continue
-            if abs(dx) > 500:  # Too far horizontally
-                continue
-            # Prefer words that are above the label (negative dy) or on same line
-            if dy < -300:  # Too far above (probably header text)
-                continue
-            
-            nearby_words.append((i, item, dx, dy))
+        # Words within 500px horizontally, up to 300px above (higher is probably
+        # header text) and slightly below
+        window = self.text_index.window(
+            label_x - 500, label_x + 500,
+            label_y - 300, label_y + max_dy_below
+        )
+        dxs, dys = self.text_index.deltas(window, label_x, label_y)
+        nearby_words = [
+            (i, self.text_index[i], dx, dy)
+            for i, dx, dy in zip(window, dxs, dys)
+        ]
         
         if not nearby_words:
             return candidates
         
-        # Sort by y position (top to bottom, so values above label come first), then x (left to right)
-        nearby_words.sort(key=lambda x: (x[3], x[2]))
+        # Reading order: line by line (top to bottom, so values above label come first),
+        # then left to right
+        nearby_words.sort(key=lambda x: self.line_index.reading_order(x[0]))
+        label_line = self.line_index.line_of[label_position['index']]
         
         # Extract based on field type
         if field_name == 'seller_name':
@@ -525,26 +704,21 @@ class DeterministicExtractor:
             name_words = []
             label_word_idx = label_position['index']
             
-            # Find words on the same line as label position (y coordinate)
+            # Find words on the same line as the label, and on the line above
             # In IMG_1807 format, seller name is on same line as label position, to the left
+            # (nearby_words is in reading order, so both lists are left to right)
             same_line_words = []
             line_above_words = []
             
             for i, item, dx, dy in nearby_words:
-                item_y = item['center'][1]
+                line = self.line_index.line_of[i]
                 word_text = item['text'].strip()
                 
-                # Words on same line (within 5 pixels of label_y)
-                if abs(item_y - label_y) < 5:
+                if line == label_line:
                     same_line_words.append((i, item, dx, dy, word_text))
-                # Words on line above (10-30 pixels above label_y)
-                elif -30 < (item_y - label_y) < -10:
+                elif line == label_line - 1:
                     line_above_words.append((i, item, dx, dy, word_text))
             
-            # Sort by x position (left to right)
-            same_line_words.sort(key=lambda x: x[1]['center'][0])
-            line_above_words.sort(key=lambda x: x[1]['center'][0])
-            
             # Prioritize same line (seller name is often on same line as label in IMG_1807 format)
             # Try same line first
             if same_line_words:
@@ -558,7 +732,7 @@ class DeterministicExtractor:
                     if word_text.upper() in ['BUYER', 'DAVID', 'POWERS', 'AGREEMENT']:
                         break
                     # Stop if we hit phone number
-                    if re.match(r'^\d{3}-\d{3}-\d{4}', word_text):
+                    if self._word_has(i, TokenType.PHONE_FORMAT):
                         break
                     name_words.append((item, word_text))
                     if len(name_words) >= 5:
@@ -582,7 +756,7 @@ class DeterministicExtractor:
                     if word_text.upper() in ['BUYER', 'DAVID', 'POWERS', 'AGREEMENT']:
                         break
                     # Stop if we hit phone number
-                    if re.match(r'^\d{3}-\d{3}-\d{4}', word_text):
+                    if self._word_has(i, TokenType.PHONE_FORMAT):
                         break
                     name_words.append((item, word_text))
                     if len(name_words) >= 5:
@@ -611,46 +785,36 @@ class DeterministicExtractor:
         elif field_name == 'seller_address':
             # Seller address is typically above "Seller's Address"
             # Similar to seller_name, look for words on same line or line above
+            # (nearby_words is in reading order, so both lists are left to right)
             same_line_words = []
             line_above_words = []
             
             for i, item, dx, dy in nearby_words:
-                item_y = item['center'][1]
+                line = self.line_index.line_of[i]
                 word_text = item['text'].strip()
                 
-                # Words on same line (within 5 pixels of label_y)
-                if abs(item_y - label_y) < 5:
+                if line == label_line:
                     same_line_words.append((i, item, dx, dy, word_text))
-                # Words on line above (10-40 pixels above label_y)
-                elif -40 < (item_y - label_y) < -10:
-                    line_above_words.append((i, item, dx, dy, word_text))
-                # Words on line below (10-50 pixels below label_y) - for seller_address
-                elif field_name == 'seller_address' and 10 < (item_y - label_y) < 50:
+                # Line above, and the line below (address can be below in some formats)
+                elif line in (label_line - 1, label_line + 1):
                     line_above_words.append((i, item, dx, dy, word_text))  # Use same list, will process together
             
-            # Sort by x position (left to right)
-            same_line_words.sort(key=lambda x: x[1]['center'][0])
-            line_above_words.sort(key=lambda x: x[1]['center'][0])
-            
             address_words = []
             
             # Try line above/below first (address is usually near the label)
             # Look for a line that starts with a number (street address)
             if line_above_words:
-                # Group words by line (y coordinate)
+                # Group words by line (already in reading order)
                 words_by_line = {}
                 for i, item, dx, dy, word_text in line_above_words:
-                    y_key = round(item['center'][1] / 5) * 5
-                    if y_key not in words_by_line:
-                        words_by_line[y_key] = []
-                    words_by_line[y_key].append((i, item, dx, dy, word_text))
+                    words_by_line.setdefault(self.line_index.line_of[i], []).append(
+                        (i, item, dx, dy, word_text)
+                    )
                 
                 # Find the line that starts with a number (street address)
-                for line_y, words_on_line in sorted(words_by_line.items()):
-                    words_on_line.sort(key=lambda x: x[1]['center'][0])  # Sort by x
+                for line_id, words_on_line in words_by_line.items():
                     # Check if this line starts with a number
-                    first_word = words_on_line[0][4] if words_on_line else ""
-                    if re.match(r'^\d', first_word):
+                    if words_on_line and self._word_has(words_on_line[0][0], TokenType.LEADING_DIGIT):
                         # This is likely the address line
                         for i, item, dx, dy, word_text in words_on_line:
                             if not word_text or word_text in [':', ',', '(', ')', '.']:
@@ -662,7 +826,7 @@ class DeterministicExtractor:
                             if word_text.upper() in ['BUYER', 'DAVID', 'POWERS']:
                                 break
                             # Stop if we hit phone number
-                            if re.match(r'^\d{3}-\d{3}-\d{4}', word_text):
+                            if self._word_has(i, TokenType.PHONE_FORMAT):
                                 break
                             address_words.append((item, word_text))
                             if len(address_words) >= 10:  # Addresses can be longer
@@ -682,7 +846,7 @@ class DeterministicExtractor:
                         break
                     # Look for address parts
                     is_address_part = (
-                        re.match(r'^\d', word_text) or 
+                        self._word_has(i, TokenType.LEADING_DIGIT) or 
                         any(indicator in word_text.upper() for indicator in ['AVE', 'AVENUE', 'ST', 'STREET', 'ROAD', 'RD', 'BLVD', 'BOULEVARD', 'LANE', 'LN', 'FARRAGUT', 'BRISTOL'])
                     )
                     if is_address_part:
@@ -722,22 +886,17 @@ class DeterministicExtractor:
         candidates = []
         
         # Find words that come after the "Seller:" label in the text
-        nearby_words = []
-        for item in self.text_index:
-            # Only consider words that start after the label ends
-            if item['char_start'] >= label_end:
-                # But limit to words within reasonable distance (first 600 chars after label for phone)
-                # Phone numbers might be further away
-                max_chars = 600 if field_name == 'seller_phone_number' else 500
-                if item['char_start'] <= label_end + max_chars:
-                    nearby_words.append(item)
+        # Only consider words that start after the label ends, within a reasonable
+        # distance (first 600 chars after label for phone, phone numbers might be further away)
+        max_chars = 600 if field_name == 'seller_phone_number' else 500
+        nearby_words = [
+            self.text_index[i]
+            for i in self.text_index.in_char_range(label_end, label_end + max_chars)
+        ]
         
         if not nearby_words:
             return candidates
         
-        # Sort by character position (order in text)
-        nearby_words.sort(key=lambda x: x['char_start'])
-        
         # Extract based on field type
         if field_name == 'seller_name':
             # Seller name is typically the first few words after "Seller:"
@@ -842,27 +1001,25 @@ class DeterministicExtractor:
         
         # Find words after the label (by index and position)
         nearby_words = []
-        for i, item in enumerate(self.text_index):
-            if i <= label_idx:
-                continue
-            
-            item_x, item_y = item['center']
-            dx = item_x - label_x
-            dy = item_y - label_y
-            
+        window = [
+            i for i in self.text_index.window(label_x - 50, y_min=label_y - 20, y_max=label_y + 150)
+            if i > label_idx
+        ]
+        dxs, dys = self.text_index.deltas(window, label_x, label_y)
+        for i, dx, dy in zip(window, dxs, dys):
             # Look for words on same line (small dy) or next lines (small positive dy)
             # Also consider words slightly above (for wrapped text)
             # For buyer/co-buyer/seller names, look more to the right (they're often in a column)
             if field_name in ['buyer_name', 'co_buyer_name', 'buyer_address', 'co_buyer_address', 'seller_name']:
                 # Names are often on the next line, slightly to the right
                 if dx > 50 and 0 <= dy <= 80:  # Next line, to the right
-                    nearby_words.append((i, item, dx, dy))
+                    nearby_words.append((i, self.text_index[i], dx, dy))
             else:
                 if dx > -50 and -20 <= dy <= 150:  # Right of label, same or next few lines
-                    nearby_words.append((i, item, dx, dy))
+                    nearby_words.append((i, self.text_index[i], dx, dy))
         
-        # Sort by y position first (top to bottom), then x (left to right)
-        nearby_words.sort(key=lambda x: (x[3], x[2]))
+        # Reading order: line by line (top to bottom), then left to right
+        nearby_words.sort(key=lambda x: self.line_index.reading_order(x[0]))
         
         # Try to extract value: words after label until we hit another label or section
         value_words = []
@@ -932,51 +1089,18 @@ class DeterministicExtractor:
         ]
         return any(indicator in text_upper for indicator in label_indicators) and ':' in text
     
+    def _value_types(self, field_name: str) -> int:
+        """TokenType bits a word needs to be a value of a field."""
+        return int(self.FIELD_VALUE_TYPES.get(field_name, TokenType.NONEMPTY))
+    
+    def _word_has(self, index: int, types: int) -> bool:
+        """Check whether an OCR word was classified with all the given TokenType bits."""
+        return has_types(int(self.text_index.token_types[index]), types)
+    
     def _is_valid_value(self, field_name: str, value_text: str) -> bool:
         """Check if a value text looks valid for a given field."""
-        value_text = value_text.strip()
-        
-        if not value_text or len(value_text) == 0:
-            return False
-        
-        # Field-specific validation
-        if field_name in ['phone_number', 'seller_phone_number']:
-            # Look for phone number patterns
-            digits = re.sub(r'\D', '', value_text)
-            return 10 <= len(digits) <= 11
-        
-        elif field_name in ['amount_financed', 'finance_charge', 'total_of_payments', 'amount_of_payments']:
-            # Look for currency patterns - must have digits
-            cleaned = value_text.replace('$', '').replace(',', '').strip()
-            return bool(re.search(r'^\d+\.?\d*$', cleaned))
-        
-        elif field_name == 'apr':
-            # Look for percentage patterns
-            return bool(re.search(r'\d+\.?\d*%?', value_text))
-        
-        elif field_name in ['quantity', 'number_of_payments']:
-            # Look for integer patterns
-            return bool(re.match(r'^\d+$', value_text))
-        
-        elif field_name in ['buyer_name', 'co_buyer_name', 'seller_name']:
-            # Names should have letters and possibly spaces/hyphens
-            return bool(re.search(r'[A-Za-z]', value_text)) and len(value_text) > 1
-        
-        elif field_name in ['street_address', 'seller_address']:
-            # Addresses should have numbers and letters
-            return bool(re.search(r'\d', value_text)) and bool(re.search(r'[A-Za-z]', value_text))
-        
-        elif field_name in ['seller_city', 'seller_state']:
-            # City and state should have letters
-            return bool(re.search(r'[A-Za-z]', value_text)) and len(value_text) > 1
-        
-        elif field_name == 'seller_zip_code':
-            # ZIP code should be digits (5 or 9 digits)
-            digits = re.sub(r'\D', '', value_text)
-            return 5 <= len(digits) <= 9
-        
-        # For other fields, accept any non-empty text
-        return len(value_text) > 0
+        types, _, _ = classify_token(value_text)
+        return has_types(types, self._value_types(field_name))
     
     def _resolve_candidates(
         self,
@@ -993,20 +1117,10 @@ class DeterministicExtractor:
         Returns:
             Best candidate value or None
         """
-        if not candidates:
-            return None
-        
-        # For fields that need multi-word extraction, prefer candidates with more words
-        if field_name in ['buyer_name', 'co_buyer_name', 'street_address', 'seller_name', 'seller_address', 'items_purchased', 'make_or_model']:
-            # Prefer longer values (likely more complete)
-            candidates.sort(key=lambda c: (-len(c.value.split()), c.distance, -c.confidence))
-        else:
-            # For single-value fields, prefer closest and highest confidence
-            candidates.sort(key=lambda c: (c.distance, -c.confidence))
+        best_candidate = self._best_candidate(field_name, candidates)
         
         # Return the best candidate's value
-        if candidates:
-            best_candidate = candidates[0]
+        if best_candidate:
             # Clean up the value before returning
             value = best_candidate.value.strip()
             # Remove trailing punctuation that might be OCR artifacts
@@ -1015,6 +1129,36 @@ class DeterministicExtractor:
         
         return None
     
+    def _best_candidate(
+        self,
+        field_name: str,
+        candidates: List[FieldCandidate]
+    ) -> Optional[FieldCandidate]:
+        """Candidate whose value _resolve_candidates returns, or None if there are none."""
+        if not candidates:
+            return None
+        
+        # For fields that need multi-word extraction, prefer candidates with more words
+        if field_name in ['buyer_name', 'co_buyer_name', 'street_address', 'seller_name', 'seller_address', 'items_purchased', 'make_or_model']:
+            # Prefer longer values (likely more complete)
+            return min(candidates, key=lambda c: (-len(c.value.split()), c.distance, -c.confidence))
+        # For single-value fields, prefer closest and highest confidence
+        return min(candidates, key=lambda c: (c.distance, -c.confidence))
+    
+    def field_confidence(self, field_name: str) -> Optional[float]:
+        """
+        OCR confidence of the value extracted for a field.
+        
+        Args:
+            field_name: Name of the field
+        
+        Returns:
+            Confidence of the chosen candidate, or None if the field has no
+            candidates (not found, or derived from another field)
+        """
+        best_candidate = self._best_candidate(field_name, self._find_field_candidates(field_name))
+        return best_candidate.confidence if best_candidate else None
+    
     def extract_field(self, field_name: str) -> Optional[str]:
         """
         Extract a single field.
@@ -1,20 +1,38 @@
 """Enhanced extractor that combines deterministic extraction with OpenAI when needed."""
 
+import asyncio
+import operator
+from decimal import Decimal
 from typing import Optional, Dict, List
 from src.ocr import OCRResult
 from src.extractors import DeterministicExtractor
+from src.extractors.layout import LayoutClassifier
 from src.processors import OpenAIProcessor
-from src.schema import InstallmentAgreementSchema
+from src.schema import InstallmentAgreementSchema, FieldTypes
+from src.utils.metrics import timed
 
 
 class EnhancedExtractor:
     """Enhanced extractor with OpenAI fallback for low-confidence extractions."""
     
+    # Gap filling: fields whose chosen OCR candidate is below this confidence are re-asked
+    GAP_CONFIDENCE_THRESHOLD = 0.80
+    # Legacy fields, filled from buyer_address and buyer_phone_number
+    LEGACY_FIELDS = ('street_address', 'phone_number')
+    # Truth-in-Lending identities: (total, combine, parts, relative tolerance).
+    # Payment schedules may round the last payment, so the product gets more slack.
+    CONSISTENCY_CHECKS = [
+        ('total_of_payments', operator.add, ('amount_financed', 'finance_charge'), Decimal('0.001')),
+        ('total_of_payments', operator.mul, ('amount_of_payments', 'number_of_payments'), Decimal('0.01')),
+    ]
+    
     def __init__(
         self,
         ocr_result: OCRResult,
         openai_processor: Optional[OpenAIProcessor] = None,
-        force_openai: bool = False
+        force_openai: bool = False,
+        layout_classifier: Optional[LayoutClassifier] = None,
+        gap_filling: bool = False
     ):
         """
         Initialize enhanced extractor.
@@ -23,40 +41,248 @@ class EnhancedExtractor:
             ocr_result: OCR result from VisionOCRClient
             openai_processor: Optional OpenAI processor. If None, OpenAI won't be used.
             force_openai: If True, always use OpenAI regardless of confidence
+            layout_classifier: Optional LayoutClassifier of known form layouts. OpenAI
+                               is skipped for forms whose template has skip_llm set
+                               (unless force_openai is set).
+            gap_filling: If True, OpenAI is asked only for the missing, low-confidence
+                         or inconsistent fields (see gap_fields) instead of all of them
         """
         self.ocr_result = ocr_result
         self.openai_processor = openai_processor
         self.force_openai = force_openai
+        self.gap_filling = gap_filling
+        # Fields sent to OpenAI by the last gap-filling request
+        self.filled_gaps: List[str] = []
         
-        # Create deterministic extractor
-        self.deterministic_extractor = DeterministicExtractor(ocr_result)
+        # Create deterministic extractor (builds the word index)
+        with timed("deterministic"):
+            self.deterministic_extractor = DeterministicExtractor(ocr_result, layout_classifier)
     
-    def extract_all_fields(self) -> InstallmentAgreementSchema:
+    def extract_all_fields(self, fields: Optional[List[str]] = None) -> InstallmentAgreementSchema:
         """
         Extract all fields using deterministic extraction, with OpenAI fallback if needed.
         
+        Args:
+            fields: Optional subset of field names to extract (see
+                    DeterministicExtractor.extract_all_fields). OpenAI is only
+                    asked for these fields.
+        
         Returns:
             InstallmentAgreementSchema with extracted values
         """
-        try:
-            from src.utils import get_logger, log_openai_usage, log_field_extraction
-            logger = get_logger()
-        except ImportError:
-            logger = None
+        logger = self._get_logger()
         
         # Step 1: Try deterministic extraction
-        initial_schema = self.deterministic_extractor.extract_all_fields()
+        with timed("deterministic"):
+            initial_schema = self.deterministic_extractor.extract_all_fields(fields)
         
         # Step 2: Check if OpenAI should be used
+        should_use_openai = self._decide_openai(initial_schema, logger, fields)
+        
+        # Step 3: Use OpenAI if needed
+        if should_use_openai and self.openai_processor:
+            try:
+                if self.gap_filling:
+                    return self._fill_gaps(initial_schema, logger, fields)
+                
+                # Candidates found by extract_all_fields, reused as context
+                candidate_values = self._collect_candidate_values(fields)
+                
+                # Improve extraction with OpenAI
+                improved_schema = self.openai_processor.improve_extraction(
+                    ocr_result=self.ocr_result,
+                    initial_schema=initial_schema,
+                    candidate_values=candidate_values,
+                    fields=fields,
+                    extractor=self.deterministic_extractor
+                )
+                
+                self._log_improvements(initial_schema, improved_schema, logger)
+                return improved_schema
+            except Exception as e:
+                # If OpenAI fails, fall back to deterministic extraction
+                if logger:
+                    logger.warning(f"OpenAI processing failed: {e}, falling back to deterministic extraction")
+                else:
+                    print(f"Warning: OpenAI processing failed: {e}")
+                return initial_schema
+        
+        return initial_schema
+    
+    async def extract_all_fields_async(self, fields: Optional[List[str]] = None) -> InstallmentAgreementSchema:
+        """
+        Async variant of extract_all_fields.
+        
+        The CPU-bound rule extraction runs in a worker thread so it does not block
+        the event loop, and the OpenAI call uses the async client.
+        
+        Args:
+            fields: Optional subset of field names to extract
+        
+        Returns:
+            InstallmentAgreementSchema with extracted values
+        """
+        logger = self._get_logger()
+        
+        with timed("deterministic"):
+            initial_schema = await asyncio.to_thread(self.deterministic_extractor.extract_all_fields, fields)
+        
+        should_use_openai = self._decide_openai(initial_schema, logger, fields)
+        
+        if should_use_openai and self.openai_processor:
+            try:
+                if self.gap_filling:
+                    return await self._fill_gaps_async(initial_schema, logger, fields)
+                
+                candidate_values = await asyncio.to_thread(self._collect_candidate_values, fields)
+                
+                improved_schema = await self.openai_processor.improve_extraction_async(
+                    ocr_result=self.ocr_result,
+                    initial_schema=initial_schema,
+                    candidate_values=candidate_values,
+                    fields=fields,
+                    extractor=self.deterministic_extractor
+                )
+                
+                self._log_improvements(initial_schema, improved_schema, logger)
+                return improved_schema
+            except Exception as e:
+                if logger:
+                    logger.warning(f"OpenAI processing failed: {e}, falling back to deterministic extraction")
+                else:
+                    print(f"Warning: OpenAI processing failed: {e}")
+                return initial_schema
+        
+        return initial_schema
+    
+    def gap_fields(
+        self,
+        schema: InstallmentAgreementSchema,
+        fields: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Fields of a deterministic extraction that still need OpenAI.
+        
+        A field is a gap if it is missing, if the OCR confidence of its value is
+        below GAP_CONFIDENCE_THRESHOLD, or if it is part of a Truth-in-Lending
+        identity (e.g. total_of_payments = amount_financed + finance_charge)
+        that its values do not satisfy.
+        
+        Args:
+            schema: Result of the deterministic extraction
+            fields: Optional subset of field names that were extracted
+        
+        Returns:
+            Field names in schema order (empty if the extraction is complete)
+        """
+        requested = FieldTypes.select_fields(fields)
+        if fields is None:
+            requested = [name for name in requested if name not in self.LEGACY_FIELDS]
+        
+        gaps = set()
+        for field_name in requested:
+            if getattr(schema, field_name) is None:
+                gaps.add(field_name)
+                continue
+            confidence = self.deterministic_extractor.field_confidence(field_name)
+            if confidence is not None and confidence < self.GAP_CONFIDENCE_THRESHOLD:
+                gaps.add(field_name)
+        
+        for total_field, combine, part_fields, tolerance in self.CONSISTENCY_CHECKS:
+            names = (total_field,) + part_fields
+            if not set(names) <= set(requested):
+                continue
+            values = [getattr(schema, name) for name in names]
+            if any(value is None for value in values):
+                continue
+            total, first, second = (Decimal(value) for value in values)
+            if abs(total - combine(first, second)) > tolerance * max(abs(total), 1):
+                gaps.update(names)
+        
+        return [name for name in requested if name in gaps]
+    
+    def _fill_gaps(
+        self,
+        initial_schema: InstallmentAgreementSchema,
+        logger,
+        fields: Optional[List[str]] = None
+    ) -> InstallmentAgreementSchema:
+        """Ask OpenAI for the gap fields only and merge them into the initial schema."""
+        gaps = self.gap_fields(initial_schema, fields)
+        self.filled_gaps = gaps
+        if logger:
+            logger.info(f"Gap filling: {len(gaps)} field(s) sent to OpenAI: {', '.join(gaps) or 'none'}")
+        if not gaps:
+            return initial_schema
+        
+        improved_schema = self.openai_processor.fill_gaps(
+            ocr_result=self.ocr_result,
+            initial_schema=initial_schema,
+            fields=gaps,
+            candidate_values=self._collect_candidate_values(gaps),
+            extractor=self.deterministic_extractor
+        )
+        self._log_improvements(initial_schema, improved_schema, logger)
+        return improved_schema
+    
+    async def _fill_gaps_async(
+        self,
+        initial_schema: InstallmentAgreementSchema,
+        logger,
+        fields: Optional[List[str]] = None
+    ) -> InstallmentAgreementSchema:
+        """Async variant of _fill_gaps; the candidate lookups run in a worker thread."""
+        gaps = await asyncio.to_thread(self.gap_fields, initial_schema, fields)
+        self.filled_gaps = gaps
+        if logger:
+            logger.info(f"Gap filling: {len(gaps)} field(s) sent to OpenAI: {', '.join(gaps) or 'none'}")
+        if not gaps:
+            return initial_schema
+        
+        improved_schema = await self.openai_processor.fill_gaps_async(
+            ocr_result=self.ocr_result,
+            initial_schema=initial_schema,
+            fields=gaps,
+            candidate_values=await asyncio.to_thread(self._collect_candidate_values, gaps),
+            extractor=self.deterministic_extractor
+        )
+        self._log_improvements(initial_schema, improved_schema, logger)
+        return improved_schema
+    
+    def _get_logger(self):
+        """Get the pipeline logger if logging utilities are available."""
+        try:
+            from src.utils import get_logger
+            return get_logger()
+        except ImportError:
+            return None
+    
+    def _decide_openai(
+        self,
+        initial_schema: InstallmentAgreementSchema,
+        logger,
+        fields: Optional[List[str]] = None
+    ) -> bool:
+        """Decide whether OpenAI enhancement is needed and log the decision."""
         should_use_openai = False
         reason = None
         
+        layout = self.deterministic_extractor.layout
+        
         if self.force_openai:
             should_use_openai = True
             reason = "Force OpenAI enabled"
+        elif layout is not None and layout.template.skip_llm:
+            reason = f"Known layout '{layout.template.name}' (score {layout.score:.2f}) - extraction plan used without OpenAI"
+        elif self.openai_processor and self.gap_filling:
+            should_use_openai = True
+            reason = "Gap filling - OpenAI is asked only for missing, low-confidence or inconsistent fields"
         elif self.openai_processor:
             # Check if critical seller fields are missing - use OpenAI to extract them
-            seller_fields_missing = (
+            seller_requested = any(
+                name.startswith('seller_') for name in FieldTypes.select_fields(fields)
+            )
+            seller_fields_missing = seller_requested and (
                 not initial_schema.seller_name and
                 not initial_schema.seller_address and
                 not initial_schema.seller_phone_number
@@ -94,51 +320,43 @@ class EnhancedExtractor:
         
         # Log OpenAI usage decision
         if logger:
+            from src.utils.logger import log_openai_usage
             log_openai_usage(logger, should_use_openai, reason)
         
-        # Step 3: Use OpenAI if needed
-        if should_use_openai and self.openai_processor:
-            try:
-                # Collect candidate values for context
-                candidate_values = self._collect_candidate_values()
-                
-                # Improve extraction with OpenAI
-                improved_schema = self.openai_processor.improve_extraction(
-                    ocr_result=self.ocr_result,
-                    initial_schema=initial_schema,
-                    candidate_values=candidate_values
-                )
-                
-                # Log improved fields
-                if logger:
-                    logger.info("=" * 60)
-                    logger.info("OPENAI ENHANCED EXTRACTION")
-                    logger.info("=" * 60)
-                    for field_name in improved_schema.model_fields.keys():
-                        initial_value = getattr(initial_schema, field_name)
-                        improved_value = getattr(improved_schema, field_name)
-                        if initial_value != improved_value:
-                            logger.info(f"  ↻ {field_name:25s}: {initial_value} → {improved_value}")
-                        else:
-                            log_field_extraction(logger, field_name, improved_value, source="openai")
-                    logger.info("=" * 60)
-                
-                return improved_schema
-            except Exception as e:
-                # If OpenAI fails, fall back to deterministic extraction
-                if logger:
-                    logger.warning(f"OpenAI processing failed: {e}, falling back to deterministic extraction")
-                else:
-                    print(f"Warning: OpenAI processing failed: {e}")
-                return initial_schema
-        
-        return initial_schema
+        return should_use_openai
     
-    def _collect_candidate_values(self) -> Dict[str, List[str]]:
-        """Collect candidate values for all fields to provide context to OpenAI."""
+    def _log_improvements(
+        self,
+        initial_schema: InstallmentAgreementSchema,
+        improved_schema: InstallmentAgreementSchema,
+        logger
+    ) -> None:
+        """Log which fields OpenAI changed."""
+        if not logger:
+            return
+        from src.utils.logger import log_field_extraction
+        logger.info("=" * 60)
+        logger.info("OPENAI ENHANCED EXTRACTION")
+        logger.info("=" * 60)
+        for field_name in InstallmentAgreementSchema.model_fields.keys():
+            initial_value = getattr(initial_schema, field_name)
+            improved_value = getattr(improved_schema, field_name)
+            if initial_value != improved_value:
+                logger.info(f"  ↻ {field_name:25s}: {initial_value} → {improved_value}")
+            else:
+                log_field_extraction(logger, field_name, improved_value, source="openai")
+        logger.info("=" * 60)
+    
+    def _collect_candidate_values(self, fields: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        Collect candidate values for all (or the requested) fields to provide context to OpenAI.
+        
+        Reads the candidates the deterministic extractor already found for each
+        field instead of searching the document again.
+        """
         candidate_values = {}
         
-        for field_name in InstallmentAgreementSchema.model_fields.keys():
+        for field_name in FieldTypes.select_fields(fields):
             candidates = self.deterministic_extractor._find_field_candidates(field_name)
             # Get top 5 candidate values
             top_candidates = sorted(
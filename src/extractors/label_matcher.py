@@ -0,0 +1,120 @@
+"""Combined matcher finding every field label in a document in one pass."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+class LabelMatcher:
+    """
+    Find matches of all field label patterns with a single scan of the text.
+    
+    Every distinct pattern is compiled once. Patterns are indexed by their
+    leading literal (e.g. "seller" for ``\\bseller\\s*:``) and one combined
+    regex of those literals locates the positions where any label can start.
+    Only the patterns sharing that literal are tried there, so the text is
+    scanned once instead of once per pattern per field.
+    
+    The result for each pattern is identical to ``re.finditer(pattern, text,
+    re.IGNORECASE)``: leftmost, non-overlapping matches.
+    """
+    
+    # Characters of a leading literal used to look up candidate patterns
+    KEY_LENGTH = 2
+    
+    def __init__(self, field_labels: Dict[str, List[str]]):
+        """
+        Compile the label patterns.
+        
+        Args:
+            field_labels: Field name -> list of label regex patterns
+        """
+        self.field_labels = field_labels
+        
+        # Distinct patterns in first-seen order (several fields share labels)
+        self.patterns: Dict[str, "re.Pattern"] = {}
+        for patterns in field_labels.values():
+            for pattern in patterns:
+                if pattern not in self.patterns:
+                    self.patterns[pattern] = re.compile(pattern, re.IGNORECASE)
+        
+        # Leading literal key -> patterns starting with it
+        self._by_key: Dict[str, List[Tuple[str, "re.Pattern"]]] = {}
+        # Patterns without a usable leading literal are scanned on their own
+        self._unindexed: List[Tuple[str, "re.Pattern"]] = []
+        literals = set()
+        
+        for pattern, regex in self.patterns.items():
+            literal = self._leading_literal(pattern)
+            if len(literal) < self.KEY_LENGTH:
+                self._unindexed.append((pattern, regex))
+                continue
+            literals.add(literal)
+            self._by_key.setdefault(literal[:self.KEY_LENGTH], []).append((pattern, regex))
+        
+        # Zero-width so that labels starting inside other labels are still found
+        self._prefilter: Optional["re.Pattern"] = None
+        if literals:
+            alternatives = "|".join(
+                re.escape(literal) for literal in sorted(literals, key=len, reverse=True)
+            )
+            self._prefilter = re.compile(f"(?=(?:{alternatives}))")
+    
+    def find_all(self, text: str) -> Dict[str, List["re.Match"]]:
+        """
+        Find all label matches in a document.
+        
+        Args:
+            text: Full OCR text
+        
+        Returns:
+            Pattern -> list of matches, in text order
+        """
+        table: Dict[str, List["re.Match"]] = {pattern: [] for pattern in self.patterns}
+        
+        folded = text.casefold()
+        if len(folded) != len(text):
+            # Case folding changed offsets (e.g. "ß" -> "ss"); scan per pattern
+            for pattern, regex in self.patterns.items():
+                table[pattern] = list(regex.finditer(text))
+            return table
+        
+        # End of the last match per pattern, to keep matches non-overlapping
+        next_start: Dict[str, int] = {}
+        
+        if self._prefilter is not None:
+            key_length = self.KEY_LENGTH
+            by_key = self._by_key
+            for hit in self._prefilter.finditer(folded):
+                position = hit.start()
+                for pattern, regex in by_key.get(folded[position:position + key_length], ()):
+                    if position < next_start.get(pattern, 0):
+                        continue
+                    match = regex.match(text, position)
+                    if match:
+                        table[pattern].append(match)
+                        next_start[pattern] = match.end()
+        
+        for pattern, regex in self._unindexed:
+            table[pattern] = list(regex.finditer(text))
+        
+        return table
+    
+    @staticmethod
+    def _leading_literal(pattern: str) -> str:
+        """Lowercase literal text every match of the pattern starts with."""
+        literal = ""
+        for op, arg in sre_parse.parse(pattern):
+            if op is sre_constants.AT and not literal:
+                # Anchors such as ^ and \b do not consume characters
+                continue
+            if op is not sre_constants.LITERAL:
+                break
+            literal += chr(arg)
+        return literal.casefold()
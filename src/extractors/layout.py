@@ -0,0 +1,385 @@
+"""Layout fingerprinting of known forms and per-template extraction plans."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+Point = Tuple[float, float]
+
+
+class PageFrame:
+    """Bounding rectangle of a document's text, used to normalize coordinates."""
+    
+    __slots__ = ('x', 'y', 'width', 'height')
+    
+    def __init__(self, x: float, y: float, width: float, height: float):
+        self.x = x
+        self.y = y
+        self.width = max(width, 1.0)
+        self.height = max(height, 1.0)
+    
+    @classmethod
+    def from_boxes(cls, boxes: Iterable[Tuple[float, float, float, float]]) -> "PageFrame":
+        """Frame enclosing (x0, y0, x1, y1) boxes."""
+        boxes = list(boxes)
+        if not boxes:
+            return cls(0.0, 0.0, 1.0, 1.0)
+        x0 = min(box[0] for box in boxes)
+        y0 = min(box[1] for box in boxes)
+        x1 = max(box[2] for box in boxes)
+        y1 = max(box[3] for box in boxes)
+        return cls(x0, y0, x1 - x0, y1 - y0)
+    
+    def normalize(self, x: float, y: float) -> Point:
+        """Position of a pixel point as a fraction of the frame."""
+        return (x - self.x) / self.width, (y - self.y) / self.height
+    
+    def __repr__(self) -> str:
+        return f"PageFrame(x={self.x:.0f}, y={self.y:.0f}, width={self.width:.0f}, height={self.height:.0f})"
+
+
+class FieldRegion:
+    """
+    Where a field's value sits relative to an anchor label.
+    
+    Offsets are fractions of the page frame, measured from the center of the
+    anchor label's first word to the centers of the value words.
+    """
+    
+    __slots__ = ('anchor', 'x_min', 'x_max', 'y_min', 'y_max', 'max_words')
+    
+    def __init__(
+        self,
+        anchor: str,
+        x_min: float,
+        x_max: float,
+        y_min: float,
+        y_max: float,
+        max_words: int = 8
+    ):
+        """
+        Initialize a region.
+        
+        Args:
+            anchor: Label pattern (a DeterministicExtractor.FIELD_LABELS entry)
+            x_min: Left edge, relative to the anchor
+            x_max: Right edge, relative to the anchor
+            y_min: Top edge, relative to the anchor
+            y_max: Bottom edge, relative to the anchor
+            max_words: Maximum number of words in the value
+        """
+        self.anchor = anchor
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.max_words = max_words
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-compatible dict."""
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FieldRegion":
+        """Rebuild a region from to_dict() output."""
+        return cls(**data)
+    
+    def __repr__(self) -> str:
+        return (
+            f"FieldRegion(anchor={self.anchor!r}, x=[{self.x_min:.3f}, {self.x_max:.3f}], "
+            f"y=[{self.y_min:.3f}, {self.y_max:.3f}])"
+        )
+
+
+class LayoutTemplate:
+    """
+    A known form layout: its fingerprint and its extraction plan.
+    
+    The fingerprint is the normalized position of anchor labels and of the
+    OCR text blocks. The plan maps fields to FieldRegions, so values of a
+    recognized form are read straight from their regions instead of searched
+    for around every label match.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        anchors: Dict[str, Point],
+        regions: Dict[str, FieldRegion],
+        blocks: Optional[List[Point]] = None,
+        skip_llm: bool = False
+    ):
+        """
+        Initialize a template.
+        
+        Args:
+            name: Template name (e.g. "img_1807")
+            anchors: Label pattern -> normalized position of its first match
+            regions: Field name -> region of its value
+            blocks: Normalized centers of the OCR text blocks
+            skip_llm: If True, documents matching this template are extracted
+                      with the plan alone, without OpenAI. Only set this for
+                      templates whose plan has been checked on real scans.
+        """
+        self.name = name
+        self.anchors = {pattern: tuple(position) for pattern, position in anchors.items()}
+        self.regions = regions
+        self.blocks = [tuple(center) for center in (blocks or [])]
+        self.skip_llm = skip_llm
+    
+    @classmethod
+    def from_reference(
+        cls,
+        name: str,
+        extractor,
+        values: Dict[str, Any],
+        margin: float = 0.01,
+        skip_llm: bool = False
+    ) -> "LayoutTemplate":
+        """
+        Build a template from a reference document with known field values.
+        
+        Each value is located in the OCR words, and its region is recorded
+        relative to the nearest label of the same field (or the nearest anchor
+        of any field).
+        
+        Args:
+            name: Template name
+            extractor: DeterministicExtractor over the reference document
+            values: Field name -> expected value (values not found in the OCR
+                    words are left out of the plan)
+            margin: Padding added around each region, as a fraction of the page
+            skip_llm: See __init__
+        
+        Returns:
+            LayoutTemplate
+        """
+        fingerprint = extractor.fingerprint()
+        frame = fingerprint.frame
+        anchors = extractor.anchor_labels()
+        table = extractor.text_index
+        
+        regions = {}
+        for field_name, value in values.items():
+            if value is None or str(value).strip() == "":
+                continue
+            indices = _find_value_words(table.texts, str(value))
+            if not indices:
+                continue
+            xs = [float(table.x[i]) for i in indices]
+            ys = [float(table.y[i]) for i in indices]
+            center = (sum(xs) / len(xs), sum(ys) / len(ys))
+            
+            field_anchors = [
+                pattern for pattern in extractor.FIELD_LABELS.get(field_name, [])
+                if pattern in anchors
+            ] or list(anchors)
+            if not field_anchors:
+                continue
+            anchor = min(
+                field_anchors,
+                key=lambda pattern: _distance(anchors[pattern]['position']['center'], center)
+            )
+            anchor_x, anchor_y = anchors[anchor]['position']['center']
+            regions[field_name] = FieldRegion(
+                anchor=anchor,
+                x_min=(min(xs) - anchor_x) / frame.width - margin,
+                x_max=(max(xs) - anchor_x) / frame.width + margin,
+                y_min=(min(ys) - anchor_y) / frame.height - margin,
+                y_max=(max(ys) - anchor_y) / frame.height + margin,
+                max_words=len(indices)
+            )
+        
+        return cls(
+            name=name,
+            anchors=fingerprint.anchors,
+            regions=regions,
+            blocks=fingerprint.blocks,
+            skip_llm=skip_llm
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-compatible dict."""
+        return {
+            'name': self.name,
+            'skip_llm': self.skip_llm,
+            'anchors': {pattern: list(position) for pattern, position in self.anchors.items()},
+            'blocks': [list(center) for center in self.blocks],
+            'regions': {field: region.to_dict() for field, region in self.regions.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LayoutTemplate":
+        """Rebuild a template from to_dict() output."""
+        return cls(
+            name=data['name'],
+            anchors=data.get('anchors', {}),
+            regions={
+                field: FieldRegion.from_dict(region)
+                for field, region in data.get('regions', {}).items()
+            },
+            blocks=data.get('blocks', []),
+            skip_llm=data.get('skip_llm', False)
+        )
+    
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the template as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "LayoutTemplate":
+        """Read a template written by save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+    
+    def __repr__(self) -> str:
+        return f"LayoutTemplate(name={self.name!r}, anchors={len(self.anchors)}, regions={len(self.regions)})"
+
+
+class LayoutFingerprint:
+    """Normalized anchor label and text block positions of one document."""
+    
+    __slots__ = ('frame', 'anchors', 'blocks')
+    
+    def __init__(self, frame: PageFrame, anchors: Dict[str, Point], blocks: List[Point]):
+        """
+        Initialize a fingerprint.
+        
+        Args:
+            frame: Page frame positions are normalized to
+            anchors: Label pattern -> normalized position of its first match
+            blocks: Normalized centers of the OCR text blocks
+        """
+        self.frame = frame
+        self.anchors = anchors
+        self.blocks = blocks
+
+
+class LayoutMatch:
+    """A template recognized in a document."""
+    
+    __slots__ = ('template', 'score')
+    
+    def __init__(self, template: LayoutTemplate, score: float):
+        self.template = template
+        self.score = score
+    
+    def __repr__(self) -> str:
+        return f"LayoutMatch(template={self.template.name!r}, score={self.score:.2f})"
+
+
+class LayoutClassifier:
+    """
+    Recognize known form layouts from a document's fingerprint.
+    
+    A template's score is the lower of two fractions: its anchors found within
+    ``tolerance`` of their expected position, and its text blocks with a block
+    of the document within ``tolerance``. Positions are normalized to the page
+    frame, so scans of the same form at another scale or offset still match.
+    """
+    
+    DEFAULT_TOLERANCE = 0.05
+    DEFAULT_MIN_SCORE = 0.8
+    
+    def __init__(
+        self,
+        templates: Iterable[LayoutTemplate],
+        tolerance: float = DEFAULT_TOLERANCE,
+        min_score: float = DEFAULT_MIN_SCORE
+    ):
+        """
+        Initialize classifier.
+        
+        Args:
+            templates: Known layouts
+            tolerance: Maximum distance on each axis, as a fraction of the page
+            min_score: Minimum score for a template to be recognized
+        """
+        self.templates = list(templates)
+        self.tolerance = tolerance
+        self.min_score = min_score
+    
+    @classmethod
+    def from_directory(cls, path: Union[str, Path], **kwargs) -> "LayoutClassifier":
+        """Load every *.json template in a directory."""
+        paths = sorted(Path(path).glob("*.json"))
+        return cls([LayoutTemplate.load(p) for p in paths], **kwargs)
+    
+    def classify(self, fingerprint: LayoutFingerprint) -> Optional[LayoutMatch]:
+        """
+        Find the best matching template.
+        
+        Args:
+            fingerprint: Fingerprint of the document
+        
+        Returns:
+            LayoutMatch, or None if no template reaches min_score
+        """
+        best = None
+        for template in self.templates:
+            score = self.score(template, fingerprint)
+            if score >= self.min_score and (best is None or score > best.score):
+                best = LayoutMatch(template, score)
+        return best
+    
+    def score(self, template: LayoutTemplate, fingerprint: LayoutFingerprint) -> float:
+        """Score of a template against a fingerprint, between 0 and 1."""
+        if not template.anchors:
+            return 0.0
+        
+        matched = sum(
+            1 for pattern, expected in template.anchors.items()
+            if pattern in fingerprint.anchors and self._near(fingerprint.anchors[pattern], expected)
+        )
+        anchor_score = matched / len(template.anchors)
+        
+        if not template.blocks:
+            return anchor_score
+        covered = sum(
+            1 for expected in template.blocks
+            if any(self._near(center, expected) for center in fingerprint.blocks)
+        )
+        return min(anchor_score, covered / len(template.blocks))
+    
+    def _near(self, a: Point, b: Point) -> bool:
+        """Whether two normalized points are within tolerance on both axes."""
+        return abs(a[0] - b[0]) <= self.tolerance and abs(a[1] - b[1]) <= self.tolerance
+
+
+def _distance(a: Point, b: Point) -> float:
+    """Euclidean distance between two points."""
+    return ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+
+
+def _normalize_token(token: str) -> str:
+    """Token compared case-insensitively, without punctuation or thousands separators."""
+    token = token.casefold().replace(',', '').strip("$.:;()")
+    try:
+        return repr(float(token))
+    except ValueError:
+        return token
+
+
+def _find_value_words(texts: List[str], value: str) -> List[int]:
+    """Indices of the first run of words spelling a value, or [] if absent."""
+    wanted = [_normalize_token(token) for token in value.split()]
+    wanted = [token for token in wanted if token]
+    if not wanted:
+        return []
+    
+    normalized = [_normalize_token(text) for text in texts]
+    for start in range(len(normalized)):
+        indices = []
+        position = start
+        for token in wanted:
+            # Skip punctuation-only words (e.g. "," or "/") inside the value
+            while position < len(normalized) and not normalized[position]:
+                position += 1
+            if position >= len(normalized) or normalized[position] != token:
+                break
+            indices.append(position)
+            position += 1
+        else:
+            return indices
+    return []
@@ -0,0 +1,125 @@
+"""Segmentation of OCR words into reading-order text lines."""
+
+from statistics import median
+from typing import List, Tuple
+
+from .word_table import WordTable
+
+
+class TextLine:
+    """One visual line of words, left to right."""
+    
+    __slots__ = ('line_id', 'words', 'top', 'bottom', 'center_y', 'baseline', 'left', 'right')
+    
+    def __init__(
+        self,
+        line_id: int,
+        words: List[int],
+        top: float,
+        bottom: float,
+        center_y: float,
+        baseline: float,
+        left: float,
+        right: float
+    ):
+        """
+        Initialize a line.
+        
+        Args:
+            line_id: Position of the line in reading order (top to bottom)
+            words: Word indices on the line, left to right
+            top: Smallest word top edge
+            bottom: Largest word bottom edge
+            center_y: Mean of the word center y coordinates
+            baseline: Median of the word bottom edges
+            left: Leftmost word edge
+            right: Rightmost word edge
+        """
+        self.line_id = line_id
+        self.words = words
+        self.top = top
+        self.bottom = bottom
+        self.center_y = center_y
+        self.baseline = baseline
+        self.left = left
+        self.right = right
+    
+    @property
+    def span(self) -> Tuple[float, float]:
+        """Horizontal extent (left, right)."""
+        return self.left, self.right
+    
+    def __repr__(self) -> str:
+        return f"TextLine(id={self.line_id}, words={len(self.words)}, baseline={self.baseline:.1f})"
+
+
+class LineIndex:
+    """
+    Words of a document clustered into lines once, for all layout heuristics.
+    
+    Words are taken top to bottom by center; a word joins the current line when
+    its center is within half a line height of the line's center, otherwise it
+    starts a new line. Lines are numbered in reading order and each line's words
+    are sorted left to right, so "same line", "line above" and reading order are
+    lookups instead of pixel tolerances.
+    """
+    
+    def __init__(self, table: WordTable):
+        """
+        Segment the words of a table into lines.
+        
+        Args:
+            table: WordTable of the document
+        """
+        self.table = table
+        self.lines: List[TextLine] = []
+        self.line_of: List[int] = [0] * len(table)
+        
+        xs = [float(value) for value in table.x]
+        ys = [float(value) for value in table.y]
+        heights = [max(float(bottom - top), 1.0) for top, bottom in zip(table.y0, table.y1)]
+        order = sorted(range(len(table)), key=lambda i: (ys[i], xs[i]))
+        
+        groups: List[List[int]] = []
+        line_center = line_height = 0.0
+        for index in order:
+            center_y = ys[index]
+            height = heights[index]
+            if groups and abs(center_y - line_center) <= max(line_height, height) / 2:
+                group = groups[-1]
+                group.append(index)
+                # Running mean keeps the line center stable on slightly skewed scans
+                line_center += (center_y - line_center) / len(group)
+                line_height = max(line_height, height)
+            else:
+                groups.append([index])
+                line_center, line_height = center_y, height
+        
+        for line_id, group in enumerate(groups):
+            group.sort(key=lambda i: xs[i])
+            for index in group:
+                self.line_of[index] = line_id
+            self.lines.append(TextLine(
+                line_id=line_id,
+                words=group,
+                top=min(float(table.y0[i]) for i in group),
+                bottom=max(float(table.y1[i]) for i in group),
+                center_y=sum(ys[i] for i in group) / len(group),
+                baseline=float(median(table.y1[i] for i in group)),
+                left=min(float(table.x0[i]) for i in group),
+                right=max(float(table.x1[i]) for i in group)
+            ))
+    
+    def __len__(self) -> int:
+        return len(self.lines)
+    
+    def __getitem__(self, line_id: int) -> TextLine:
+        return self.lines[line_id]
+    
+    def line_for_word(self, index: int) -> TextLine:
+        """Line containing a word."""
+        return self.lines[self.line_of[index]]
+    
+    def reading_order(self, index: int) -> Tuple[int, float]:
+        """Sort key placing words top to bottom by line, then left to right."""
+        return self.line_of[index], float(self.table.x[index])
@@ -0,0 +1,97 @@
+"""Uniform grid over OCR word centers for window queries."""
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+
+class SpatialIndex:
+    """
+    Uniform grid index of word center points.
+    
+    Words are bucketed into square cells; a window query visits only the cells
+    overlapping the window instead of every word on the page. Built once per
+    document, so label neighborhood searches cost O(words in window) rather
+    than O(words).
+    """
+    
+    # Cell edge length in pixels. Search windows are a few hundred pixels wide,
+    # so a window covers a handful of cells.
+    DEFAULT_CELL_SIZE = 100.0
+    
+    def __init__(self, points: Sequence[Tuple[float, float]], cell_size: float = DEFAULT_CELL_SIZE):
+        """
+        Build the index.
+        
+        Args:
+            points: (x, y) center of each word, in word index order
+            cell_size: Cell edge length in pixels
+        """
+        self.points = list(points)
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        
+        for index, (x, y) in enumerate(self.points):
+            self._cells.setdefault(self._cell(x, y), []).append(index)
+        
+        if self._cells:
+            columns = [cx for cx, _ in self._cells]
+            rows = [cy for _, cy in self._cells]
+            self._bounds = (min(columns), max(columns), min(rows), max(rows))
+        else:
+            self._bounds = (0, -1, 0, -1)
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    def query(
+        self,
+        x_min: float = -math.inf,
+        x_max: float = math.inf,
+        y_min: float = -math.inf,
+        y_max: float = math.inf
+    ) -> List[int]:
+        """
+        Indices of points inside a window (bounds inclusive), in index order.
+        
+        Unbounded sides (the defaults) extend to the edge of the page.
+        
+        Args:
+            x_min: Left edge
+            x_max: Right edge
+            y_min: Top edge
+            y_max: Bottom edge
+        
+        Returns:
+            Sorted word indices
+        """
+        if x_min > x_max or y_min > y_max:
+            return []
+        
+        min_cx, max_cx, min_cy, max_cy = self._bounds
+        first_cx = max(min_cx, self._coordinate(x_min, min_cx))
+        last_cx = min(max_cx, self._coordinate(x_max, max_cx))
+        first_cy = max(min_cy, self._coordinate(y_min, min_cy))
+        last_cy = min(max_cy, self._coordinate(y_max, max_cy))
+        
+        points = self.points
+        found = []
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                for index in self._cells.get((cx, cy), ()):
+                    x, y = points[index]
+                    if x_min <= x <= x_max and y_min <= y <= y_max:
+                        found.append(index)
+        
+        # Callers iterate in reading (word index) order
+        found.sort()
+        return found
+    
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        """Grid cell containing a point."""
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+    
+    def _coordinate(self, value: float, unbounded: int) -> int:
+        """Grid coordinate of a window edge; infinite edges map to the grid bound."""
+        if math.isinf(value):
+            return unbounded
+        return math.floor(value / self.cell_size)
@@ -0,0 +1,79 @@
+"""Classification of OCR words into value types, done once per word."""
+
+import re
+from enum import IntFlag
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+class TokenType(IntFlag):
+    """Value types a word can match, combined as a bitmask."""
+    
+    NONEMPTY = 1
+    DIGIT = 2            # Contains a decimal digit
+    ALPHA = 4            # Contains an ASCII letter
+    MULTI_CHAR = 8       # Longer than one character
+    INTEGER = 16         # Digits only
+    CURRENCY = 32        # Amount, optionally with "$" and thousands separators
+    PHONE = 64           # 10 or 11 digits
+    ZIP = 128            # 5 to 9 digits
+    LEADING_DIGIT = 256  # Starts with a digit (house numbers, amounts)
+    PHONE_FORMAT = 512   # Starts with ddd-ddd-dddd
+
+
+_ALPHA = re.compile(r'[A-Za-z]')
+_AMOUNT = re.compile(r'\d+\.?\d*')
+_PHONE_FORMAT = re.compile(r'\d{3}-\d{3}-\d{4}')
+
+
+@lru_cache(maxsize=8192)
+def classify_token(text: str) -> Tuple[int, str, Optional[str]]:
+    """
+    Classify a word.
+    
+    Results are cached by text: most words of a form (labels, "$", common
+    names) repeat within and across documents.
+    
+    Args:
+        text: Word text (surrounding whitespace is ignored)
+    
+    Returns:
+        Tuple of (TokenType bits as an int, the word's digits, normalized amount
+        without "$" and "," or None if the word is not an amount)
+    """
+    text = text.strip()
+    if not text:
+        return 0, "", None
+    
+    digits = "".join(char for char in text if char.isdecimal())
+    types = TokenType.NONEMPTY
+    
+    if digits:
+        types |= TokenType.DIGIT
+        if 10 <= len(digits) <= 11:
+            types |= TokenType.PHONE
+        if 5 <= len(digits) <= 9:
+            types |= TokenType.ZIP
+        if text[0].isdecimal():
+            types |= TokenType.LEADING_DIGIT
+            if _PHONE_FORMAT.match(text):
+                types |= TokenType.PHONE_FORMAT
+        if len(digits) == len(text):
+            types |= TokenType.INTEGER
+    if _ALPHA.search(text):
+        types |= TokenType.ALPHA
+    if len(text) > 1:
+        types |= TokenType.MULTI_CHAR
+    
+    amount = text.replace('$', '').replace(',', '').strip()
+    if _AMOUNT.fullmatch(amount):
+        types |= TokenType.CURRENCY
+    else:
+        amount = None
+    
+    return int(types), digits, amount
+
+
+def has_types(types: int, required: int) -> bool:
+    """Whether a word's type bits include all required bits."""
+    return types & required == required
@@ -0,0 +1,308 @@
+"""Columnar table of OCR words for vectorized proximity searches."""
+
+import math
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .spatial_index import SpatialIndex
+from .token_types import classify_token, has_types
+
+
+class WordTable:
+    """
+    OCR words stored column-wise: texts, centers, box extents, confidences,
+    character offsets and value types.
+    
+    Window and distance queries run over whole columns with NumPy. Without
+    NumPy the columns are stdlib arrays and window queries use a SpatialIndex
+    grid. Rows are materialized as dicts only for the words a search returns,
+    instead of keeping one dict per word for the whole document.
+    
+    Character offsets point into ``OCRResult.full_text`` when it is given, so
+    regex matches on the full text map to words with a binary search.
+    
+    PackedAnnotations (``OCRResult.word_annotations``) are read column-wise,
+    without building a dict per word; plain lists of annotation dicts work too.
+    
+    Each word is classified once into a TokenType bitmask (``token_types``),
+    with its digits and normalized amount, so field validation in proximity
+    searches is a bit test instead of regex calls per word and label.
+    """
+    
+    # Characters Vision puts between words in full_text (spaces, line breaks,
+    # and the hyphen of a word broken at the end of a line)
+    WORD_SEPARATORS = " \t\r\n-"
+    
+    # Longest run of separators searched past before a word counts as unaligned
+    MAX_SEPARATOR_RUN = 16
+    
+    def __init__(self, word_annotations: Sequence[Dict[str, Any]], full_text: Optional[str] = None):
+        """
+        Build the table.
+        
+        Args:
+            word_annotations: OCRResult.word_annotations (PackedAnnotations or list of dicts)
+            full_text: OCRResult.full_text to align character offsets with. If None,
+                       offsets are positions in the words joined by single spaces.
+        """
+        count = len(word_annotations)
+        self._annotations = word_annotations
+        # Digits of each word, and its amount without "$" and "," (None if not an amount)
+        self.digits: List[str] = []
+        self.amounts: List[Optional[str]] = []
+        
+        columns = self._packed_columns(word_annotations) if NUMPY_AVAILABLE else None
+        if columns is None:
+            columns = self._row_columns(word_annotations)
+        self.texts, x, y, x0, y0, x1, y1, confidence = columns
+        
+        char_start, char_end = array('q'), array('q')
+        token_types = array('L')
+        
+        # Next unmatched position in full_text (or in the space-joined words)
+        char_pos = 0
+        # Characters of unaligned words that the next aligned word may skip over
+        skipped = 0
+        for text in self.texts:
+            types, digits, amount = classify_token(text)
+            token_types.append(types)
+            self.digits.append(digits)
+            self.amounts.append(amount)
+            
+            if full_text is None:
+                # Offsets in the words joined by single spaces
+                char_start.append(char_pos)
+                char_end.append(char_pos + len(text))
+                char_pos += len(text) + 1
+                continue
+            
+            start = self._align(full_text, text, char_pos, skipped)
+            if start is None:
+                # Text not found where expected: zero-width at the current
+                # position, keeping offsets sorted
+                char_start.append(char_pos)
+                char_end.append(char_pos)
+                skipped += len(text) + 1
+            else:
+                char_start.append(start)
+                char_end.append(start + len(text))
+                char_pos = start + len(text)
+                skipped = 0
+        
+        self._count = count
+        self.char_start = char_start
+        self.char_end = char_end
+        
+        if NUMPY_AVAILABLE:
+            self.x, self.y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+            self.x0, self.y0 = np.asarray(x0, dtype=np.float64), np.asarray(y0, dtype=np.float64)
+            self.x1, self.y1 = np.asarray(x1, dtype=np.float64), np.asarray(y1, dtype=np.float64)
+            self.confidence = np.asarray(confidence, dtype=np.float64)
+            self.token_types = np.array(token_types, dtype=np.uint32)
+            self._grid = None
+        else:
+            self.x, self.y = x, y
+            self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+            self.confidence = confidence
+            self.token_types = token_types
+            self._grid = SpatialIndex(list(zip(x, y)))
+    
+    @staticmethod
+    def _packed_columns(word_annotations) -> Optional[Tuple]:
+        """
+        Geometry columns of PackedAnnotations computed with NumPy.
+        
+        Returns None unless every word has the same number of vertices (the
+        usual four), in which case the per-word loop is needed.
+        """
+        if not hasattr(word_annotations, 'vertex_offsets') or not len(word_annotations):
+            return None
+        offsets = np.frombuffer(word_annotations.vertex_offsets, dtype=np.uint32)
+        sizes = np.diff(offsets)
+        if sizes[0] == 0 or np.any(sizes != sizes[0]):
+            return None
+        
+        coordinates = np.asarray(word_annotations.coordinates, dtype=np.float64)
+        boxes = coordinates.reshape(len(word_annotations), -1, 2)
+        xs, ys = boxes[:, :, 0], boxes[:, :, 1]
+        
+        # Missing confidence counts as certain; an explicit None is kept as NaN
+        confidence = np.array(word_annotations.confidences, dtype=np.float64)
+        for index in word_annotations.missing_confidence:
+            confidence[index] = 1.0
+        
+        return (
+            list(word_annotations.texts),
+            xs.mean(axis=1), ys.mean(axis=1),
+            xs.min(axis=1), ys.min(axis=1),
+            xs.max(axis=1), ys.max(axis=1),
+            confidence
+        )
+    
+    @staticmethod
+    def _row_columns(word_annotations) -> Tuple:
+        """Geometry columns built word by word, as stdlib arrays."""
+        texts: List[str] = []
+        x, y = array('d'), array('d')
+        x0, y0, x1, y1 = array('d'), array('d'), array('d'), array('d')
+        confidence = array('d')
+        
+        if hasattr(word_annotations, 'iter_geometry'):
+            # Missing confidence counts as certain; an explicit None is kept as NaN
+            words = word_annotations.iter_geometry(missing_confidence=1.0)
+        else:
+            words = (
+                (
+                    word['text'],
+                    [v['x'] for v in word['bounding_box']],
+                    [v['y'] for v in word['bounding_box']],
+                    word.get('confidence', 1.0)
+                )
+                for word in word_annotations
+            )
+        
+        for text, xs, ys, value in words:
+            texts.append(text)
+            x.append(sum(xs) / len(xs))
+            y.append(sum(ys) / len(ys))
+            x0.append(min(xs))
+            y0.append(min(ys))
+            x1.append(max(xs))
+            y1.append(max(ys))
+            confidence.append(math.nan if value is None else value)
+        
+        return texts, x, y, x0, y0, x1, y1, confidence
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.row(index)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._count):
+            yield self.row(index)
+    
+    def row(self, index: int) -> Dict[str, Any]:
+        """One word as a dict (text, index, center, bounding_box, confidence, offsets)."""
+        return {
+            'text': self.texts[index],
+            'index': index,
+            'center': self.center(index),
+            'bounding_box': self.bounding_box(index),
+            'confidence': self.confidence_at(index),
+            'char_start': self.char_start[index],
+            'char_end': self.char_end[index]
+        }
+    
+    def bounding_box(self, index: int) -> List[Dict[str, int]]:
+        """Bounding box vertices of a word."""
+        return self._annotations[index]['bounding_box']
+    
+    def center(self, index: int) -> Tuple[float, float]:
+        """Center point of a word."""
+        return float(self.x[index]), float(self.y[index])
+    
+    def confidence_at(self, index: int) -> Optional[float]:
+        """Confidence of a word, or None if the OCR reported none."""
+        value = float(self.confidence[index])
+        return None if math.isnan(value) else value
+    
+    def window(
+        self,
+        x_min: float = -math.inf,
+        x_max: float = math.inf,
+        y_min: float = -math.inf,
+        y_max: float = math.inf
+    ) -> List[int]:
+        """
+        Indices of words whose center lies in a window (bounds inclusive), in index order.
+        
+        Args:
+            x_min: Left edge
+            x_max: Right edge
+            y_min: Top edge
+            y_max: Bottom edge
+        
+        Returns:
+            Sorted word indices
+        """
+        if self._grid is not None:
+            return self._grid.query(x_min, x_max, y_min, y_max)
+        
+        mask = (self.x >= x_min) & (self.x <= x_max) & (self.y >= y_min) & (self.y <= y_max)
+        return np.flatnonzero(mask).tolist()
+    
+    def deltas(self, indices: List[int], x: float, y: float) -> Tuple[List[float], List[float]]:
+        """Offsets (dx, dy) of the given words' centers from a point."""
+        if self._grid is not None:
+            return (
+                [self.x[i] - x for i in indices],
+                [self.y[i] - y for i in indices]
+            )
+        
+        selected = np.asarray(indices, dtype=np.intp)
+        return (self.x[selected] - x).tolist(), (self.y[selected] - y).tolist()
+    
+    def distances(self, indices: List[int], x: float, y: float) -> List[float]:
+        """Euclidean distances of the given words' centers from a point."""
+        if self._grid is not None:
+            return [
+                ((self.x[i] - x) ** 2 + (self.y[i] - y) ** 2) ** 0.5
+                for i in indices
+            ]
+        
+        selected = np.asarray(indices, dtype=np.intp)
+        dx = self.x[selected] - x
+        dy = self.y[selected] - y
+        return np.sqrt(dx * dx + dy * dy).tolist()
+    
+    def of_type(self, indices: List[int], required: int) -> List[int]:
+        """Those of the given words whose types include all required TokenType bits, in order."""
+        if self._grid is not None:
+            token_types = self.token_types
+            return [i for i in indices if has_types(token_types[i], required)]
+        
+        selected = np.asarray(indices, dtype=np.intp)
+        mask = (self.token_types[selected] & required) == required
+        return selected[mask].tolist()
+    
+    def in_char_range(self, start: int, end: int) -> List[int]:
+        """Indices of words starting at a character offset in [start, end], in order."""
+        # Offsets increase with the word index
+        first = bisect_right(self.char_start, start - 1)
+        last = bisect_right(self.char_start, end)
+        return list(range(first, last))
+    
+    @classmethod
+    def _align(cls, full_text: str, text: str, position: int, skipped: int = 0) -> Optional[int]:
+        """
+        Offset of a word in full_text at or after position.
+        
+        Only separators may come before it, unless words before it could not be
+        aligned (skipped > 0); then up to that many other characters are allowed.
+        """
+        if not text:
+            return None
+        limit = position + skipped + cls.MAX_SEPARATOR_RUN + len(text)
+        start = full_text.find(text, position, limit)
+        if start == -1:
+            return None
+        if not skipped and full_text[position:start].strip(cls.WORD_SEPARATORS):
+            return None
+        return start
+    
+    def word_at_char(self, offset: int) -> Optional[int]:
+        """Index of the word covering a character offset (or the space after it)."""
+        index = bisect_right(self.char_start, offset) - 1
+        if index >= 0 and offset <= self.char_end[index]:
+            return index
+        return None
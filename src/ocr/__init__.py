@@ -1,6 +1,9 @@
 """OCR module for extracting text from images using Google Cloud Vision API."""
 
 from .vision_client import VisionOCRClient, OCRResult
+from .cache import OCRCache
+from .annotations import PackedAnnotations
+from .image_source import ImageSource
 
-__all__ = ['VisionOCRClient', 'OCRResult']
+__all__ = ['VisionOCRClient', 'OCRResult', 'OCRCache', 'ImageSource', 'PackedAnnotations']
 
@@ -0,0 +1,194 @@
+"""Compact storage for OCR word and block annotations."""
+
+import math
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence as SequenceType, Set, Tuple
+
+# Placeholder for extra keys an annotation does not have
+_MISSING = object()
+
+
+class AnnotationView(Mapping):
+    """
+    Read-only dict view of one packed annotation.
+    
+    Supports everything callers did with the annotation dicts (``word['text']``,
+    ``word.get('confidence')``, ``dict(word)``, comparison with dicts). The
+    bounding box vertex dicts are built on access.
+    """
+    
+    __slots__ = ('_owner', '_index')
+    
+    def __init__(self, owner: "PackedAnnotations", index: int):
+        self._owner = owner
+        self._index = index
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._owner._value(self._index, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._owner._keys(self._index))
+    
+    def __len__(self) -> int:
+        return len(self._owner._keys(self._index))
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class PackedAnnotations(Sequence):
+    """
+    OCR annotations (text, bounding box, confidence) stored column-wise.
+    
+    A dense page has thousands of words; as dicts each holds a list of four
+    vertex dicts, which stay alive as long as the OCRResult does (in
+    ExtractionResult, caches and Streamlit session state). Here the vertices
+    are one flat int32 array, confidences one float array, and each item is
+    exposed as an AnnotationView on indexing, so existing dict-based callers
+    keep working.
+    
+    Keys other than text, bounding_box and confidence (e.g. ``block_type``) are
+    kept in per-key lists.
+    """
+    
+    BASE_KEYS = ('text', 'bounding_box', 'confidence')
+    
+    def __init__(self, annotations: Iterable[Mapping] = ()):
+        """
+        Pack annotations.
+        
+        Args:
+            annotations: Annotation dicts with 'text', 'bounding_box' (list of
+                         {'x', 'y'} vertices) and 'confidence' keys
+        """
+        self.texts: List[str] = []
+        # NaN where the confidence is None or absent
+        self.confidences = array('d')
+        # x, y of every vertex, flattened; annotation i owns
+        # coordinates[vertex_offsets[i]:vertex_offsets[i + 1]]
+        self.coordinates = array('i')
+        self.vertex_offsets = array('I', [0])
+        self.extras: Dict[str, List[Any]] = {}
+        # Indices of annotations that had no confidence key at all
+        self.missing_confidence: Set[int] = set()
+        
+        for annotation in annotations:
+            self.append_dict(annotation)
+    
+    @classmethod
+    def pack(cls, annotations: Optional[Iterable[Mapping]]) -> "PackedAnnotations":
+        """Packed form of annotations; already packed ones are returned as is."""
+        if isinstance(annotations, cls):
+            return annotations
+        return cls(annotations or ())
+    
+    def append(
+        self,
+        text: str,
+        vertices: Iterable[Tuple[float, float]],
+        confidence: Optional[float] = None,
+        **extras: Any
+    ) -> None:
+        """
+        Add an annotation.
+        
+        Args:
+            text: Annotation text
+            vertices: (x, y) of each bounding box vertex
+            confidence: Confidence score, or None
+            **extras: Other keys of the annotation (e.g. block_type)
+        """
+        index = len(self.texts)
+        values = [value for vertex in vertices for value in vertex]
+        try:
+            packed = array(self.coordinates.typecode, values)
+        except (TypeError, OverflowError):
+            # Non-integer or out of int32 range: switch the column to floats
+            self.coordinates = array('d', self.coordinates)
+            packed = array('d', values)
+        
+        self.texts.append(text)
+        self.coordinates.extend(packed)
+        self.vertex_offsets.append(len(self.coordinates))
+        self.confidences.append(math.nan if confidence is None else confidence)
+        
+        for key in extras:
+            if key not in self.extras:
+                self.extras[key] = [_MISSING] * index
+        for key, column in self.extras.items():
+            column.append(extras.get(key, _MISSING))
+    
+    def append_dict(self, annotation: Mapping) -> None:
+        """Add an annotation given as a dict."""
+        vertices = [(vertex.get('x', 0), vertex.get('y', 0)) for vertex in annotation.get('bounding_box', ())]
+        if 'confidence' not in annotation:
+            self.missing_confidence.add(len(self.texts))
+        extras = {key: value for key, value in annotation.items() if key not in self.BASE_KEYS}
+        self.append(annotation.get('text', ''), vertices, annotation.get('confidence'), **extras)
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [AnnotationView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("annotation index out of range")
+        return AnnotationView(self, index)
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (PackedAnnotations, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"PackedAnnotations({len(self)} items)"
+    
+    def vertices(self, index: int) -> Tuple[SequenceType[float], SequenceType[float]]:
+        """x and y coordinates of an annotation's bounding box vertices."""
+        start, end = self.vertex_offsets[index], self.vertex_offsets[index + 1]
+        return self.coordinates[start:end:2], self.coordinates[start + 1:end:2]
+    
+    def confidence(self, index: int, missing: Optional[float] = None) -> Optional[float]:
+        """Confidence of an annotation; None if it is None, missing if there was none."""
+        if index in self.missing_confidence:
+            return missing
+        value = self.confidences[index]
+        return None if math.isnan(value) else value
+    
+    def iter_geometry(
+        self, missing_confidence: Optional[float] = None
+    ) -> Iterator[Tuple[str, SequenceType[float], SequenceType[float], Optional[float]]]:
+        """Yield (text, xs, ys, confidence) per annotation without building dicts."""
+        for index, text in enumerate(self.texts):
+            xs, ys = self.vertices(index)
+            yield text, xs, ys, self.confidence(index, missing_confidence)
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Annotations as plain dicts (e.g. for JSON)."""
+        return [dict(AnnotationView(self, index)) for index in range(len(self))]
+    
+    def _keys(self, index: int) -> List[str]:
+        """Keys the annotation at index has."""
+        keys = ['text', 'bounding_box']
+        if index not in self.missing_confidence:
+            keys.append('confidence')
+        keys.extend(key for key, column in self.extras.items() if column[index] is not _MISSING)
+        return keys
+    
+    def _value(self, index: int, key: str) -> Any:
+        """Value of one key of the annotation at index."""
+        if key == 'text':
+            return self.texts[index]
+        if key == 'bounding_box':
+            xs, ys = self.vertices(index)
+            return [{'x': x, 'y': y} for x, y in zip(xs, ys)]
+        if key == 'confidence' and index not in self.missing_confidence:
+            return self.confidence(index)
+        column = self.extras.get(key)
+        if column is not None and column[index] is not _MISSING:
+            return column[index]
+        raise KeyError(key)
@@ -0,0 +1,61 @@
+"""Content-addressed cache for parsed OCR results."""
+
+import json
+import hashlib
+from typing import Dict, Optional, Any
+
+from src.utils.tiered_cache import TieredCache
+
+
+class OCRCache(TieredCache):
+    """
+    Two-tier (memory LRU + disk) cache of parsed OCR results.
+    
+    Entries are keyed by a hash of the image bytes plus the OCR feature settings,
+    so re-running the same scan skips both the Vision RPC and protobuf parsing.
+    The cache is safe to share between threads.
+    """
+    
+    DEFAULT_MAX_MEMORY_ENTRIES = 128
+    DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024  # 512 MB
+    
+    def __init__(
+        self,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES
+    ):
+        """
+        Initialize OCR cache.
+        
+        Args:
+            max_memory_entries: Maximum number of results kept in memory (0 disables the memory tier)
+            cache_dir: Directory for the disk tier. If None, only the memory tier is used.
+            max_disk_bytes: Maximum total size of the disk tier before oldest entries are evicted
+        """
+        super().__init__(cache_dir, max_memory_entries, max_disk_bytes)
+    
+    @staticmethod
+    def make_key(content: bytes, feature_settings: Dict[str, Any]) -> str:
+        """
+        Build a cache key from image bytes and OCR feature settings.
+        
+        Args:
+            content: Raw image bytes
+            feature_settings: OCR settings that affect the result (feature type, hints, parser version)
+        
+        Returns:
+            Hex digest identifying the (image, settings) pair
+        """
+        digest = hashlib.sha256(content)
+        digest.update(json.dumps(feature_settings, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _encode(self, result) -> Dict[str, Any]:
+        """OCRResult as a JSON dict."""
+        return result.to_dict(include_raw=False)
+    
+    def _decode(self, data: Dict[str, Any]):
+        """OCRResult from its JSON dict."""
+        from src.ocr.vision_client import OCRResult
+        return OCRResult.from_dict(data)
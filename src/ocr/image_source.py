@@ -0,0 +1,217 @@
+"""In-memory image container shared by all pipeline stages."""
+
+import io
+import base64
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple, Union, BinaryIO, Any
+
+from PIL import Image
+
+
+class ImageSource:
+    """
+    Image bytes plus metadata, read once and passed through every stage.
+    
+    OCR, OpenAI Vision and caching all work from the same in-memory bytes, so an
+    upload is never written to a temp file and a file on disk is read only once.
+    Derived values (base64 payload, content hash, dimensions) are computed lazily
+    and cached on the instance.
+    """
+    
+    # Supported formats: format name -> MIME type
+    MIME_TYPES = {
+        'PNG': 'image/png',
+        'JPEG': 'image/jpeg',
+    }
+    
+    # File extensions accepted for path inputs
+    EXTENSIONS = {
+        '.png': 'PNG',
+        '.jpg': 'JPEG',
+        '.jpeg': 'JPEG',
+    }
+    
+    def __init__(
+        self,
+        data: bytes,
+        image_format: str,
+        name: str = "image",
+        path: Optional[str] = None
+    ):
+        """
+        Initialize image source.
+        
+        Args:
+            data: Raw image file bytes
+            image_format: Image format (PNG or JPEG; JPG is accepted as an alias)
+            name: Display name (file name for path inputs), used for logging and output files
+            path: Original file path, if the image was loaded from disk
+        """
+        image_format = image_format.upper()
+        if image_format == 'JPG':
+            image_format = 'JPEG'
+        if image_format not in self.MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {image_format}. Use PNG or JPG.")
+        
+        self.data = data
+        self.image_format = image_format
+        self.name = name
+        self.path = path
+        
+        self._base64: Optional[str] = None
+        self._sha256: Optional[str] = None
+        self._size: Optional[Tuple[int, int]] = None
+    
+    @classmethod
+    def from_path(cls, image_path: Union[str, Path]) -> "ImageSource":
+        """
+        Read an image file once.
+        
+        Args:
+            image_path: Path to image file (PNG or JPG)
+        
+        Returns:
+            ImageSource holding the file bytes
+        
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file extension is not PNG or JPG
+        """
+        path = Path(image_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Image not found: {image_path}")
+        
+        image_ext = path.suffix.lower()
+        if image_ext not in cls.EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {image_ext}. Use PNG or JPG.")
+        
+        return cls(
+            data=path.read_bytes(),
+            image_format=cls.EXTENSIONS[image_ext],
+            name=path.name,
+            path=str(image_path)
+        )
+    
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        image_format: Optional[str] = None,
+        name: str = "upload"
+    ) -> "ImageSource":
+        """
+        Wrap image bytes already in memory.
+        
+        Args:
+            data: Raw image file bytes
+            image_format: Image format (PNG, JPEG). Detected from the file signature if None.
+            name: Display name for logging and output files
+        
+        Returns:
+            ImageSource holding the bytes (no copy is made for bytes input)
+        """
+        if image_format is None:
+            image_format = cls.detect_format(data)
+        return cls(data=bytes(data), image_format=image_format, name=name)
+    
+    @classmethod
+    def from_file(cls, file_obj: BinaryIO, image_format: Optional[str] = None) -> "ImageSource":
+        """
+        Read a binary file-like object (e.g. a Streamlit UploadedFile) once.
+        
+        Args:
+            file_obj: Object with a read() method returning bytes
+            image_format: Image format (PNG, JPEG). Detected from the file signature if None.
+        
+        Returns:
+            ImageSource holding the file contents
+        """
+        name = Path(getattr(file_obj, 'name', None) or "upload").name
+        if image_format is None:
+            ext = Path(name).suffix.lower()
+            image_format = cls.EXTENSIONS.get(ext)
+        
+        data = file_obj.read()
+        return cls.from_bytes(data, image_format=image_format, name=name)
+    
+    @classmethod
+    def load(cls, image: Any, image_format: Optional[str] = None) -> "ImageSource":
+        """
+        Build an ImageSource from bytes, a path, a file-like object or another ImageSource.
+        
+        Args:
+            image: Image input in any supported form
+            image_format: Optional format override for bytes and file-like inputs
+        
+        Returns:
+            ImageSource for the input
+        """
+        if isinstance(image, ImageSource):
+            return image
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(bytes(image), image_format=image_format)
+        if isinstance(image, (str, Path)):
+            return cls.from_path(image)
+        if hasattr(image, 'read'):
+            return cls.from_file(image, image_format=image_format)
+        raise TypeError(f"Unsupported image input: {type(image).__name__}")
+    
+    @staticmethod
+    def detect_format(data: bytes) -> str:
+        """Detect image format (PNG or JPEG) from the file signature."""
+        if data[:8] == b'\x89PNG\r\n\x1a\n':
+            return 'PNG'
+        if data[:3] == b'\xff\xd8\xff':
+            return 'JPEG'
+        raise ValueError("Unsupported image format. Use PNG or JPG.")
+    
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the image (image/png or image/jpeg)."""
+        return self.MIME_TYPES[self.image_format]
+    
+    @property
+    def size_bytes(self) -> int:
+        """Size of the encoded image in bytes."""
+        return len(self.data)
+    
+    @property
+    def dimensions(self) -> Tuple[int, int]:
+        """Decoded (width, height) in pixels. Only the image header is parsed."""
+        if self._size is None:
+            with Image.open(io.BytesIO(self.data)) as img:
+                self._size = img.size
+        return self._size
+    
+    @property
+    def width(self) -> int:
+        """Image width in pixels."""
+        return self.dimensions[0]
+    
+    @property
+    def height(self) -> int:
+        """Image height in pixels."""
+        return self.dimensions[1]
+    
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 digest of the image bytes."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+    
+    @property
+    def base64(self) -> str:
+        """Base64-encoded image bytes (encoded once)."""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.data).decode('utf-8')
+        return self._base64
+    
+    @property
+    def data_url(self) -> str:
+        """data: URL for sending the image inline to OpenAI Vision."""
+        return f"data:{self.mime_type};base64,{self.base64}"
+    
+    def __repr__(self) -> str:
+        return f"ImageSource(name='{self.name}', format={self.image_format}, bytes={len(self.data)})"
@@ -2,23 +2,36 @@
 
 import os
 import json
-import tempfile
-from typing import Dict, List, Optional, Tuple, Any
+import asyncio
+from typing import Dict, List, Optional, Tuple, Any, Union
 from pathlib import Path
 
 from google.cloud import vision
 from google.cloud.vision_v1 import types
 from PIL import Image
 
+from .annotations import PackedAnnotations
+from .cache import OCRCache
+from .image_source import ImageSource
+from src.utils.metrics import timed, record_cache_lookup
+from src.utils.client_registry import (
+    resolve_credentials, get_vision_client, get_vision_async_client
+)
+
 
 class OCRResult:
-    """Container for OCR extraction results."""
+    """
+    Container for OCR extraction results.
+    
+    Word and block annotations are stored as PackedAnnotations; indexing them
+    yields read-only dict views with the same keys as before.
+    """
     
     def __init__(
         self,
         full_text: str,
-        word_annotations: List[Dict[str, Any]],
-        block_annotations: List[Dict[str, Any]],
+        word_annotations: Union[List[Dict[str, Any]], PackedAnnotations],
+        block_annotations: Union[List[Dict[str, Any]], PackedAnnotations],
         confidence_scores: Dict[str, float],
         raw_response: Dict[str, Any],
         warnings: List[str]
@@ -31,26 +44,49 @@ class OCRResult:
             word_annotations: List of word-level annotations with bounding boxes
             block_annotations: List of block-level annotations with bounding boxes
             confidence_scores: Dictionary with word-level and block-level confidence scores
-            raw_response: Raw API response for debugging
+            raw_response: Raw API response for debugging (a small summary unless
+                          the raw output was requested)
             warnings: List of warnings from the API
         """
         self.full_text = full_text
-        self.word_annotations = word_annotations
-        self.block_annotations = block_annotations
+        self.word_annotations = PackedAnnotations.pack(word_annotations)
+        self.block_annotations = PackedAnnotations.pack(block_annotations)
         self.confidence_scores = confidence_scores
         self.raw_response = raw_response
         self.warnings = warnings
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert OCR result to dictionary."""
-        return {
+    def to_dict(self, include_raw: bool = True) -> Dict[str, Any]:
+        """
+        Convert OCR result to dictionary.
+        
+        Args:
+            include_raw: Whether to include raw_response (the OCR cache leaves it out)
+        
+        Returns:
+            Dictionary of plain lists and dicts, readable by from_dict()
+        """
+        data = {
             'full_text': self.full_text,
-            'word_annotations': self.word_annotations,
-            'block_annotations': self.block_annotations,
+            'word_annotations': self.word_annotations.to_list(),
+            'block_annotations': self.block_annotations.to_list(),
             'confidence_scores': self.confidence_scores,
-            'warnings': self.warnings,
-            'raw_response': self.raw_response
+            'warnings': self.warnings
         }
+        if include_raw:
+            data['raw_response'] = self.raw_response
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OCRResult":
+        """Rebuild an OCR result from the output of to_dict()."""
+        return cls(
+            full_text=data.get('full_text', ''),
+            word_annotations=data.get('word_annotations', []),
+            block_annotations=data.get('block_annotations', []),
+            confidence_scores=data.get('confidence_scores', {}),
+            raw_response=data.get('raw_response', {}),
+            warnings=data.get('warnings', [])
+        )
     
     def __repr__(self) -> str:
         return f"OCRResult(full_text_length={len(self.full_text)}, words={len(self.word_annotations)}, blocks={len(self.block_annotations)})"
@@ -59,7 +95,20 @@ class OCRResult:
 class VisionOCRClient:
     """Client for Google Cloud Vision API OCR operations."""
     
-    def __init__(self, credentials_path: Optional[str] = None):
+    # OCR settings that determine the parsed result. Part of the OCR cache key:
+    # bump PARSER_VERSION whenever the response parsing below changes.
+    PARSER_VERSION = 1
+    
+    # Vision API limits for one synchronous batch_annotate_images call
+    MAX_BATCH_SIZE = 16
+    MAX_BATCH_BYTES = 40 * 1024 * 1024  # 40 MB request payload
+    
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        cache: Optional[OCRCache] = None,
+        api_endpoint: Optional[str] = None
+    ):
         """
         Initialize Vision OCR client.
         
@@ -68,61 +117,44 @@ class VisionOCRClient:
                             If None, uses GOOGLE_APPLICATION_CREDENTIALS env var.
                             For Railway: GOOGLE_APPLICATION_CREDENTIALS may contain JSON content
                             (as a string) or a file path.
+            cache: Optional OCRCache. When set, results are looked up by image content
+                   before calling the Vision API.
+            api_endpoint: Optional Vision API endpoint ("host:port"). Local endpoints
+                          (e.g. a fake Vision server in tests) use an insecure channel.
         """
+        self.cache = cache
+        self.api_endpoint = api_endpoint
+        
         # Handle credentials for Railway deployment
-        # Railway may provide GOOGLE_APPLICATION_CREDENTIALS as JSON content (string) or file path
+        # Railway may provide GOOGLE_APPLICATION_CREDENTIALS as JSON content (string) or file path.
+        # JSON content is written to a temp file once per process by the client registry.
         creds_env = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         
         if credentials_path:
-            # If credentials_path is provided, check if it's JSON content or a file path
-            if credentials_path.strip().startswith('{'):
-                # It's JSON content - write to temp file
-                try:
-                    # Validate JSON
-                    json.loads(credentials_path)
-                    # Create temp file
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                        f.write(credentials_path)
-                        temp_path = f.name
-                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_path
-                except (json.JSONDecodeError, Exception):
-                    # Not valid JSON or error writing, treat as file path
-                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-            elif Path(credentials_path).exists():
-                # It's a valid file path
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-            else:
-                # Treat as file path (may not exist yet)
+            try:
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = resolve_credentials(credentials_path)
+            except Exception:
+                # Not valid JSON or error writing, treat as file path
                 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
         elif creds_env:
-            # No credentials_path provided, but GOOGLE_APPLICATION_CREDENTIALS env var is set
-            # Check if it's JSON content or a file path
-            if creds_env.strip().startswith('{'):
-                # It's JSON content - write to temp file
-                try:
-                    # Validate JSON
-                    json.loads(creds_env)
-                    # Create temp file
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                        f.write(creds_env)
-                        temp_path = f.name
-                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_path
-                except (json.JSONDecodeError, Exception):
-                    # Not valid JSON or error writing, treat as file path
-                    # Keep the original value
-                    pass
-            # If it's a file path, it's already set correctly
+            try:
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = resolve_credentials(creds_env)
+            except Exception:
+                # Not valid JSON or error writing, keep the original value
+                pass
         
         # If no credentials are provided at all, let Google Cloud SDK use default credentials
         # (this will fail if not configured, but that's expected)
         
-        self.client = vision.ImageAnnotatorClient()
+        # Shared per process (and per event loop for the async client)
+        self.client = get_vision_client(self.api_endpoint)
     
     def extract_text(
         self,
-        image_path: str,
+        image_path: Optional[str] = None,
         save_raw_output: bool = True,
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        image: Optional[ImageSource] = None
     ) -> OCRResult:
         """
         Extract text from an image using DOCUMENT_TEXT_DETECTION.
@@ -131,25 +163,266 @@ class VisionOCRClient:
             image_path: Path to image file (PNG or JPG)
             save_raw_output: Whether to save raw OCR output to file
             output_dir: Directory to save raw output (defaults to 'output' directory)
+            image: In-memory ImageSource to use instead of reading image_path
         
         Returns:
             OCRResult object containing extracted text, annotations, and metadata
         """
-        # Validate image format
-        image_ext = Path(image_path).suffix.lower()
-        if image_ext not in ['.png', '.jpg', '.jpeg']:
-            raise ValueError(f"Unsupported image format: {image_ext}. Use PNG or JPG.")
-        
-        # Read image file
-        with open(image_path, 'rb') as image_file:
-            content = image_file.read()
+        source = self._resolve_source(image_path, image)
         
-        # Create image object
-        image = vision.Image(content=content)
+        cache_key = self._cache_key(source.data)
+        cached = self._cache_lookup(cache_key, source, save_raw_output, output_dir)
+        if cached is not None:
+            return cached
         
         # Perform document text detection
-        response = self.client.document_text_detection(image=image)
+        with timed("ocr_rpc"):
+            response = self.client.document_text_detection(image=vision.Image(content=source.data))
+        
+        with timed("ocr_parse"):
+            ocr_result = self._build_ocr_result(response, source, save_raw_output, output_dir)
+        if cache_key:
+            self.cache.put(cache_key, ocr_result)
+        return ocr_result
+    
+    def extract_text_batch(
+        self,
+        images: List[Union[str, bytes, ImageSource]],
+        save_raw_output: bool = False,
+        output_dir: Optional[str] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[OCRResult, Exception]]:
+        """
+        Extract text from many images with as few Vision API calls as possible.
+        
+        Cache misses are packed into batch_annotate_images requests of up to
+        MAX_BATCH_SIZE images (and MAX_BATCH_BYTES of image data), and the
+        responses are split back into one OCRResult per input. Identical images
+        in the same call are sent once.
+        
+        Args:
+            images: Image paths, raw bytes or ImageSource objects (PNG or JPG)
+            save_raw_output: Whether to save raw OCR output to file
+            output_dir: Directory to save raw output (defaults to 'output' directory)
+            return_exceptions: If True, a failing image yields its exception in the
+                               result list instead of raising
+        
+        Returns:
+            List of OCRResult (or Exception, if return_exceptions) in input order
+        """
+        results: List[Optional[Union[OCRResult, Exception]]] = [None] * len(images)
+        
+        # Positions of each distinct image still needing OCR, in first-seen order
+        pending: Dict[str, List[int]] = {}
+        sources: Dict[str, ImageSource] = {}
+        
+        for index, image in enumerate(images):
+            try:
+                source = ImageSource.load(image)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+                continue
+            
+            cached = self._cache_lookup(
+                self._cache_key(source.data), source, save_raw_output, output_dir
+            )
+            if cached is not None:
+                results[index] = cached
+                continue
+            
+            pending.setdefault(source.sha256, []).append(index)
+            sources.setdefault(source.sha256, source)
+        
+        for chunk in self._chunk_batch([sources[digest] for digest in pending]):
+            try:
+                with timed("ocr_rpc"):
+                    batch_response = self.client.batch_annotate_images(
+                        requests=[self._build_annotate_request(source.data) for source in chunk]
+                    )
+                responses = list(batch_response.responses)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                for source in chunk:
+                    for index in pending[source.sha256]:
+                        results[index] = e
+                continue
+            
+            for source, response in zip(chunk, responses):
+                try:
+                    with timed("ocr_parse"):
+                        ocr_result = self._build_ocr_result(
+                            response, source, save_raw_output, output_dir
+                        )
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    ocr_result = e
+                else:
+                    cache_key = self._cache_key(source.data)
+                    if cache_key:
+                        self.cache.put(cache_key, ocr_result)
+                
+                for index in pending[source.sha256]:
+                    results[index] = ocr_result
+        
+        return results
+    
+    def _chunk_batch(self, sources: List[ImageSource]) -> List[List[ImageSource]]:
+        """Split images into batches within the per-request count and size limits."""
+        chunks: List[List[ImageSource]] = []
+        current: List[ImageSource] = []
+        current_bytes = 0
+        
+        for source in sources:
+            if current and (
+                len(current) >= self.MAX_BATCH_SIZE
+                or current_bytes + source.size_bytes > self.MAX_BATCH_BYTES
+            ):
+                chunks.append(current)
+                current, current_bytes = [], 0
+            current.append(source)
+            current_bytes += source.size_bytes
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def warm_up(self, timeout: float = 10.0) -> None:
+        """
+        Open the gRPC channel and fetch credentials ahead of the first document.
+        
+        Sends an empty batch request, which is not billed. The Vision API may
+        reject it as invalid; that still means the connection and auth work.
+        
+        Args:
+            timeout: Seconds to wait for the call
+        
+        Raises:
+            Exception: If the Vision API cannot be reached or rejects the credentials
+        """
+        from google.api_core import exceptions
+        
+        try:
+            self.client.batch_annotate_images(requests=[], timeout=timeout)
+        except exceptions.InvalidArgument:
+            pass
+    
+    @property
+    def feature_settings(self) -> Dict[str, Any]:
+        """OCR request settings that affect the result."""
+        return {
+            'feature': 'DOCUMENT_TEXT_DETECTION',
+            'parser_version': self.PARSER_VERSION
+        }
+    
+    def _cache_key(self, content: bytes) -> Optional[str]:
+        """Cache key for image content, or None when caching is disabled."""
+        if self.cache is None:
+            return None
+        return OCRCache.make_key(content, self.feature_settings)
+    
+    def _cache_lookup(
+        self,
+        cache_key: Optional[str],
+        source: ImageSource,
+        save_raw_output: bool,
+        output_dir: Optional[str]
+    ) -> Optional[OCRResult]:
+        """Return a cached OCR result (saving its raw output if requested)."""
+        if not cache_key:
+            return None
+        cached = self.cache.get(cache_key)
+        record_cache_lookup("ocr", cached is not None)
+        # Results read back from disk carry no raw response to save
+        if cached is not None and save_raw_output and cached.raw_response:
+            self._save_raw_output(source.name, cached.raw_response, output_dir)
+        return cached
+    
+    async def extract_text_async(
+        self,
+        image_path: Optional[str] = None,
+        save_raw_output: bool = True,
+        output_dir: Optional[str] = None,
+        image: Optional[ImageSource] = None
+    ) -> OCRResult:
+        """
+        Async variant of extract_text using the Vision async (gRPC asyncio) client.
         
+        Args:
+            image_path: Path to image file (PNG or JPG)
+            save_raw_output: Whether to save raw OCR output to file
+            output_dir: Directory to save raw output (defaults to 'output' directory)
+            image: In-memory ImageSource to use instead of reading image_path
+        
+        Returns:
+            OCRResult object containing extracted text, annotations, and metadata
+        """
+        if image is None:
+            image = await asyncio.to_thread(self._resolve_source, image_path, None)
+        
+        cache_key = self._cache_key(image.data)
+        if cache_key:
+            # Disk tier reads are blocking file I/O
+            cached = await asyncio.to_thread(
+                self._cache_lookup, cache_key, image, save_raw_output, output_dir
+            )
+            if cached is not None:
+                return cached
+        
+        # The async client has no single-feature helpers, so send a one-image batch
+        with timed("ocr_rpc"):
+            batch_response = await self._get_async_client().batch_annotate_images(
+                requests=[self._build_annotate_request(image.data)]
+            )
+        response = batch_response.responses[0]
+        
+        # Parsing the protobuf is CPU-bound, keep it off the event loop
+        with timed("ocr_parse"):
+            ocr_result = await asyncio.to_thread(
+                self._build_ocr_result,
+                response,
+                image,
+                save_raw_output,
+                output_dir
+            )
+        if cache_key:
+            await asyncio.to_thread(self.cache.put, cache_key, ocr_result)
+        return ocr_result
+    
+    def _get_async_client(self) -> "vision.ImageAnnotatorAsyncClient":
+        """Get the shared async client for the running event loop."""
+        return get_vision_async_client(self.api_endpoint)
+    
+    def _resolve_source(
+        self,
+        image_path: Optional[str],
+        image: Optional[ImageSource]
+    ) -> ImageSource:
+        """Use the given ImageSource or read image_path once."""
+        if image is not None:
+            return image
+        if image_path is None:
+            raise ValueError("Either image_path or image must be provided")
+        return ImageSource.from_path(image_path)
+    
+    def _build_annotate_request(self, content: bytes) -> vision.AnnotateImageRequest:
+        """Build a DOCUMENT_TEXT_DETECTION request for one image."""
+        return vision.AnnotateImageRequest(
+            image=vision.Image(content=content),
+            features=[vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)]
+        )
+    
+    def _build_ocr_result(
+        self,
+        response: vision.AnnotateImageResponse,
+        source: ImageSource,
+        save_raw_output: bool,
+        output_dir: Optional[str]
+    ) -> OCRResult:
+        """Parse an AnnotateImageResponse into an OCRResult."""
         # Check for errors
         if response.error.message:
             raise Exception(f"API Error: {response.error.message}")
@@ -177,47 +450,44 @@ class VisionOCRClient:
             # Check for any warnings in the response
             pass  # Google Vision API doesn't typically return warnings in this format
         
-        # Prepare raw response for debugging
-        raw_response = self._serialize_response(response)
+        # The full response goes down to symbol level and is many times larger
+        # than the packed annotations; keep it only when it is saved
+        if save_raw_output:
+            raw_response = self._serialize_response(response)
+        else:
+            raw_response = self._summarize_response(response, word_annotations, block_annotations)
+        
+        ocr_result = OCRResult(
+            full_text=full_text,
+            word_annotations=word_annotations,
+            block_annotations=block_annotations,
+            confidence_scores=confidence_scores,
+            raw_response=raw_response,
+            warnings=warnings
+        )
         
         # Log OCR results
         try:
             from src.utils import get_logger, log_ocr_result
             logger = get_logger()
-            ocr_result = OCRResult(
-                full_text=full_text,
-                word_annotations=word_annotations,
-                block_annotations=block_annotations,
-                confidence_scores=confidence_scores,
-                raw_response=raw_response,
-                warnings=warnings
-            )
             log_ocr_result(logger, ocr_result, debug=True)
-            return ocr_result
         except ImportError:
-            # Logging not available, return without logging
+            # Logging not available, continue without logging
             pass
         
         # Save raw output if requested
         if save_raw_output:
             self._save_raw_output(
-                image_path, raw_response, output_dir
+                source.name, raw_response, output_dir
             )
         
-        return OCRResult(
-            full_text=full_text,
-            word_annotations=word_annotations,
-            block_annotations=block_annotations,
-            confidence_scores=confidence_scores,
-            raw_response=raw_response,
-            warnings=warnings
-        )
+        return ocr_result
     
     def _extract_word_annotations(
         self, full_text_annotation: types.TextAnnotation
-    ) -> List[Dict[str, Any]]:
+    ) -> PackedAnnotations:
         """Extract word-level annotations with bounding boxes and confidence."""
-        word_annotations = []
+        word_annotations = PackedAnnotations()
         
         if not full_text_annotation or not full_text_annotation.pages:
             return word_annotations
@@ -233,26 +503,22 @@ class VisionOCRClient:
                         
                         # Extract bounding box
                         vertices = [
-                            {'x': vertex.x, 'y': vertex.y}
+                            (vertex.x, vertex.y)
                             for vertex in word.bounding_box.vertices
                         ]
                         
                         # Extract confidence score
                         confidence = word.confidence if hasattr(word, 'confidence') else None
                         
-                        word_annotations.append({
-                            'text': word_text,
-                            'bounding_box': vertices,
-                            'confidence': confidence
-                        })
+                        word_annotations.append(word_text, vertices, confidence)
         
         return word_annotations
     
     def _extract_block_annotations(
         self, full_text_annotation: types.TextAnnotation
-    ) -> List[Dict[str, Any]]:
+    ) -> PackedAnnotations:
         """Extract block-level annotations with bounding boxes and confidence."""
-        block_annotations = []
+        block_annotations = PackedAnnotations()
         
         if not full_text_annotation or not full_text_annotation.pages:
             return block_annotations
@@ -264,19 +530,17 @@ class VisionOCRClient:
                 
                 # Extract bounding box
                 vertices = [
-                    {'x': vertex.x, 'y': vertex.y}
+                    (vertex.x, vertex.y)
                     for vertex in block.bounding_box.vertices
                 ]
                 
                 # Extract confidence score (average of word confidences in block)
                 block_confidence = self._calculate_block_confidence(block)
                 
-                block_annotations.append({
-                    'text': block_text,
-                    'bounding_box': vertices,
-                    'confidence': block_confidence,
-                    'block_type': self._get_block_type(block)
-                })
+                block_annotations.append(
+                    block_text, vertices, block_confidence,
+                    block_type=self._get_block_type(block)
+                )
         
         return block_annotations
     
@@ -317,16 +581,16 @@ class VisionOCRClient:
     
     def _calculate_confidence_scores(
         self,
-        word_annotations: List[Dict[str, Any]],
-        block_annotations: List[Dict[str, Any]]
+        word_annotations: PackedAnnotations,
+        block_annotations: PackedAnnotations
     ) -> Dict[str, float]:
         """Calculate aggregate confidence scores."""
         scores = {}
         
         # Word-level confidence
         word_confidences = [
-            w['confidence'] for w in word_annotations
-            if w['confidence'] is not None
+            word_annotations.confidence(i) for i in range(len(word_annotations))
+            if word_annotations.confidence(i) is not None
         ]
         if word_confidences:
             scores['word_level'] = {
@@ -337,8 +601,8 @@ class VisionOCRClient:
         
         # Block-level confidence
         block_confidences = [
-            b['confidence'] for b in block_annotations
-            if b['confidence'] is not None
+            block_annotations.confidence(i) for i in range(len(block_annotations))
+            if block_annotations.confidence(i) is not None
         ]
         if block_confidences:
             scores['block_level'] = {
@@ -366,6 +630,20 @@ class VisionOCRClient:
                 'serialization_error': str(e)
             }
     
+    def _summarize_response(
+        self,
+        response,
+        word_annotations: List[Dict[str, Any]],
+        block_annotations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Small stand-in for the raw response when it is not saved."""
+        full_text_annotation = response.full_text_annotation
+        return {
+            'pages': len(full_text_annotation.pages) if full_text_annotation else 0,
+            'blocks': len(block_annotations),
+            'words': len(word_annotations)
+        }
+    
     def _save_raw_output(
         self,
         image_path: str,
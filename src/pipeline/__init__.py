@@ -1,6 +1,7 @@
 """Pipeline module for orchestrating the full extraction flow."""
 
-from .extraction_pipeline import ExtractionPipeline, ExtractionResult
+from .extraction_pipeline import ExtractionPipeline, ExtractionResult, BatchItemResult
+from .async_pipeline import AsyncExtractionPipeline
 
-__all__ = ['ExtractionPipeline', 'ExtractionResult']
+__all__ = ['ExtractionPipeline', 'ExtractionResult', 'BatchItemResult', 'AsyncExtractionPipeline']
 
@@ -0,0 +1,434 @@
+"""Asyncio extraction pipeline for use from async web tiers."""
+
+import os
+import time
+import asyncio
+from typing import Optional, List, Union
+
+from src.ocr import VisionOCRClient, OCRResult, OCRCache, ImageSource
+from src.extractors import EnhancedExtractor
+from src.extractors.layout import LayoutClassifier
+from src.processors import OpenAIProcessor, OCRReconciler, VisionImagePreprocessor, RegionCropper, PromptBudget
+from src.schema import InstallmentAgreementSchema, FieldTypes
+from src.validators import AIValidator
+from src.utils.metrics import MetricsSink, collect_timings, timed
+from src.utils.response_cache import LLMResponseCache
+from src.pipeline.extraction_pipeline import ExtractionResult, BatchItemResult
+
+
+class AsyncExtractionPipeline:
+    """
+    Async version of ExtractionPipeline.
+    
+    Every network stage (Vision OCR, OpenAI Vision extraction, OpenAI enhancement,
+    AI validation) is awaited on the async clients, and CPU-bound work (protobuf
+    parsing, rule-based extraction) is offloaded to worker threads, so a single
+    event loop can keep many documents in flight.
+    """
+    
+    # Default number of documents processed concurrently by extract_batch
+    DEFAULT_MAX_CONCURRENCY = 32
+    
+    def __init__(
+        self,
+        credentials_path: Optional[str] = None,
+        openai_api_key: Optional[str] = None,
+        force_openai: bool = False,
+        ocr_cache: Optional[OCRCache] = None,
+        speculative: bool = False,
+        metrics_sink: Optional[MetricsSink] = None,
+        layout_classifier: Optional[LayoutClassifier] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        image_preprocessor: Optional[VisionImagePreprocessor] = None,
+        region_cropper: Optional[RegionCropper] = None,
+        prompt_budget: Optional[PromptBudget] = None,
+        gap_filling: bool = False
+    ):
+        """
+        Initialize async extraction pipeline.
+        
+        Args:
+            credentials_path: Path to Google Cloud service account JSON file.
+                            If None, uses GOOGLE_APPLICATION_CREDENTIALS env var.
+            openai_api_key: OpenAI API key. If None, uses OPENAI_API_KEY env var.
+            force_openai: If True, always use OpenAI regardless of confidence.
+            ocr_cache: Optional OCRCache so repeated scans skip the Vision API.
+            speculative: If True, run the image-only OpenAI Vision extraction
+                        concurrently with OCR and reconcile afterwards.
+            metrics_sink: Optional callable receiving each document's ExtractionTimings.
+            layout_classifier: Optional LayoutClassifier of known form layouts (see
+                              ExtractionPipeline).
+            response_cache: Optional LLMResponseCache for OpenAI responses (see
+                           ExtractionPipeline).
+            image_preprocessor: Optional VisionImagePreprocessor for OpenAI Vision uploads
+                               (see ExtractionPipeline).
+            region_cropper: Optional RegionCropper for section-cropped vision requests
+                           (see ExtractionPipeline).
+            prompt_budget: Optional PromptBudget for compacted OpenAI prompts (see
+                          ExtractionPipeline).
+            gap_filling: If True, the rule-based path asks OpenAI only for missing,
+                        low-confidence or inconsistent fields (see ExtractionPipeline).
+        """
+        # Initialize OCR client
+        self.ocr_client = VisionOCRClient(credentials_path=credentials_path, cache=ocr_cache)
+        
+        # Initialize OpenAI processor (if available)
+        self.openai_processor = None
+        self.force_openai = force_openai
+        
+        if openai_api_key or os.getenv("OPENAI_API_KEY"):
+            try:
+                # Use vision by default for better extraction (image + OCR text)
+                self.openai_processor = OpenAIProcessor(
+                    api_key=openai_api_key,
+                    use_vision=True,
+                    response_cache=response_cache,
+                    image_preprocessor=image_preprocessor,
+                    region_cropper=region_cropper,
+                    prompt_budget=prompt_budget
+                )
+            except Exception as e:
+                print(f"Warning: OpenAI processor initialization failed: {e}")
+                print("Continuing without OpenAI enhancement.")
+        
+        # Initialize AI validator (if OpenAI available)
+        self.ai_validator = None
+        if openai_api_key or os.getenv("OPENAI_API_KEY"):
+            try:
+                self.ai_validator = AIValidator(api_key=openai_api_key, response_cache=response_cache)
+            except Exception:
+                # Validator is optional, continue without it
+                pass
+        
+        self.speculative = speculative
+        self.metrics_sink = metrics_sink
+        self.layout_classifier = layout_classifier
+        self.gap_filling = gap_filling
+    
+    async def extract(
+        self,
+        image_path: str,
+        save_raw_ocr: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """
+        Run the full extraction pipeline on an image file.
+        
+        Args:
+            image_path: Path to image file (PNG or JPG)
+            save_raw_ocr: Whether to save raw OCR output
+            fields: Optional subset of field names to extract (see
+                    ExtractionPipeline.extract)
+        
+        Returns:
+            ExtractionResult with extracted data and metadata
+        """
+        start_time = time.time()
+        
+        # Step 1: Image Upload (validate and read once)
+        source = await asyncio.to_thread(ImageSource.from_path, image_path)
+        
+        return await self._run(source, save_raw_ocr=save_raw_ocr, start_time=start_time, fields=fields)
+    
+    async def extract_from_bytes(
+        self,
+        image_bytes: bytes,
+        image_format: str = "PNG",
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """
+        Extract from image bytes (for use with uploaded files).
+        
+        Args:
+            image_bytes: Image file bytes
+            image_format: Image format (PNG, JPEG, etc.)
+            fields: Optional subset of field names to extract
+        
+        Returns:
+            ExtractionResult with extracted data and metadata
+        """
+        start_time = time.time()
+        source = ImageSource.from_bytes(image_bytes, image_format=image_format)
+        return await self._run(source, save_raw_ocr=False, start_time=start_time, fields=fields)
+    
+    async def extract_image(
+        self,
+        image: Union[str, bytes, ImageSource],
+        save_raw_ocr: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """
+        Run the full extraction pipeline on an image in any supported form.
+        
+        Args:
+            image: Image path, raw bytes, binary file-like object or ImageSource
+            save_raw_ocr: Whether to save raw OCR output
+            fields: Optional subset of field names to extract
+        
+        Returns:
+            ExtractionResult with extracted data and metadata
+        """
+        start_time = time.time()
+        source = await asyncio.to_thread(ImageSource.load, image)
+        return await self._run(source, save_raw_ocr=save_raw_ocr, start_time=start_time, fields=fields)
+    
+    async def extract_batch(
+        self,
+        paths_or_bytes: List[Union[str, bytes]],
+        max_concurrency: Optional[int] = None,
+        save_raw_ocr: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> List[BatchItemResult]:
+        """
+        Run the pipeline over many documents on the current event loop.
+        
+        Args:
+            paths_or_bytes: Image file paths and/or raw image bytes (PNG or JPG)
+            max_concurrency: Maximum number of documents in flight at once
+                            (default: DEFAULT_MAX_CONCURRENCY)
+            save_raw_ocr: Whether to save raw OCR output for path inputs
+            fields: Optional subset of field names to extract
+        
+        Returns:
+            List of BatchItemResult in input order, with per-document errors.
+        """
+        if max_concurrency is None:
+            max_concurrency = self.DEFAULT_MAX_CONCURRENCY
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        FieldTypes.select_fields(fields)
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(index: int, item: Union[str, bytes]) -> BatchItemResult:
+            source = "<bytes>" if isinstance(item, (bytes, bytearray)) else str(item)
+            async with semaphore:
+                try:
+                    result = await self.extract_image(item, save_raw_ocr=save_raw_ocr, fields=fields)
+                    return BatchItemResult(index=index, source=source, result=result)
+                except Exception as e:
+                    return BatchItemResult(index=index, source=source, error=e)
+        
+        # gather preserves input order
+        return list(await asyncio.gather(
+            *(run_one(index, item) for index, item in enumerate(paths_or_bytes))
+        ))
+    
+    async def _run(
+        self,
+        source: ImageSource,
+        save_raw_ocr: bool,
+        start_time: float,
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """Run all stages for one image, recording stage timings on the result."""
+        # Reject unknown field names before paying for OCR
+        FieldTypes.select_fields(fields)
+        
+        # Tasks and worker threads started inside inherit this record
+        with collect_timings() as timings:
+            result = await self._run_stages(source, save_raw_ocr, start_time, fields)
+        
+        timings.total = result.processing_time
+        result.timings = timings
+        if self.metrics_sink is not None:
+            try:
+                self.metrics_sink(timings)
+            except Exception as e:
+                # Metrics must never fail an extraction
+                try:
+                    from src.utils import get_logger
+                    get_logger().warning(f"Metrics sink failed: {e}")
+                except ImportError:
+                    pass
+        return result
+    
+    async def _run_stages(
+        self,
+        source: ImageSource,
+        save_raw_ocr: bool,
+        start_time: float,
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """Run OCR, extraction and validation for one image."""
+        # Initialize logging
+        try:
+            from src.utils import setup_logger
+            logger = setup_logger()
+            logger.info("=" * 60)
+            logger.info(f"EXTRACTION PIPELINE (async): {source.name}")
+            logger.info("=" * 60)
+        except ImportError:
+            logger = None
+        
+        # Gap filling replaces the full vision extraction with targeted requests
+        use_vision = bool(
+            self.openai_processor and (self.force_openai or self.openai_processor.use_vision)
+            and not self.gap_filling
+        )
+        
+        # Speculative mode: image-only vision extraction runs while OCR is in flight
+        vision_task = None
+        if use_vision and self.speculative:
+            vision_task = asyncio.create_task(
+                self.openai_processor.extract_from_image_and_ocr_async(
+                    image=source, ocr_result=None, fields=fields
+                )
+            )
+        
+        # Step 2: Google Cloud Vision OCR
+        if logger:
+            logger.info("Step 1: Performing OCR...")
+        try:
+            ocr_result = await self.ocr_client.extract_text_async(
+                image=source,
+                save_raw_output=save_raw_ocr
+            )
+        except BaseException:
+            if vision_task is not None:
+                vision_task.cancel()
+            raise
+        
+        # Step 3: Extraction Strategy
+        used_openai = False
+        
+        # Known form layouts: a trusted template's extraction plan makes the
+        # OpenAI calls unnecessary
+        extractor = None
+        skip_llm = False
+        if self.layout_classifier is not None:
+            extractor = await self._create_extractor(ocr_result, force_openai=self.force_openai)
+            if not self.force_openai:
+                with timed("deterministic"):
+                    layout = await asyncio.to_thread(lambda: extractor.deterministic_extractor.layout)
+                if layout is not None:
+                    if logger:
+                        logger.info(f"Recognized layout: {layout.template.name} (score {layout.score:.2f})")
+                    skip_llm = layout.template.skip_llm
+        
+        if skip_llm:
+            if vision_task is not None:
+                vision_task.cancel()
+            if logger:
+                logger.info("Step 2: Rule-based extraction (known layout)...")
+            schema = await extractor.extract_all_fields_async(fields)
+        elif use_vision:
+            if logger:
+                logger.info("Step 2: OpenAI Vision extraction (image + OCR text)...")
+            try:
+                if vision_task is not None:
+                    schema = await self._reconcile_speculative(await vision_task, ocr_result, logger)
+                else:
+                    schema = await self.openai_processor.extract_from_image_and_ocr_async(
+                        image=source,
+                        ocr_result=ocr_result,
+                        fields=fields,
+                        # Reuse the label matches of a layout check for region crops
+                        extractor=extractor.deterministic_extractor if extractor is not None else None
+                    )
+                used_openai = True
+                if logger:
+                    logger.info("✓ OpenAI Vision extraction complete")
+            except Exception as e:
+                if logger:
+                    logger.warning(f"OpenAI Vision extraction failed: {e}, falling back to deterministic extraction")
+                    logger.info("Step 2: Rule-based extraction (fallback)...")
+                schema = await self._extract_rule_based(ocr_result, force_openai=False, fields=fields)
+        else:
+            if logger:
+                logger.info("Step 2: Rule-based extraction...")
+            if extractor is None:
+                extractor = await self._create_extractor(ocr_result, force_openai=self.force_openai)
+            schema = await extractor.extract_all_fields_async(fields)
+            
+            # Determine if OpenAI was used
+            if self.openai_processor:
+                if self.gap_filling:
+                    used_openai = bool(extractor.filled_gaps)
+                elif self.force_openai:
+                    used_openai = True
+                else:
+                    used_openai = self.openai_processor.should_use_openai(ocr_result)
+        
+        # Step 6: AI Validation and Correction (if validator available)
+        validation_result = None
+        if self.ai_validator:
+            if logger:
+                logger.info("Step 3: AI validation and correction...")
+            try:
+                with timed("validation"):
+                    validation_result = await self.ai_validator.validate_and_correct_async(
+                        schema, ocr_result, allow_ai=not skip_llm
+                    )
+                if validation_result.used_ai or validation_result.used_rules:
+                    schema = validation_result.corrected_schema
+                    if logger:
+                        logger.info(f"  Applied {len(validation_result.corrections_applied)} correction(s)")
+                else:
+                    if logger:
+                        logger.info("  No corrections needed")
+            except Exception as e:
+                if logger:
+                    logger.warning(f"AI validation failed: {e}, using original extraction")
+        
+        # AI corrections return the whole schema; keep only the requested fields
+        if fields is not None:
+            schema = schema.restrict_to(fields)
+        
+        # Step 7: Final Structured Output
+        processing_time = time.time() - start_time
+        
+        if logger:
+            logger.info(f"EXTRACTION COMPLETE (async): {source.name} in {processing_time:.2f}s, used OpenAI: {used_openai}")
+        
+        return ExtractionResult(
+            schema=schema,
+            ocr_result=ocr_result,
+            used_openai=used_openai,
+            confidence_scores=ocr_result.confidence_scores or {},
+            processing_time=processing_time,
+            validation_result=validation_result
+        )
+    
+    async def _extract_rule_based(
+        self,
+        ocr_result: OCRResult,
+        force_openai: bool,
+        fields: Optional[List[str]] = None
+    ) -> InstallmentAgreementSchema:
+        """Run EnhancedExtractor with its index build and rule extraction off the loop."""
+        extractor = await self._create_extractor(ocr_result, force_openai)
+        return await extractor.extract_all_fields_async(fields)
+    
+    async def _create_extractor(self, ocr_result: OCRResult, force_openai: bool) -> EnhancedExtractor:
+        """Create an EnhancedExtractor off the loop (building the word index is CPU-bound)."""
+        return await asyncio.to_thread(
+            EnhancedExtractor,
+            ocr_result=ocr_result,
+            openai_processor=self.openai_processor,
+            force_openai=force_openai,
+            layout_classifier=self.layout_classifier,
+            gap_filling=self.gap_filling
+        )
+    
+    async def _reconcile_speculative(
+        self,
+        schema: InstallmentAgreementSchema,
+        ocr_result: OCRResult,
+        logger
+    ) -> InstallmentAgreementSchema:
+        """Check an image-only extraction against OCR and refine only the fields that disagree."""
+        disagreements = OCRReconciler(ocr_result).unsupported_fields(schema)
+        if not disagreements:
+            if logger:
+                logger.info("  Speculative extraction agrees with OCR text, no follow-up needed")
+            return schema
+        
+        if logger:
+            logger.info(f"  Re-checking {len(disagreements)} field(s) against OCR text: {', '.join(disagreements)}")
+        try:
+            return await self.openai_processor.refine_fields_async(ocr_result, schema, disagreements)
+        except Exception as e:
+            if logger:
+                logger.warning(f"Follow-up refinement failed: {e}, keeping image-only values")
+            return schema
@@ -1,14 +1,20 @@
 """Full extraction pipeline orchestrating OCR, extraction, and post-processing."""
 
 import os
-from typing import Optional, Dict, Any
-from pathlib import Path
+import time
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Union
 
-from src.ocr import VisionOCRClient, OCRResult
+from src.ocr import VisionOCRClient, OCRResult, OCRCache, ImageSource
 from src.extractors import EnhancedExtractor, DeterministicExtractor
-from src.processors import OpenAIProcessor
-from src.schema import InstallmentAgreementSchema
+from src.extractors.layout import LayoutClassifier
+from src.processors import OpenAIProcessor, OCRReconciler, VisionImagePreprocessor, RegionCropper, PromptBudget
+from src.schema import InstallmentAgreementSchema, FieldTypes
 from src.validators import AIValidator
+from src.utils.metrics import ExtractionTimings, MetricsSink, collect_timings, timed
+from src.utils.response_cache import LLMResponseCache
 
 
 class ExtractionResult:
@@ -21,7 +27,8 @@ class ExtractionResult:
         used_openai: bool,
         confidence_scores: Dict[str, Any],
         processing_time: float,
-        validation_result: Optional[Any] = None
+        validation_result: Optional[Any] = None,
+        timings: Optional[ExtractionTimings] = None
     ):
         """
         Initialize extraction result.
@@ -33,6 +40,7 @@ class ExtractionResult:
             confidence_scores: OCR confidence scores
             processing_time: Total processing time in seconds
             validation_result: Optional validation result from AI validator
+            timings: Optional per-stage timing and OpenAI usage record
         """
         self.schema = schema
         self.ocr_result = ocr_result
@@ -40,6 +48,7 @@ class ExtractionResult:
         self.confidence_scores = confidence_scores
         self.processing_time = processing_time
         self.validation_result = validation_result
+        self.timings = timings
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -54,6 +63,10 @@ class ExtractionResult:
             }
         }
         
+        # Add stage timings if recorded
+        if self.timings:
+            result['metadata']['timings'] = self.timings.to_dict()
+        
         # Add validation info if available
         if self.validation_result:
             result['validation'] = self.validation_result.to_dict()
@@ -61,14 +74,69 @@ class ExtractionResult:
         return result
 
 
+class BatchItemResult:
+    """Outcome of a single document in a batch extraction."""
+    
+    def __init__(
+        self,
+        index: int,
+        source: str,
+        result: Optional[ExtractionResult] = None,
+        error: Optional[Exception] = None
+    ):
+        """
+        Initialize batch item result.
+        
+        Args:
+            index: Position of the document in the batch input
+            source: Image path, or "<bytes>" for in-memory images
+            result: Extraction result if the document succeeded
+            error: Exception raised while processing the document, if any
+        """
+        self.index = index
+        self.source = source
+        self.result = result
+        self.error = error
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the document was extracted successfully."""
+        return self.error is None and self.result is not None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'index': self.index,
+            'source': self.source,
+            'result': self.result.to_dict() if self.result else None,
+            'error': f"{type(self.error).__name__}: {self.error}" if self.error else None
+        }
+    
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={type(self.error).__name__}"
+        return f"BatchItemResult(index={self.index}, source='{self.source}', {status})"
+
+
 class ExtractionPipeline:
     """Full extraction pipeline orchestrating all steps."""
     
+    # Default number of documents processed concurrently by extract_batch
+    DEFAULT_BATCH_WORKERS = 4
+    
     def __init__(
         self,
         credentials_path: Optional[str] = None,
         openai_api_key: Optional[str] = None,
-        force_openai: bool = False
+        force_openai: bool = False,
+        ocr_cache: Optional[OCRCache] = None,
+        speculative: bool = False,
+        metrics_sink: Optional[MetricsSink] = None,
+        layout_classifier: Optional[LayoutClassifier] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        image_preprocessor: Optional[VisionImagePreprocessor] = None,
+        region_cropper: Optional[RegionCropper] = None,
+        prompt_budget: Optional[PromptBudget] = None,
+        gap_filling: bool = False
     ):
         """
         Initialize extraction pipeline.
@@ -78,11 +146,35 @@ class ExtractionPipeline:
                             If None, uses GOOGLE_APPLICATION_CREDENTIALS env var.
             openai_api_key: OpenAI API key. If None, uses OPENAI_API_KEY env var.
             force_openai: If True, always use OpenAI regardless of confidence.
+            ocr_cache: Optional OCRCache so repeated scans skip the Vision API.
+            speculative: If True, start the OpenAI Vision extraction (image only) at
+                        the same time as OCR and reconcile it with the OCR text
+                        afterwards. Lowers single-document latency to roughly the
+                        slower of the two calls.
+            metrics_sink: Optional callable receiving each document's ExtractionTimings
+                         (e.g. to export stage latencies and token counts).
+            layout_classifier: Optional LayoutClassifier of known form layouts. Fields of
+                              a recognized form are read from its template's regions;
+                              forms whose template has skip_llm set are extracted
+                              without any OpenAI call (unless force_openai is set).
+            response_cache: Optional LLMResponseCache so re-extracting a document with
+                           unchanged prompts reuses the earlier OpenAI responses.
+            image_preprocessor: Optional VisionImagePreprocessor applied to images before
+                               the OpenAI Vision upload (OCR always sees the original).
+            region_cropper: Optional RegionCropper. The vision request then carries
+                           crops of the sections holding the requested fields
+                           (located from OCR blocks and labels) instead of the page.
+            prompt_budget: Optional PromptBudget. OpenAI prompts then carry only the
+                          OCR lines near field labels, within its token limit.
+            gap_filling: If True, the rule-based path asks OpenAI only for the fields
+                        the deterministic pass left missing, below OCR confidence
+                        or inconsistent, with the OCR lines near their labels,
+                        instead of re-extracting every field.
         """
         # No initialization needed for time
         
         # Initialize OCR client
-        self.ocr_client = VisionOCRClient(credentials_path=credentials_path)
+        self.ocr_client = VisionOCRClient(credentials_path=credentials_path, cache=ocr_cache)
         
         # Initialize OpenAI processor (if available)
         self.openai_processor = None
@@ -93,7 +185,11 @@ class ExtractionPipeline:
                 # Use vision by default for better extraction (image + OCR text)
                 self.openai_processor = OpenAIProcessor(
                     api_key=openai_api_key,
-                    use_vision=True  # Enable vision-based extraction
+                    use_vision=True,  # Enable vision-based extraction
+                    response_cache=response_cache,
+                    image_preprocessor=image_preprocessor,
+                    region_cropper=region_cropper,
+                    prompt_budget=prompt_budget
                 )
             except Exception as e:
                 print(f"Warning: OpenAI processor initialization failed: {e}")
@@ -103,15 +199,74 @@ class ExtractionPipeline:
         self.ai_validator = None
         if openai_api_key or os.getenv("OPENAI_API_KEY"):
             try:
-                self.ai_validator = AIValidator(api_key=openai_api_key)
+                self.ai_validator = AIValidator(api_key=openai_api_key, response_cache=response_cache)
             except Exception as e:
                 # Validator is optional, continue without it
                 pass
+        
+        self.metrics_sink = metrics_sink
+        self.layout_classifier = layout_classifier
+        self.gap_filling = gap_filling
+        
+        # Threads for vision calls that run while OCR is in progress
+        self.speculative = speculative
+        self._speculation_executor = None
+        self._speculation_lock = threading.Lock()
+        if speculative:
+            self._speculation_executor = ThreadPoolExecutor(
+                max_workers=self.DEFAULT_BATCH_WORKERS,
+                thread_name_prefix="speculative-vision"
+            )
+    
+    def close(self) -> None:
+        """Shut down the threads kept for speculative vision calls, waiting for running ones."""
+        # Documents already running keep their futures; new ones skip speculation
+        with self._speculation_lock:
+            executor = self._speculation_executor
+            self._speculation_executor = None
+            self.speculative = False
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def __enter__(self) -> "ExtractionPipeline":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def warm_up(self, timeout: float = 10.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Connect to each backend once so the first extraction does not pay for it.
+        
+        Failures are reported, not raised: extraction still works (or fails with
+        a clearer error) when a backend is unreachable at startup.
+        
+        Args:
+            timeout: Seconds to wait for each backend
+        
+        Returns:
+            Per backend ("vision", "openai"): {'seconds': float, 'error': Optional[str]}
+        """
+        backends = {'vision': self.ocr_client.warm_up}
+        if self.openai_processor:
+            backends['openai'] = self.openai_processor.warm_up
+        
+        report = {}
+        for name, warm_up in backends.items():
+            start = time.perf_counter()
+            error = None
+            try:
+                warm_up(timeout=timeout)
+            except Exception as e:
+                error = str(e)
+            report[name] = {'seconds': time.perf_counter() - start, 'error': error}
+        return report
     
     def extract(
         self,
         image_path: str,
-        save_raw_ocr: bool = False
+        save_raw_ocr: bool = False,
+        fields: Optional[List[str]] = None
     ) -> ExtractionResult:
         """
         Run the full extraction pipeline.
@@ -127,50 +282,310 @@ class ExtractionPipeline:
         Args:
             image_path: Path to image file (PNG or JPG)
             save_raw_ocr: Whether to save raw OCR output
+            fields: Optional subset of field names to extract (e.g.
+                    FieldTypes.TRUTH_IN_LENDING_FIELDS). Rule-based extraction
+                    and the OpenAI prompts cover only these fields; the other
+                    fields of the schema are None.
         
         Returns:
             ExtractionResult with extracted data and metadata
+        
+        Raises:
+            ValueError: If fields contains a name that is not a schema field
         """
-        import time
         start_time = time.time()
         
+        # Step 1: Image Upload (validate and read once)
+        source = ImageSource.from_path(image_path)
+        
+        return self._run(source, save_raw_ocr=save_raw_ocr, start_time=start_time, fields=fields)
+    
+    def extract_from_bytes(
+        self,
+        image_bytes: bytes,
+        image_format: str = "PNG",
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """
+        Extract from image bytes (for use with uploaded files).
+        
+        Args:
+            image_bytes: Image file bytes
+            image_format: Image format (PNG, JPEG, etc.)
+            fields: Optional subset of field names to extract (see extract)
+        
+        Returns:
+            ExtractionResult with extracted data and metadata
+        """
+        start_time = time.time()
+        source = ImageSource.from_bytes(image_bytes, image_format=image_format)
+        return self._run(source, save_raw_ocr=False, start_time=start_time, fields=fields)
+    
+    def extract_image(
+        self,
+        image: Union[str, bytes, ImageSource],
+        save_raw_ocr: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """
+        Run the full extraction pipeline on an image in any supported form.
+        
+        The image is read once into an ImageSource and the same in-memory bytes
+        are shared by OCR, OpenAI Vision and the caches.
+        
+        Args:
+            image: Image path, raw bytes, binary file-like object (e.g. a Streamlit
+                   upload) or ImageSource. The format of bytes is detected from the
+                   file signature.
+            save_raw_ocr: Whether to save raw OCR output
+            fields: Optional subset of field names to extract (see extract)
+        
+        Returns:
+            ExtractionResult with extracted data and metadata
+        """
+        start_time = time.time()
+        source = ImageSource.load(image)
+        return self._run(source, save_raw_ocr=save_raw_ocr, start_time=start_time, fields=fields)
+    
+    def extract_batch(
+        self,
+        paths_or_bytes: List[Union[str, bytes]],
+        max_workers: Optional[int] = None,
+        save_raw_ocr: bool = False,
+        fields: Optional[List[str]] = None
+    ) -> List[BatchItemResult]:
+        """
+        Run the pipeline over many documents concurrently.
+        
+        OCR is done in multi-image Vision requests (see
+        VisionOCRClient.extract_text_batch), one chunk at a time. The remaining
+        stages of each document run on a worker thread while the next chunk is
+        being OCR'd, so the OpenAI round-trips of different documents overlap.
+        At most ``max_workers`` documents are in the post-OCR stages at once,
+        which also bounds the number of concurrent requests sent to OpenAI.
+        
+        Args:
+            paths_or_bytes: Image file paths and/or raw image bytes (PNG or JPG)
+            max_workers: Maximum number of documents processed at once
+                        (default: DEFAULT_BATCH_WORKERS)
+            save_raw_ocr: Whether to save raw OCR output
+            fields: Optional subset of field names to extract (see extract)
+        
+        Returns:
+            List of BatchItemResult in input order. Failures are reported per
+            document via BatchItemResult.error and never abort the batch.
+        """
+        if max_workers is None:
+            max_workers = self.DEFAULT_BATCH_WORKERS
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        FieldTypes.select_fields(fields)
+        
+        items = list(paths_or_bytes)
+        if not items:
+            return []
+        
+        results: List[Optional[BatchItemResult]] = [None] * len(items)
+        futures = {}
+        
+        def run_one(
+            index: int,
+            label: str,
+            source: ImageSource,
+            ocr_result: OCRResult,
+            start_time: float,
+            timings: ExtractionTimings
+        ) -> BatchItemResult:
+            try:
+                result = self._run(
+                    source,
+                    save_raw_ocr=save_raw_ocr,
+                    start_time=start_time,
+                    ocr_result=ocr_result,
+                    timings=timings,
+                    fields=fields
+                )
+                return BatchItemResult(index=index, source=label, result=result)
+            except Exception as e:
+                return BatchItemResult(index=index, source=label, error=e)
+        
+        chunk_size = self.ocr_client.MAX_BATCH_SIZE
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(items)),
+            thread_name_prefix="extract-batch"
+        ) as executor:
+            for chunk_start in range(0, len(items), chunk_size):
+                start_time = time.time()
+                
+                loaded = []
+                for index in range(chunk_start, min(chunk_start + chunk_size, len(items))):
+                    item = items[index]
+                    is_bytes = isinstance(item, (bytes, bytearray))
+                    label = "<bytes>" if is_bytes else str(item)
+                    try:
+                        if is_bytes:
+                            # Distinct names keep saved raw OCR outputs apart
+                            source = ImageSource.from_bytes(item, name=f"batch_{index}")
+                        else:
+                            source = ImageSource.load(item)
+                    except Exception as e:
+                        results[index] = BatchItemResult(index=index, source=label, error=e)
+                        continue
+                    loaded.append((index, label, source))
+                
+                # OCR time is recorded per chunk and attributed to each of its documents
+                with collect_timings() as chunk_timings:
+                    ocr_results = self.ocr_client.extract_text_batch(
+                        [source for _, _, source in loaded],
+                        save_raw_output=save_raw_ocr,
+                        return_exceptions=True
+                    )
+                
+                for (index, label, source), ocr_result in zip(loaded, ocr_results):
+                    if isinstance(ocr_result, Exception):
+                        results[index] = BatchItemResult(index=index, source=label, error=ocr_result)
+                        continue
+                    timings = ExtractionTimings()
+                    timings.merge(chunk_timings)
+                    futures[index] = executor.submit(
+                        run_one, index, label, source, ocr_result, start_time, timings
+                    )
+            
+            for index, future in futures.items():
+                results[index] = future.result()
+        
+        return results
+    
+    def _run(
+        self,
+        source: ImageSource,
+        save_raw_ocr: bool,
+        start_time: float,
+        ocr_result: Optional[OCRResult] = None,
+        timings: Optional[ExtractionTimings] = None,
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """Run all stages for one image, recording stage timings on the result."""
+        # Reject unknown field names before paying for OCR
+        FieldTypes.select_fields(fields)
+        if timings is None:
+            timings = ExtractionTimings()
+        
+        with collect_timings(timings):
+            result = self._run_stages(source, save_raw_ocr, start_time, ocr_result, fields)
+        
+        timings.total = result.processing_time
+        result.timings = timings
+        self._emit_metrics(timings)
+        return result
+    
+    def _emit_metrics(self, timings: ExtractionTimings) -> None:
+        """Pass a document's timings to the metrics sink, if any."""
+        if self.metrics_sink is None:
+            return
+        try:
+            self.metrics_sink(timings)
+        except Exception as e:
+            # Metrics must never fail an extraction
+            try:
+                from src.utils import get_logger
+                get_logger().warning(f"Metrics sink failed: {e}")
+            except ImportError:
+                pass
+    
+    def _run_stages(
+        self,
+        source: ImageSource,
+        save_raw_ocr: bool,
+        start_time: float,
+        ocr_result: Optional[OCRResult],
+        fields: Optional[List[str]] = None
+    ) -> ExtractionResult:
+        """Run OCR (unless already done), extraction and validation for one in-memory image."""
         # Initialize logging
         try:
-            from src.utils import setup_logger, get_logger
+            from src.utils import setup_logger
             logger = setup_logger()
             logger.info("=" * 60)
-            logger.info(f"EXTRACTION PIPELINE: {Path(image_path).name}")
+            logger.info(f"EXTRACTION PIPELINE: {source.name}")
             logger.info("=" * 60)
         except ImportError:
             logger = None
         
-        # Step 1: Image Upload (validate)
-        if not Path(image_path).exists():
-            raise FileNotFoundError(f"Image not found: {image_path}")
+        # Gap filling replaces the full vision extraction with targeted requests
+        use_vision = bool(
+            self.openai_processor and (self.force_openai or self.openai_processor.use_vision)
+            and not self.gap_filling
+        )
         
-        image_ext = Path(image_path).suffix.lower()
-        if image_ext not in ['.png', '.jpg', '.jpeg']:
-            raise ValueError(f"Unsupported image format: {image_ext}. Use PNG or JPG.")
+        # Speculative mode: image-only vision extraction runs while OCR is in flight
+        vision_future = None
+        if use_vision and ocr_result is None:
+            # Submit under the lock so close() cannot shut the executor down in between
+            with self._speculation_lock:
+                if self._speculation_executor is not None:
+                    # Run in a copy of this context so the call is recorded on this document's timings
+                    vision_future = self._speculation_executor.submit(
+                        contextvars.copy_context().run,
+                        self.openai_processor.extract_from_image_and_ocr,
+                        image=source,
+                        ocr_result=None,
+                        fields=fields
+                    )
+            if vision_future is not None and logger:
+                logger.info("Started speculative OpenAI Vision extraction (image only)")
         
         # Step 2: Google Cloud Vision OCR
-        if logger:
-            logger.info("Step 1: Performing OCR...")
-        ocr_result = self.ocr_client.extract_text(
-            image_path=image_path,
-            save_raw_output=save_raw_ocr
-        )
+        if ocr_result is None:
+            if logger:
+                logger.info("Step 1: Performing OCR...")
+            try:
+                ocr_result = self.ocr_client.extract_text(
+                    image=source,
+                    save_raw_output=save_raw_ocr
+                )
+            except BaseException:
+                if vision_future is not None:
+                    vision_future.cancel()
+                raise
         
         # Step 3: Extraction Strategy
         used_openai = False
-        if self.openai_processor and (self.force_openai or self.openai_processor.use_vision):
+        
+        # Known form layouts: check before choosing a strategy, since a trusted
+        # template's extraction plan makes the OpenAI calls unnecessary
+        extractor = None
+        if self.layout_classifier is not None:
+            extractor = EnhancedExtractor(
+                ocr_result=ocr_result,
+                openai_processor=self.openai_processor,
+                force_openai=self.force_openai,
+                layout_classifier=self.layout_classifier,
+                gap_filling=self.gap_filling
+            )
+        skip_llm = self._skips_llm(extractor, logger)
+        
+        if skip_llm:
+            if vision_future is not None:
+                vision_future.cancel()
+            if logger:
+                logger.info("Step 2: Rule-based extraction (known layout)...")
+            schema = extractor.extract_all_fields(fields)
+        elif use_vision:
             # Use OpenAI Vision for direct extraction (image + OCR text)
             if logger:
                 logger.info("Step 2: OpenAI Vision extraction (image + OCR text)...")
             try:
-                schema = self.openai_processor.extract_from_image_and_ocr(
-                    image_path=image_path,
-                    ocr_result=ocr_result
-                )
+                if vision_future is not None:
+                    schema = self._reconcile_speculative(vision_future.result(), ocr_result, logger)
+                else:
+                    schema = self.openai_processor.extract_from_image_and_ocr(
+                        image=source,
+                        ocr_result=ocr_result,
+                        fields=fields,
+                        # Reuse the label matches of a layout check for region crops
+                        extractor=extractor.deterministic_extractor if extractor is not None else None
+                    )
                 used_openai = True
                 if logger:
                     logger.info("✓ OpenAI Vision extraction complete")
@@ -183,26 +598,32 @@ class ExtractionPipeline:
                 extractor = EnhancedExtractor(
                     ocr_result=ocr_result,
                     openai_processor=self.openai_processor,
-                    force_openai=False  # Don't force OpenAI in fallback
+                    force_openai=False,  # Don't force OpenAI in fallback
+                    layout_classifier=self.layout_classifier,
+                    gap_filling=self.gap_filling
                 )
-                schema = extractor.extract_all_fields()
+                schema = extractor.extract_all_fields(fields)
         else:
             # Use deterministic extraction with optional OpenAI enhancement
             if logger:
                 logger.info("Step 2: Rule-based extraction...")
-            extractor = EnhancedExtractor(
-                ocr_result=ocr_result,
-                openai_processor=self.openai_processor,
-                force_openai=self.force_openai
-            )
+            if extractor is None:
+                extractor = EnhancedExtractor(
+                    ocr_result=ocr_result,
+                    openai_processor=self.openai_processor,
+                    force_openai=self.force_openai,
+                    gap_filling=self.gap_filling
+                )
             
             # Step 4 & 5: Confidence Evaluation & Optional OpenAI Post-processing
             # (Handled internally by EnhancedExtractor)
-            schema = extractor.extract_all_fields()
+            schema = extractor.extract_all_fields(fields)
             
             # Determine if OpenAI was used
             if self.openai_processor:
-                if self.force_openai:
+                if self.gap_filling:
+                    used_openai = bool(extractor.filled_gaps)
+                elif self.force_openai:
                     used_openai = True
                 else:
                     used_openai = self.openai_processor.should_use_openai(ocr_result)
@@ -213,8 +634,11 @@ class ExtractionPipeline:
             if logger:
                 logger.info("Step 3: AI validation and correction...")
             try:
-                validation_result = self.ai_validator.validate_and_correct(schema, ocr_result)
-                if validation_result.used_ai:
+                with timed("validation"):
+                    validation_result = self.ai_validator.validate_and_correct(
+                        schema, ocr_result, allow_ai=not skip_llm
+                    )
+                if validation_result.used_ai or validation_result.used_rules:
                     schema = validation_result.corrected_schema
                     if logger:
                         logger.info(f"  Applied {len(validation_result.corrections_applied)} correction(s)")
@@ -229,6 +653,10 @@ class ExtractionPipeline:
                 if logger:
                     logger.warning(f"AI validation failed: {e}, using original extraction")
         
+        # AI corrections return the whole schema; keep only the requested fields
+        if fields is not None:
+            schema = schema.restrict_to(fields)
+        
         # Step 7: Final Structured Output
         processing_time = time.time() - start_time
         
@@ -238,7 +666,7 @@ class ExtractionPipeline:
             logger.info("=" * 60)
             logger.info(f"Processing time: {processing_time:.2f}s")
             logger.info(f"Used OpenAI: {used_openai}")
-            if validation_result and validation_result.used_ai:
+            if validation_result and (validation_result.used_ai or validation_result.used_rules):
                 logger.info(f"AI Validation: Applied {len(validation_result.corrections_applied)} correction(s)")
             logger.info("=" * 60)
         
@@ -251,158 +679,36 @@ class ExtractionPipeline:
             validation_result=validation_result
         )
     
-    def extract_from_bytes(
+    def _skips_llm(self, extractor: Optional[EnhancedExtractor], logger) -> bool:
+        """Whether a document matched a known layout whose template is trusted without OpenAI."""
+        if extractor is None or self.force_openai:
+            return False
+        with timed("deterministic"):
+            layout = extractor.deterministic_extractor.layout
+        if layout is None:
+            return False
+        if logger:
+            logger.info(f"Recognized layout: {layout.template.name} (score {layout.score:.2f})")
+        return layout.template.skip_llm
+    
+    def _reconcile_speculative(
         self,
-        image_bytes: bytes,
-        image_format: str = "PNG"
-    ) -> ExtractionResult:
-        """
-        Extract from image bytes (for use with uploaded files).
-        
-        Args:
-            image_bytes: Image file bytes
-            image_format: Image format (PNG, JPEG, etc.)
-        
-        Returns:
-            ExtractionResult with extracted data and metadata
-        """
-        import tempfile
-        import time
-        
-        start_time = time.time()
-        
-        # Initialize logging
-        try:
-            from src.utils import setup_logger, get_logger
-            logger = setup_logger()
-            logger.info("=" * 60)
-            logger.info("EXTRACTION PIPELINE: (from bytes)")
-            logger.info("=" * 60)
-        except ImportError:
-            logger = None
-        
-        # Step 1: Save to temp file for OCR
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{image_format.lower()}') as tmp_file:
-            tmp_file.write(image_bytes)
-            tmp_path = tmp_file.name
-        
-        try:
-            # Step 2: Google Cloud Vision OCR
-            if logger:
-                logger.info("Step 1: Performing OCR...")
-            ocr_result = self.ocr_client.extract_text(
-                image_path=tmp_path,
-                save_raw_output=False
-            )
-            
-            # Step 3: Extraction Strategy
-            used_openai = False
-            if self.openai_processor and (self.force_openai or self.openai_processor.use_vision):
-                # Use OpenAI Vision for direct extraction (image + OCR text)
-                if logger:
-                    logger.info("Step 2: OpenAI Vision extraction (image + OCR text)...")
-                try:
-                    schema = self.openai_processor.extract_from_image_and_ocr(
-                        image_bytes=image_bytes,
-                        image_format=image_format,
-                        ocr_result=ocr_result
-                    )
-                    used_openai = True
-                    if logger:
-                        logger.info("✓ OpenAI Vision extraction complete")
-                except Exception as e:
-                    if logger:
-                        logger.warning(f"OpenAI Vision extraction failed: {e}, falling back to deterministic extraction")
-                    # Fall back to deterministic extraction
-                    if logger:
-                        logger.info("Step 2: Rule-based extraction (fallback)...")
-                    extractor = EnhancedExtractor(
-                        ocr_result=ocr_result,
-                        openai_processor=self.openai_processor,
-                        force_openai=False  # Don't force OpenAI in fallback
-                    )
-                    schema = extractor.extract_all_fields()
-            else:
-                # Use deterministic extraction with optional OpenAI enhancement
-                if logger:
-                    logger.info("Step 2: Rule-based extraction...")
-                extractor = EnhancedExtractor(
-                    ocr_result=ocr_result,
-                    openai_processor=self.openai_processor,
-                    force_openai=self.force_openai
-                )
-                
-                # Step 4 & 5: Confidence Evaluation & Optional OpenAI Post-processing
-                # (Handled internally by EnhancedExtractor)
-                schema = extractor.extract_all_fields()
-                
-                # Determine if OpenAI was used
-                if self.openai_processor:
-                    if self.force_openai:
-                        used_openai = True
-                    else:
-                        used_openai = self.openai_processor.should_use_openai(ocr_result)
-            
-            # Step 6: AI Validation and Correction (if validator available)
-            validation_result = None
-            if self.ai_validator:
-                if logger:
-                    logger.info("Step 3: AI validation and correction...")
-                try:
-                    validation_result = self.ai_validator.validate_and_correct(schema, ocr_result)
-                    if validation_result.used_ai:
-                        schema = validation_result.corrected_schema
-                        if logger:
-                            logger.info(f"  Applied {len(validation_result.corrections_applied)} correction(s)")
-                            for correction in validation_result.corrections_applied:
-                                logger.info(f"    - {correction}")
-                            if validation_result.issues_found:
-                                logger.info(f"  Found {len(validation_result.issues_found)} issue(s)")
-                    else:
-                        if logger:
-                            logger.info("  No corrections needed")
-                except Exception as e:
-                    if logger:
-                        logger.warning(f"AI validation failed: {e}, using original extraction")
-            
-            # Step 7: Final Structured Output
-            processing_time = time.time() - start_time
-            
+        schema: InstallmentAgreementSchema,
+        ocr_result: OCRResult,
+        logger
+    ) -> InstallmentAgreementSchema:
+        """Check an image-only extraction against OCR and refine only the fields that disagree."""
+        disagreements = OCRReconciler(ocr_result).unsupported_fields(schema)
+        if not disagreements:
             if logger:
-                logger.info("=" * 60)
-                logger.info("EXTRACTION COMPLETE")
-                logger.info("=" * 60)
-                logger.info(f"Processing time: {processing_time:.2f}s")
-                logger.info(f"Used OpenAI: {used_openai}")
-                if validation_result and validation_result.used_ai:
-                    logger.info(f"AI Validation: Applied {len(validation_result.corrections_applied)} correction(s)")
-                logger.info("=" * 60)
-            
-            return ExtractionResult(
-                schema=schema,
-                ocr_result=ocr_result,
-                used_openai=used_openai,
-                confidence_scores=ocr_result.confidence_scores or {},
-                processing_time=processing_time,
-                validation_result=validation_result
-            )
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        
-        # Save to temporary file
-        suffix = '.png' if image_format.upper() == 'PNG' else '.jpg'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            tmp_file.write(image_bytes)
-            tmp_path = tmp_file.name
+                logger.info("  Speculative extraction agrees with OCR text, no follow-up needed")
+            return schema
         
+        if logger:
+            logger.info(f"  Re-checking {len(disagreements)} field(s) against OCR text: {', '.join(disagreements)}")
         try:
-            result = self.extract(tmp_path, save_raw_ocr=False)
-            return result
-        finally:
-            # Clean up temporary file
-            Path(tmp_path).unlink(missing_ok=True)
-
+            return self.openai_processor.refine_fields(ocr_result, schema, disagreements)
+        except Exception as e:
+            if logger:
+                logger.warning(f"Follow-up refinement failed: {e}, keeping image-only values")
+            return schema
@@ -1,6 +1,15 @@
 """Text processing and normalization modules."""
 
 from .openai_processor import OpenAIProcessor
+from .ocr_reconciler import OCRReconciler
+from .image_preprocessor import VisionImagePreprocessor, ImagePreprocessReport, estimate_vision_tokens
+from .region_cropper import RegionCropper, RegionCrops, CropRegion
+from .prompt_budget import PromptBudget, count_tokens
 
-__all__ = ['OpenAIProcessor']
+__all__ = [
+    'OpenAIProcessor', 'OCRReconciler',
+    'VisionImagePreprocessor', 'ImagePreprocessReport', 'estimate_vision_tokens',
+    'RegionCropper', 'RegionCrops', 'CropRegion',
+    'PromptBudget', 'count_tokens'
+]
 
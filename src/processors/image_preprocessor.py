@@ -0,0 +1,241 @@
+"""Downscaling and re-encoding of images before OpenAI Vision upload."""
+
+import io
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from src.ocr import ImageSource
+
+
+def estimate_vision_tokens(width: int, height: int, detail: str = "high") -> int:
+    """
+    Estimate the input tokens OpenAI Vision bills for an image.
+    
+    High-detail images are scaled to fit 2048x2048, then so that the shorter
+    side is at most 768 px, and billed 85 tokens plus 170 per 512 px tile.
+    These are gpt-4o's rates; other models (e.g. gpt-4o-mini) multiply both by
+    a constant, so relative savings are the same.
+    
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        detail: "high" or "low" (low detail is a flat 85 tokens)
+    
+    Returns:
+        Estimated image tokens
+    """
+    if detail == "low":
+        return 85
+    
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
+
+
+class ImagePreprocessReport:
+    """Sizes of an image before and after preprocessing."""
+    
+    __slots__ = (
+        'applied', 'original_bytes', 'upload_bytes', 'original_size', 'upload_size',
+        'original_tokens', 'upload_tokens'
+    )
+    
+    def __init__(
+        self,
+        applied: bool,
+        original_bytes: int,
+        upload_bytes: int,
+        original_size: Tuple[int, int],
+        upload_size: Tuple[int, int],
+        original_tokens: int,
+        upload_tokens: int
+    ):
+        """
+        Initialize report.
+        
+        Args:
+            applied: Whether the preprocessed image replaced the original
+            original_bytes: Size of the original file
+            upload_bytes: Size of the file sent to OpenAI
+            original_size: (width, height) of the original
+            upload_size: (width, height) of the image sent to OpenAI
+            original_tokens: Estimated image tokens of the original
+            upload_tokens: Estimated image tokens of the image sent to OpenAI
+        """
+        self.applied = applied
+        self.original_bytes = original_bytes
+        self.upload_bytes = upload_bytes
+        self.original_size = original_size
+        self.upload_size = upload_size
+        self.original_tokens = original_tokens
+        self.upload_tokens = upload_tokens
+    
+    @property
+    def bytes_saved(self) -> int:
+        """Upload bytes saved (base64 adds another third on the wire)."""
+        return self.original_bytes - self.upload_bytes
+    
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated image tokens saved."""
+        return self.original_tokens - self.upload_tokens
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'applied': self.applied,
+            'original_bytes': self.original_bytes,
+            'upload_bytes': self.upload_bytes,
+            'bytes_saved': self.bytes_saved,
+            'original_size': list(self.original_size),
+            'upload_size': list(self.upload_size),
+            'original_tokens': self.original_tokens,
+            'upload_tokens': self.upload_tokens,
+            'tokens_saved': self.tokens_saved
+        }
+    
+    def __repr__(self) -> str:
+        return (
+            f"ImagePreprocessReport(bytes={self.original_bytes}->{self.upload_bytes}, "
+            f"tokens={self.original_tokens}->{self.upload_tokens})"
+        )
+
+
+class VisionImagePreprocessor:
+    """
+    Shrink images before they are sent to OpenAI Vision.
+    
+    Phone photos of agreements are several megabytes of PNG, all of which is
+    base64-encoded into the request. The image is resized so its long edge is
+    at most max_long_edge, optionally converted to grayscale, and re-encoded as
+    JPEG. With the default long edge nothing the model sees is lost: OpenAI
+    scales high-detail images to fit 2048x2048 before tiling anyway.
+    
+    OCR still runs on the original bytes; only the vision upload is affected.
+    """
+    
+    DEFAULT_MAX_LONG_EDGE = 2048
+    DEFAULT_JPEG_QUALITY = 85
+    
+    def __init__(
+        self,
+        max_long_edge: Optional[int] = DEFAULT_MAX_LONG_EDGE,
+        grayscale: bool = False,
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY
+    ):
+        """
+        Initialize preprocessor.
+        
+        Args:
+            max_long_edge: Maximum width or height in pixels (None: keep the size).
+                           Values below 768 also lower the image token count.
+            grayscale: If True, drop color (smaller files; agreements are printed text)
+            jpeg_quality: JPEG quality, 1-95
+        """
+        if max_long_edge is not None and max_long_edge <= 0:
+            raise ValueError("max_long_edge must be positive")
+        if not 1 <= jpeg_quality <= 95:
+            raise ValueError("jpeg_quality must be between 1 and 95")
+        
+        self.max_long_edge = max_long_edge
+        self.grayscale = grayscale
+        self.jpeg_quality = jpeg_quality
+    
+    def prepare(self, image: ImageSource) -> Tuple[ImageSource, ImagePreprocessReport]:
+        """
+        Downscale and re-encode an image for upload.
+        
+        If the result would not be smaller than the original (e.g. an already
+        small JPEG), the original image is returned unchanged.
+        
+        Args:
+            image: Image as read from the upload or file
+        
+        Returns:
+            Tuple of (image to upload, report of the savings)
+        """
+        with Image.open(io.BytesIO(image.data)) as img:
+            # Re-encoding drops EXIF, so apply the camera's rotation first
+            img = ImageOps.exif_transpose(img)
+            original_size = img.size
+            data, size = self.encode(img)
+        
+        original_tokens = estimate_vision_tokens(*original_size)
+        if len(data) >= image.size_bytes:
+            return image, ImagePreprocessReport(
+                applied=False,
+                original_bytes=image.size_bytes,
+                upload_bytes=image.size_bytes,
+                original_size=original_size,
+                upload_size=original_size,
+                original_tokens=original_tokens,
+                upload_tokens=original_tokens
+            )
+        
+        prepared = ImageSource(data=data, image_format='JPEG', name=image.name)
+        return prepared, ImagePreprocessReport(
+            applied=True,
+            original_bytes=image.size_bytes,
+            upload_bytes=len(data),
+            original_size=original_size,
+            upload_size=size,
+            original_tokens=original_tokens,
+            upload_tokens=estimate_vision_tokens(*size)
+        )
+    
+    def encode(self, img: Image.Image) -> Tuple[bytes, Tuple[int, int]]:
+        """
+        Resize, convert and JPEG-encode a decoded image.
+        
+        Args:
+            img: PIL image (e.g. a crop of the page)
+        
+        Returns:
+            Tuple of (JPEG bytes, (width, height) of the encoded image)
+        """
+        img = self._convert(self._resize(img))
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=self.jpeg_quality, optimize=True)
+        return buffer.getvalue(), img.size
+    
+    def _resize(self, img: Image.Image) -> Image.Image:
+        """Scale down so the long edge fits max_long_edge."""
+        width, height = img.size
+        if self.max_long_edge is None or max(width, height) <= self.max_long_edge:
+            return img
+        
+        scale = self.max_long_edge / max(width, height)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return img.resize(size, Image.Resampling.LANCZOS)
+    
+    def _convert(self, img: Image.Image) -> Image.Image:
+        """Convert to a mode JPEG can store (L or RGB)."""
+        if self.grayscale:
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = self._flatten(img)
+            return img.convert('L')
+        if img.mode in ('RGBA', 'LA', 'P'):
+            return self._flatten(img)
+        if img.mode not in ('L', 'RGB'):
+            return img.convert('RGB')
+        return img
+    
+    @staticmethod
+    def _flatten(img: Image.Image) -> Image.Image:
+        """Composite transparent pixels onto white."""
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    
+    def __repr__(self) -> str:
+        return (
+            f"VisionImagePreprocessor(max_long_edge={self.max_long_edge}, "
+            f"grayscale={self.grayscale}, jpeg_quality={self.jpeg_quality})"
+        )
@@ -0,0 +1,90 @@
+"""Local agreement check between LLM-extracted values and OCR text."""
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import List, Set
+
+from src.ocr import OCRResult
+from src.schema import InstallmentAgreementSchema
+
+
+class OCRReconciler:
+    """
+    Check which extracted values are supported by the OCR text.
+    
+    Used by speculative extraction: the image-only vision call runs in parallel
+    with OCR, and once OCR is available each value it returned is looked up in
+    the OCR text. Only fields whose values cannot be found need a follow-up
+    OpenAI call.
+    """
+    
+    # Fields compared as numbers
+    NUMERIC_FIELDS = {
+        'quantity', 'number_of_payments', 'amount_financed', 'finance_charge',
+        'apr', 'total_of_payments', 'amount_of_payments'
+    }
+    
+    # Fields compared by their digits
+    PHONE_FIELDS = {
+        'seller_phone_number', 'buyer_phone_number', 'co_buyer_phone_number', 'phone_number'
+    }
+    
+    NUMBER_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+    PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[\s.\-]*\d{3}[\s.\-]*\d{4}')
+    TOKEN_PATTERN = re.compile(r'[A-Z0-9]+')
+    
+    def __init__(self, ocr_result: OCRResult):
+        """
+        Initialize reconciler.
+        
+        Args:
+            ocr_result: OCR result whose text values are checked against
+        """
+        text = ocr_result.full_text or ""
+        self.tokens: Set[str] = set(self.TOKEN_PATTERN.findall(text.upper()))
+        self.numbers: Set[Decimal] = set()
+        for match in self.NUMBER_PATTERN.findall(text):
+            number = self._to_decimal(match)
+            if number is not None:
+                self.numbers.add(number)
+        self.phones: Set[str] = {
+            re.sub(r'\D', '', match) for match in self.PHONE_PATTERN.findall(text)
+        }
+    
+    def unsupported_fields(self, schema: InstallmentAgreementSchema) -> List[str]:
+        """
+        List fields whose extracted values do not appear in the OCR text.
+        
+        Args:
+            schema: Extracted schema to check
+        
+        Returns:
+            Names of non-null fields not supported by the OCR text
+        """
+        unsupported = []
+        for field_name, value in schema.model_dump().items():
+            if value is None:
+                continue
+            if not self.supports(field_name, value):
+                unsupported.append(field_name)
+        return unsupported
+    
+    def supports(self, field_name: str, value) -> bool:
+        """Whether the OCR text contains the value of a field."""
+        if field_name in self.NUMERIC_FIELDS:
+            number = self._to_decimal(str(value))
+            return number is not None and number in self.numbers
+        
+        if field_name in self.PHONE_FIELDS:
+            return re.sub(r'\D', '', str(value)) in self.phones
+        
+        value_tokens = self.TOKEN_PATTERN.findall(str(value).upper())
+        return all(token in self.tokens for token in value_tokens)
+    
+    @staticmethod
+    def _to_decimal(text: str):
+        """Parse a number such as '3,644.28' or '21', or None."""
+        try:
+            return Decimal(text.replace(',', '').replace('$', '').replace('%', ''))
+        except InvalidOperation:
+            return None
@@ -2,18 +2,26 @@
 
 import os
 import json
-from typing import Dict, List, Optional, Any
+import asyncio
+from typing import Dict, List, Optional, Any, Tuple
 from decimal import Decimal
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
+    AsyncOpenAI = None
 
-from src.ocr import OCRResult
-from src.schema import InstallmentAgreementSchema
+from src.ocr import OCRResult, ImageSource
+from src.schema import InstallmentAgreementSchema, FieldTypes
+from src.utils.metrics import timed, record_image_upload, record_prompt_compaction
+from src.utils.response_cache import LLMResponseCache, call_openai_cached, call_openai_cached_async
+from src.utils.client_registry import get_openai_client, get_async_openai_client
+from .image_preprocessor import VisionImagePreprocessor
+from .region_cropper import RegionCropper, RegionCrops
+from .prompt_budget import PromptBudget, compact_json
 
 
 class OpenAIProcessor:
@@ -24,7 +32,47 @@ class OpenAIProcessor:
     LOW_WORD_CONFIDENCE_THRESHOLD = 0.80  # Use OpenAI if min word confidence below this
     LOW_CONFIDENCE_WORD_RATIO = 0.20  # Use OpenAI if more than 20% of words below threshold
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", use_vision: bool = True):
+    # Refinement and gap-filling prompts always carry only the OCR lines near
+    # the fields' labels; this budget applies when prompt_budget is not set
+    LABEL_CONTEXT_BUDGET = PromptBudget(max_prompt_tokens=PromptBudget.DEFAULT_MAX_PROMPT_TOKENS)
+    
+    # Output format of each field in the JSON structure the prompts ask for
+    # (legacy fields are only listed when requested explicitly)
+    DEFAULT_FIELD_FORMAT = '"string or null"'
+    FIELD_FORMATS = {
+        'seller_name': '"string or null"',
+        'seller_address': '"string or null"',
+        'seller_city': '"string or null"',
+        'seller_state': '"string or null (e.g., PA, SC)"',
+        'seller_zip_code': '"string or null"',
+        'seller_phone_number': '"string or null (format: XXX-XXX-XXXX)"',
+        'buyer_name': '"string or null"',
+        'buyer_address': '"string or null"',
+        'buyer_phone_number': '"string or null (format: XXX-XXX-XXXX)"',
+        'co_buyer_name': '"string or null"',
+        'co_buyer_address': '"string or null"',
+        'co_buyer_phone_number': '"string or null (format: XXX-XXX-XXXX)"',
+        'quantity': 'integer or null',
+        'items_purchased': '"string or null"',
+        'make_or_model': '"string or null (use null for N/A)"',
+        'amount_financed': 'number or null (decimal, no $ or commas)',
+        'finance_charge': 'number or null (decimal, no $ or commas)',
+        'apr': 'number or null (decimal, no % symbol)',
+        'total_of_payments': 'number or null (decimal, no $ or commas)',
+        'number_of_payments': 'integer or null',
+        'amount_of_payments': 'number or null (decimal, no $ or commas)',
+    }
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        use_vision: bool = True,
+        response_cache: Optional[LLMResponseCache] = None,
+        image_preprocessor: Optional[VisionImagePreprocessor] = None,
+        region_cropper: Optional[RegionCropper] = None,
+        prompt_budget: Optional[PromptBudget] = None
+    ):
         """
         Initialize OpenAI processor.
         
@@ -32,6 +80,18 @@ class OpenAIProcessor:
             api_key: OpenAI API key. If None, uses OPENAI_API_KEY env var.
             model: OpenAI model to use (default: gpt-4o-mini, supports vision)
             use_vision: If True, use vision model to analyze image directly (default: True)
+            response_cache: Optional LLMResponseCache so identical requests (same model,
+                            prompts and image) are answered without calling OpenAI
+            image_preprocessor: Optional VisionImagePreprocessor that downscales and
+                                re-encodes images before they are uploaded
+            region_cropper: Optional RegionCropper. When OCR geometry is available,
+                            only crops of the sections holding the requested fields
+                            are uploaded instead of the full page.
+            prompt_budget: Optional PromptBudget. Prompts then carry only the OCR
+                           lines near field labels and compact JSON, within the
+                           budget's token limit. Refinement and gap-filling prompts
+                           are cut to label lines either way, with
+                           LABEL_CONTEXT_BUDGET if this is None.
         
         Raises:
             ImportError: If openai package is not installed
@@ -44,9 +104,31 @@ class OpenAIProcessor:
         if not self.api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY env var or pass api_key parameter.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        # Shared per process so every pipeline reuses one HTTP connection pool
+        self.client = get_openai_client(self.api_key)
         self.model = model
         self.use_vision = use_vision
+        self.response_cache = response_cache
+        self.image_preprocessor = image_preprocessor
+        self.region_cropper = region_cropper
+        self.prompt_budget = prompt_budget
+    
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        """Shared AsyncOpenAI client for the running event loop."""
+        return get_async_openai_client(self.api_key)
+    
+    def warm_up(self, timeout: float = 10.0) -> None:
+        """
+        Open a connection to the OpenAI API ahead of the first document.
+        
+        Retrieves the configured model, which is free and also checks the API key.
+        The connection stays in the shared pool used by the validator as well.
+        
+        Args:
+            timeout: Seconds to wait for the call
+        """
+        self.client.models.retrieve(self.model, timeout=timeout)
     
     def should_use_openai(self, ocr_result: OCRResult) -> bool:
         """
@@ -96,7 +178,10 @@ class OpenAIProcessor:
         image_path: Optional[str] = None,
         image_bytes: Optional[bytes] = None,
         image_format: Optional[str] = None,
-        ocr_result: OCRResult = None
+        ocr_result: OCRResult = None,
+        image: Optional[ImageSource] = None,
+        fields: Optional[List[str]] = None,
+        extractor=None
     ) -> InstallmentAgreementSchema:
         """
         Extract all fields directly from image and OCR text using OpenAI Vision.
@@ -108,106 +193,104 @@ class OpenAIProcessor:
             image_bytes: Image file bytes (if provided instead of image_path)
             image_format: Image format (PNG, JPEG) - required if image_bytes provided
             ocr_result: OCR result from Google Cloud Vision
+            image: In-memory ImageSource (preferred; reuses the already-read bytes
+                   and their cached base64 encoding)
+            fields: Optional subset of field names to extract. Only these fields
+                    are requested in the output JSON; the others are left as None.
+            extractor: Optional DeterministicExtractor over ocr_result, reused to
+                       locate the sections cropped by region_cropper and the
+                       label lines kept by prompt_budget
         
         Returns:
             InstallmentAgreementSchema with extracted values
         """
-        import base64
-        from pathlib import Path
-        
-        # Read and encode image
-        if image_path:
-            with open(image_path, "rb") as image_file:
-                image_data = base64.b64encode(image_file.read()).decode('utf-8')
-            # Determine image format
-            image_ext = Path(image_path).suffix.lower()
-            if image_ext == '.png':
-                mime_type = 'image/png'
-            elif image_ext in ['.jpg', '.jpeg']:
-                mime_type = 'image/jpeg'
-            else:
-                mime_type = 'image/png'  # Default
-        elif image_bytes:
-            image_data = base64.b64encode(image_bytes).decode('utf-8')
-            if image_format:
-                mime_type = f'image/{image_format.lower()}'
-            else:
-                mime_type = 'image/png'  # Default
-        else:
-            raise ValueError("Either image_path or image_bytes must be provided")
-        
-        # Build prompt with OCR text and instructions
-        prompt = self._build_vision_prompt(ocr_result)
-        
-        # Log OpenAI request
-        try:
-            from src.utils import get_logger, log_openai_request
-            logger = get_logger()
-            log_openai_request(logger, prompt, self.model, redact=True)
-        except ImportError:
-            logger = None
+        source = self._resolve_image(image_path, image_bytes, image_format, image)
+        extractor = self._resolve_extractor(ocr_result, extractor)
+        crops = self._crop_regions(source, ocr_result, fields, extractor)
+        if crops is None:
+            source = self._prepare_upload(source)
+        messages, logger = self._prepare_vision_request(source, ocr_result, fields, crops, extractor)
         
         # Call OpenAI Vision API
-        response = self.client.chat.completions.create(
+        response = call_openai_cached(
+            self.response_cache,
+            "vision_extraction",
+            self.client.chat.completions.create,
+            image_digest=crops.digest if crops else source.sha256,
             model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._get_system_prompt()
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{mime_type};base64,{image_data}"
-                            }
-                        }
-                    ]
-                }
-            ],
+            messages=messages,
             temperature=0.0,  # Deterministic output
             response_format={"type": "json_object"}  # Force JSON output
         )
         
-        # Parse response
-        response_text = response.choices[0].message.content.strip()
+        response_data = self._parse_json_response(response, logger)
         
-        # Log OpenAI response
-        if logger:
-            try:
-                from src.utils import log_openai_response
-                log_openai_response(logger, response_text, redact=True)
-            except ImportError:
-                pass
+        # Create schema from response
+        return self._parse_openai_response(response_data, InstallmentAgreementSchema(), fields)
+    
+    async def extract_from_image_and_ocr_async(
+        self,
+        image_path: Optional[str] = None,
+        image_bytes: Optional[bytes] = None,
+        image_format: Optional[str] = None,
+        ocr_result: OCRResult = None,
+        image: Optional[ImageSource] = None,
+        fields: Optional[List[str]] = None,
+        extractor=None
+    ) -> InstallmentAgreementSchema:
+        """
+        Async variant of extract_from_image_and_ocr using AsyncOpenAI.
         
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
+        Args:
+            image_path: Path to the image file (if provided)
+            image_bytes: Image file bytes (if provided instead of image_path)
+            image_format: Image format (PNG, JPEG) - required if image_bytes provided
+            ocr_result: OCR result from Google Cloud Vision
+            image: In-memory ImageSource (preferred; reuses the already-read bytes
+                   and their cached base64 encoding)
+            fields: Optional subset of field names to extract. Only these fields
+                    are requested in the output JSON; the others are left as None.
+            extractor: Optional DeterministicExtractor over ocr_result, reused to
+                       locate the sections cropped by region_cropper and the
+                       label lines kept by prompt_budget
         
-        try:
-            response_data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"OpenAI returned invalid JSON: {e}\nResponse text: {response_text[:500]}")
+        Returns:
+            InstallmentAgreementSchema with extracted values
+        """
+        # Reading, resizing and base64-encoding a multi-megabyte image is blocking work
+        source = await asyncio.to_thread(
+            self._resolve_image, image_path, image_bytes, image_format, image
+        )
+        # Building a DeterministicExtractor (word table, indexes) is CPU-bound
+        extractor = await asyncio.to_thread(self._resolve_extractor, ocr_result, extractor)
+        crops = await asyncio.to_thread(self._crop_regions, source, ocr_result, fields, extractor)
+        if crops is None:
+            source = await asyncio.to_thread(self._prepare_upload, source)
+        messages, logger = await asyncio.to_thread(
+            self._prepare_vision_request, source, ocr_result, fields, crops, extractor
+        )
         
-        # Create schema from response
-        return self._parse_openai_response(response_data, InstallmentAgreementSchema())
+        response = await call_openai_cached_async(
+            self.response_cache,
+            "vision_extraction",
+            self.async_client.chat.completions.create,
+            image_digest=crops.digest if crops else source.sha256,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        return self._parse_openai_response(response_data, InstallmentAgreementSchema(), fields)
     
     def improve_extraction(
         self,
         ocr_result: OCRResult,
         initial_schema: InstallmentAgreementSchema,
-        candidate_values: Optional[Dict[str, List[str]]] = None
+        candidate_values: Optional[Dict[str, List[str]]] = None,
+        fields: Optional[List[str]] = None,
+        extractor=None
     ) -> InstallmentAgreementSchema:
         """
         Use OpenAI to improve extraction quality.
@@ -216,13 +299,348 @@ class OpenAIProcessor:
             ocr_result: OCR result with full text
             initial_schema: Initial extraction from deterministic extractor
             candidate_values: Optional dict of field_name -> list of candidate values
+            fields: Optional subset of field names to extract
+            extractor: Optional DeterministicExtractor over ocr_result, reused to
+                       find the label lines kept by prompt_budget
         
         Returns:
             Improved InstallmentAgreementSchema
         """
-        # Prepare prompt
-        prompt = self._build_prompt(ocr_result, initial_schema, candidate_values)
+        messages, logger = self._prepare_improve_request(
+            ocr_result, initial_schema, candidate_values, fields, extractor
+        )
+        
+        # Call OpenAI
+        response = call_openai_cached(
+            self.response_cache,
+            "improve_extraction",
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        
+        # Validate and create schema
+        return self._parse_openai_response(response_data, initial_schema, fields)
+    
+    async def improve_extraction_async(
+        self,
+        ocr_result: OCRResult,
+        initial_schema: InstallmentAgreementSchema,
+        candidate_values: Optional[Dict[str, List[str]]] = None,
+        fields: Optional[List[str]] = None,
+        extractor=None
+    ) -> InstallmentAgreementSchema:
+        """
+        Async variant of improve_extraction using AsyncOpenAI.
+        
+        Args:
+            ocr_result: OCR result with full text
+            initial_schema: Initial extraction from deterministic extractor
+            candidate_values: Optional dict of field_name -> list of candidate values
+            fields: Optional subset of field names to extract
+            extractor: Optional DeterministicExtractor over ocr_result, reused to
+                       find the label lines kept by prompt_budget
+        
+        Returns:
+            Improved InstallmentAgreementSchema
+        """
+        # Label matching and token counting for a prompt budget are CPU-bound
+        messages, logger = await asyncio.to_thread(
+            self._prepare_improve_request, ocr_result, initial_schema, candidate_values, fields, extractor
+        )
+        
+        response = await call_openai_cached_async(
+            self.response_cache,
+            "improve_extraction",
+            self.async_client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        return self._parse_openai_response(response_data, initial_schema, fields)
+    
+    def refine_fields(
+        self,
+        ocr_result: OCRResult,
+        schema: InstallmentAgreementSchema,
+        fields: List[str],
+        extractor=None
+    ) -> InstallmentAgreementSchema:
+        """
+        Re-check a few fields of an image-only extraction against the OCR text.
+        
+        Used by speculative extraction for the fields OCRReconciler could not
+        match. This is a small text-only request: only the listed fields are
+        asked for and merged back, all other values are kept. The prompt
+        carries the OCR lines near those fields' labels, not the whole page.
+        
+        Args:
+            ocr_result: OCR result with full text
+            schema: Schema from the image-only vision extraction
+            fields: Names of the fields to re-check
+            extractor: DeterministicExtractor over ocr_result (built if None)
+        
+        Returns:
+            InstallmentAgreementSchema with the listed fields refined
+        """
+        messages, logger = self._prepare_refine_request(ocr_result, schema, fields, extractor)
+        
+        response = call_openai_cached(
+            self.response_cache,
+            "refine_fields",
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        # Text-only refinement may miss what the image showed; null keeps the vision value
+        return self._merge_fields(schema, response_data, fields, keep_existing=True)
+    
+    async def refine_fields_async(
+        self,
+        ocr_result: OCRResult,
+        schema: InstallmentAgreementSchema,
+        fields: List[str],
+        extractor=None
+    ) -> InstallmentAgreementSchema:
+        """
+        Async variant of refine_fields using AsyncOpenAI.
+        
+        Args:
+            ocr_result: OCR result with full text
+            schema: Schema from the image-only vision extraction
+            fields: Names of the fields to re-check
+            extractor: DeterministicExtractor over ocr_result (built if None)
+        
+        Returns:
+            InstallmentAgreementSchema with the listed fields refined
+        """
+        # Label matching and token counting are CPU-bound
+        messages, logger = await asyncio.to_thread(
+            self._prepare_refine_request, ocr_result, schema, fields, extractor
+        )
+        
+        response = await call_openai_cached_async(
+            self.response_cache,
+            "refine_fields",
+            self.async_client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        # Text-only refinement may miss what the image showed; null keeps the vision value
+        return self._merge_fields(schema, response_data, fields, keep_existing=True)
+    
+    def fill_gaps(
+        self,
+        ocr_result: OCRResult,
+        initial_schema: InstallmentAgreementSchema,
+        fields: List[str],
+        candidate_values: Optional[Dict[str, List[str]]] = None,
+        extractor=None
+    ) -> InstallmentAgreementSchema:
+        """
+        Ask OpenAI only for the fields the deterministic extraction could not settle.
+        
+        Unlike improve_extraction, the prompt carries only the OCR lines around
+        the labels of the listed fields and asks for a JSON object with just
+        those fields; their answers are merged into initial_schema and all
+        other values are kept.
+        
+        Args:
+            ocr_result: OCR result with full text
+            initial_schema: Initial extraction from deterministic extractor
+            fields: Names of the missing, low-confidence or inconsistent fields
+            candidate_values: Optional dict of field_name -> list of candidate values
+            extractor: Optional DeterministicExtractor over ocr_result, reused to
+                       find the label lines of the fields
+        
+        Returns:
+            InstallmentAgreementSchema with the listed fields filled in
+        """
+        messages, logger = self._prepare_gap_request(
+            ocr_result, initial_schema, fields, candidate_values, extractor
+        )
+        
+        response = call_openai_cached(
+            self.response_cache,
+            "fill_gaps",
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        return self._merge_fields(initial_schema, response_data, fields)
+    
+    async def fill_gaps_async(
+        self,
+        ocr_result: OCRResult,
+        initial_schema: InstallmentAgreementSchema,
+        fields: List[str],
+        candidate_values: Optional[Dict[str, List[str]]] = None,
+        extractor=None
+    ) -> InstallmentAgreementSchema:
+        """
+        Async variant of fill_gaps using AsyncOpenAI.
+        
+        Args:
+            ocr_result: OCR result with full text
+            initial_schema: Initial extraction from deterministic extractor
+            fields: Names of the missing, low-confidence or inconsistent fields
+            candidate_values: Optional dict of field_name -> list of candidate values
+            extractor: Optional DeterministicExtractor over ocr_result, reused to
+                       find the label lines of the fields
+        
+        Returns:
+            InstallmentAgreementSchema with the listed fields filled in
+        """
+        # Label matching and token counting are CPU-bound
+        messages, logger = await asyncio.to_thread(
+            self._prepare_gap_request, ocr_result, initial_schema, fields, candidate_values, extractor
+        )
+        
+        response = await call_openai_cached_async(
+            self.response_cache,
+            "fill_gaps",
+            self.async_client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,  # Deterministic output
+            response_format={"type": "json_object"}  # Force JSON output
+        )
+        
+        response_data = self._parse_json_response(response, logger)
+        return self._merge_fields(initial_schema, response_data, fields)
+    
+    def _resolve_image(
+        self,
+        image_path: Optional[str],
+        image_bytes: Optional[bytes],
+        image_format: Optional[str],
+        image: Optional[ImageSource]
+    ) -> ImageSource:
+        """Normalize the supported image arguments to an ImageSource."""
+        if image is not None:
+            return image
+        if image_path:
+            return ImageSource.from_path(image_path)
+        if image_bytes:
+            return ImageSource.from_bytes(image_bytes, image_format=image_format)
+        raise ValueError("Either image_path or image_bytes must be provided")
+    
+    def _prepare_upload(self, image: ImageSource) -> ImageSource:
+        """Image to send to OpenAI Vision, preprocessed if a preprocessor is configured."""
+        if self.image_preprocessor is None:
+            return image
+        
+        with timed("image_preprocess"):
+            prepared, report = self.image_preprocessor.prepare(image)
+        record_image_upload(report.to_dict())
+        return prepared
+    
+    def _resolve_extractor(self, ocr_result: Optional[OCRResult], extractor, required: bool = False):
+        """DeterministicExtractor for region crops, prompt compaction and gap filling, or None if unused."""
+        if extractor is not None or ocr_result is None:
+            return extractor
+        if not required and self.region_cropper is None and self.prompt_budget is None:
+            return None
+        # Imported here: src.extractors imports this module
+        from src.extractors import DeterministicExtractor
+        return DeterministicExtractor(ocr_result)
+    
+    def _compact_prompt(
+        self,
+        stage: str,
+        build,
+        ocr_result: Optional[OCRResult],
+        fields: Optional[List[str]],
+        extractor
+    ) -> str:
+        """
+        Prompt built by build(ocr_text), compacted if a prompt budget is configured.
+        
+        Args:
+            stage: Request the prompt is for, reported with the savings
+            build: Builds the prompt around selected OCR lines (None: full OCR text)
+            ocr_result: OCR result the prompt is about
+            fields: Fields to extract (None: all fields)
+            extractor: DeterministicExtractor over ocr_result
+        
+        Returns:
+            The compacted prompt, or the full one if compaction does not make it smaller
+        """
+        prompt = build(None)
+        if self.prompt_budget is None or ocr_result is None:
+            return prompt
+        
+        with timed("prompt_compaction"):
+            extractor = self._resolve_extractor(ocr_result, extractor)
+            compacted = self.prompt_budget.compact(build, ocr_result.full_text, extractor.label_spans(fields))
+            report = self.prompt_budget.report(stage, prompt, compacted)
+        if report['tokens_saved'] <= 0:
+            return prompt
+        record_prompt_compaction(report)
+        return compacted
+    
+    def _compact_to_labels(
+        self,
+        build,
+        ocr_result: OCRResult,
+        extractor,
+        fields: List[str]
+    ) -> str:
+        """
+        Prompt built by build(ocr_text) around only the OCR lines near the fields' labels.
+        
+        Unlike _compact_prompt this always compacts, with LABEL_CONTEXT_BUDGET
+        if no prompt_budget is set: refinement and gap filling ask about a few
+        fields, so the rest of the page is never sent.
+        
+        Args:
+            build: Builds the prompt around the selected OCR lines
+            ocr_result: OCR result the prompt is about
+            extractor: DeterministicExtractor over ocr_result (built if None)
+            fields: Fields the prompt asks about
+        
+        Returns:
+            The compacted prompt
+        """
+        extractor = self._resolve_extractor(ocr_result, extractor, required=True)
+        budget = self.prompt_budget or self.LABEL_CONTEXT_BUDGET
+        with timed("prompt_compaction"):
+            return budget.compact(build, ocr_result.full_text, extractor.label_spans(fields))
+    
+    def _chat_messages(
+        self,
+        prompt: str,
+        image_parts: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """
+        Log a prompt and wrap it in system and user chat messages.
+        
+        Args:
+            prompt: User prompt
+            image_parts: Optional image message parts sent after the prompt
         
+        Returns:
+            Tuple of (messages, logger); logger is None if logging is unavailable
+        """
         # Log OpenAI request
         try:
             from src.utils import get_logger, log_openai_request
@@ -231,23 +649,202 @@ class OpenAIProcessor:
         except ImportError:
             logger = None
         
-        # Call OpenAI
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._get_system_prompt()
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.0,  # Deterministic output
-            response_format={"type": "json_object"}  # Force JSON output
+        content = prompt
+        if image_parts is not None:
+            content = [{"type": "text", "text": prompt}] + image_parts
+        
+        messages = [
+            {
+                "role": "system",
+                "content": self._get_system_prompt()
+            },
+            {
+                "role": "user",
+                "content": content
+            }
+        ]
+        return messages, logger
+    
+    def _crop_regions(
+        self,
+        image: ImageSource,
+        ocr_result: Optional[OCRResult],
+        fields: Optional[List[str]],
+        extractor
+    ) -> Optional[RegionCrops]:
+        """Section crops to upload instead of the full page, or None."""
+        if self.region_cropper is None or ocr_result is None:
+            return None
+        
+        with timed("region_crop"):
+            crops = self.region_cropper.prepare(image, extractor, fields)
+        if crops is not None:
+            record_image_upload(crops.to_dict())
+        return crops
+    
+    def _prepare_vision_request(
+        self,
+        image: ImageSource,
+        ocr_result: OCRResult,
+        fields: Optional[List[str]] = None,
+        crops: Optional[RegionCrops] = None,
+        extractor=None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Build chat messages for vision extraction (full page, or section crops)."""
+        # Build prompt with OCR text and instructions
+        prompt = self._compact_prompt(
+            "vision_extraction",
+            lambda ocr_text: self._build_vision_prompt(ocr_result, fields, ocr_text),
+            ocr_result, fields, extractor
+        )
+        return self._chat_messages(prompt, self._image_parts(image, crops))
+    
+    def _image_parts(self, image: ImageSource, crops: Optional[RegionCrops]) -> List[Dict[str, Any]]:
+        """Message parts with the page image, or with each section crop and its name."""
+        if crops is None:
+            return [{"type": "image_url", "image_url": {"url": image.data_url}}]
+        
+        titles = [RegionCropper.SECTION_TITLES[section] for section in crops.sections]
+        intro = (
+            "The images are crops of the document's sections, not the full page. "
+            "Read each field only from the crop of its section (seller fields from the "
+            "SELLER crop, buyer and co-buyer fields from the BUYER / CO-BUYER crop); "
+            "use the OCR text for anything the crops do not show."
+        )
+        if crops.mosaic:
+            order = ", ".join(f"{i}. {title}" for i, title in enumerate(titles, 1))
+            parts = [{"type": "text", "text": f"{intro}\nThe image stacks these sections from top to bottom: {order}."}]
+            parts.append({"type": "image_url", "image_url": {"url": crops.images[0].data_url}})
+            return parts
+        
+        parts = [{"type": "text", "text": intro}]
+        for title, crop in zip(titles, crops.images):
+            parts.append({"type": "text", "text": f"{title} section:"})
+            parts.append({"type": "image_url", "image_url": {"url": crop.data_url}})
+        return parts
+    
+    def _prepare_improve_request(
+        self,
+        ocr_result: OCRResult,
+        initial_schema: InstallmentAgreementSchema,
+        candidate_values: Optional[Dict[str, List[str]]],
+        fields: Optional[List[str]] = None,
+        extractor=None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Build chat messages for text-only extraction improvement."""
+        # Prepare prompt
+        prompt = self._compact_prompt(
+            "improve_extraction",
+            lambda ocr_text: self._build_prompt(ocr_result, initial_schema, candidate_values, fields, ocr_text),
+            ocr_result, fields, extractor
         )
+        return self._chat_messages(prompt)
+    
+    def _prepare_refine_request(
+        self,
+        ocr_result: OCRResult,
+        schema: InstallmentAgreementSchema,
+        fields: List[str],
+        extractor=None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Build chat messages for re-checking selected fields against the OCR lines near their labels."""
+        current_values = schema.to_json_dict()
+        
+        def build(ocr_text: str) -> str:
+            prompt_parts = []
+            prompt_parts.append("=== OCR TEXT (lines near the labels of these fields) ===")
+            prompt_parts.append(ocr_text)
+            
+            prompt_parts.append("\n=== VALUES READ FROM THE IMAGE ===")
+            for field_name in fields:
+                prompt_parts.append(f"- {field_name}: {json.dumps(current_values.get(field_name))}")
+            
+            prompt_parts.append("\n=== INSTRUCTIONS ===")
+            prompt_parts.append(
+                "These values were read from the document image but do not match the OCR text. "
+                "Using the OCR text, return the correct value for each field listed above. "
+                "Keep a value if the OCR text confirms it, and use null if the field is not present. "
+                "Normalize currency and APR as decimals without $, commas or %, and phone numbers as XXX-XXX-XXXX."
+            )
+            prompt_parts.append(f"Return a JSON object with only these keys: {', '.join(fields)}")
+            return "\n".join(prompt_parts)
+        
+        prompt = self._compact_to_labels(build, ocr_result, extractor, fields)
+        return self._chat_messages(prompt)
+    
+    def _prepare_gap_request(
+        self,
+        ocr_result: OCRResult,
+        schema: InstallmentAgreementSchema,
+        fields: List[str],
+        candidate_values: Optional[Dict[str, List[str]]],
+        extractor
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Build chat messages asking only for the listed fields, with the OCR lines near their labels."""
+        current_values = schema.to_json_dict()
+        
+        def build(ocr_text: str) -> str:
+            prompt_parts = []
+            prompt_parts.append("=== OCR TEXT (lines near the labels of these fields) ===")
+            prompt_parts.append(ocr_text)
+            
+            prompt_parts.append("\n=== CURRENT VALUES (missing, low-confidence or inconsistent) ===")
+            for field_name in fields:
+                prompt_parts.append(f"- {field_name}: {json.dumps(current_values.get(field_name))}")
+            
+            if candidate_values:
+                prompt_parts.append("\n=== CANDIDATE VALUES (from proximity search) ===")
+                for field_name in fields:
+                    candidates = candidate_values.get(field_name)
+                    if candidates:
+                        prompt_parts.append(f"{field_name}: {', '.join(candidates[:5])}")
+            
+            prompt_parts.append("\n=== INSTRUCTIONS ===")
+            prompt_parts.append(
+                "All other fields of this document are already extracted. Using the OCR text, "
+                "return the value of each field listed above. Keep a value if the OCR text confirms it, "
+                "and use null if the field is not present or you are unsure - DO NOT GUESS."
+            )
+            prompt_parts.append(
+                "Return a JSON object with this exact structure (include only these fields):\n"
+                + self._json_structure(fields) + "\n"
+            )
+            return "\n".join(prompt_parts)
         
+        prompt = self._compact_to_labels(build, ocr_result, extractor, fields)
+        return self._chat_messages(prompt)
+    
+    def _merge_fields(
+        self,
+        schema: InstallmentAgreementSchema,
+        response_data: Dict[str, Any],
+        fields: List[str],
+        keep_existing: bool = False
+    ) -> InstallmentAgreementSchema:
+        """
+        Merge the listed fields of an OpenAI response into an existing schema.
+        
+        Args:
+            schema: Schema whose values are kept for fields not in the response
+            response_data: Decoded JSON response
+            fields: Names of the fields to take from the response
+            keep_existing: If True, a null answer keeps the schema's value
+                           instead of clearing it
+        
+        Returns:
+            InstallmentAgreementSchema with the merged values
+        """
+        merged = schema.model_dump()
+        for field_name in fields:
+            if field_name not in response_data:
+                continue
+            if keep_existing and response_data[field_name] is None:
+                continue
+            merged[field_name] = response_data[field_name]
+        return self._parse_openai_response(merged, schema)
+    
+    def _parse_json_response(self, response: Any, logger: Optional[Any]) -> Dict[str, Any]:
+        """Extract, log and decode the JSON body of a chat completion."""
         # Parse response
         response_text = response.choices[0].message.content.strip()
         
@@ -269,12 +866,9 @@ class OpenAIProcessor:
         response_text = response_text.strip()
         
         try:
-            response_data = json.loads(response_text)
+            return json.loads(response_text)
         except json.JSONDecodeError as e:
             raise ValueError(f"OpenAI returned invalid JSON: {e}\nResponse text: {response_text[:500]}")
-        
-        # Validate and create schema
-        return self._parse_openai_response(response_data, initial_schema)
     
     def _get_system_prompt(self) -> str:
         """Get system prompt for OpenAI."""
@@ -297,43 +891,40 @@ CRITICAL RULES - FOLLOW STRICTLY:
 8. When in doubt about ANY field, return null. It is better to return null than to guess.
 
 Return ONLY valid JSON matching the exact schema structure. Use null (not "null" string) for missing values."""
-    
+
     def _build_prompt(
         self,
         ocr_result: OCRResult,
         initial_schema: InstallmentAgreementSchema,
-        candidate_values: Optional[Dict[str, List[str]]]
+        candidate_values: Optional[Dict[str, List[str]]],
+        fields: Optional[List[str]] = None,
+        ocr_text: Optional[str] = None
     ) -> str:
-        """Build the user prompt for OpenAI."""
+        """
+        Build the user prompt for OpenAI.
+        
+        With a fields subset, only those fields are shown and asked for, and the
+        seller/buyer instructions are included only if a party field is requested.
+        With ocr_text (lines selected by a PromptBudget), that text replaces the
+        full OCR text and the JSON parts are compact.
+        """
         prompt_parts = []
+        compact = ocr_text is not None
         
-        # OCR text - prioritize seller section if it exists
-        ocr_text = ocr_result.full_text
-        # Check if seller information is in the text
-        seller_section_start = ocr_text.lower().find('seller')
-        if seller_section_start >= 0:
-            # Include seller section and surrounding context (first 10000 chars to ensure seller info is included)
-            seller_context_start = max(0, seller_section_start - 500)
-            seller_context_end = min(len(ocr_text), seller_section_start + 2000)
-            seller_section = ocr_text[seller_context_start:seller_context_end]
-            # Also include beginning of document
-            beginning = ocr_text[:min(3000, seller_context_start)]
-            prompt_parts.append("=== OCR TEXT (Seller section highlighted) ===")
-            prompt_parts.append(beginning)
-            prompt_parts.append("\n--- SELLER SECTION (pay special attention to this) ---")
-            prompt_parts.append(seller_section)
-            if len(ocr_text) > seller_context_end:
-                prompt_parts.append(f"\n[Text continues. Total length: {len(ocr_text)} characters]")
+        if compact:
+            prompt_parts.append("=== OCR TEXT (lines near field labels) ===")
+            prompt_parts.append(ocr_text)
         else:
-            prompt_parts.append("=== OCR TEXT ===")
-            prompt_parts.append(ocr_text[:10000])  # Increased limit to ensure seller info is included
-            if len(ocr_text) > 10000:
-                prompt_parts.append(f"\n[Text truncated. Total length: {len(ocr_text)} characters]")
+            # OCR text - prioritize seller section if it exists
+            self._append_ocr_text(prompt_parts, ocr_result.full_text)
         
         # Initial extraction
         prompt_parts.append("\n=== INITIAL EXTRACTION (may contain errors) ===")
         initial_dict = initial_schema.to_json_dict()
-        prompt_parts.append(json.dumps(initial_dict, indent=2))
+        if fields is not None:
+            requested = FieldTypes.select_fields(fields)
+            initial_dict = {name: initial_dict[name] for name in requested}
+        prompt_parts.append(compact_json(initial_dict) if compact else json.dumps(initial_dict, indent=2))
         
         # Candidate values if provided
         if candidate_values:
@@ -345,18 +936,23 @@ Return ONLY valid JSON matching the exact schema structure. Use null (not "null"
         # Confidence scores
         if ocr_result.confidence_scores:
             prompt_parts.append("\n=== OCR CONFIDENCE SCORES ===")
-            prompt_parts.append(json.dumps(ocr_result.confidence_scores, indent=2))
+            prompt_parts.append(
+                compact_json(ocr_result.confidence_scores) if compact
+                else json.dumps(ocr_result.confidence_scores, indent=2)
+            )
         
         # Instructions
         prompt_parts.append("\n=== INSTRUCTIONS ===")
-        prompt_parts.append("""
+        instructions = """
 Please review the OCR text and improve the extraction:
 
 1. Normalize all values according to schema rules
 2. Resolve ambiguities by using context from the full document
 3. Validate numeric relationships (e.g., check if total_of_payments = amount_of_payments * number_of_payments)
 4. Fill missing fields ONLY if the value is clearly visible in the OCR text - this is especially important for seller fields
-5. If unsure about any field, return null - DO NOT GUESS
+5. If unsure about any field, return null - DO NOT GUESS"""
+        if self._requests_party(fields, 'seller') or self._requests_party(fields, 'buyer'):
+            instructions += """
 6. CRITICAL: If seller fields are missing or null, you MUST extract them from the OCR text. Seller information appears in the SELLER section, which comes BEFORE the BUYER section in the document.
    - Seller name: Look for text near "SELLER" or "Seller's Name" (e.g., "PASSANANTES HOME FOOD SERVICES")
    - Seller address: Look for address near "Seller's Address" label (e.g., "1901 FARRAGUT AVENUE")
@@ -367,57 +963,93 @@ Please review the OCR text and improve the extraction:
    - BUYER section: Contains buyer_name, buyer_address, buyer_phone_number, co_buyer_name, co_buyer_address, co_buyer_phone_number
    DO NOT mix them up! If you see "BRISTOL, PA 19007" near seller address "1901 FARRAGUT AVENUE", that is seller information. If you see "LIBERTY, SC 29657" near buyer address "214 Cheyenne Trail", that is buyer information.
 8. IMPORTANT: Extract address and phone number for BOTH buyer and co-buyer separately. They may have different addresses and phone numbers.
-9. Pay special attention to the "SELLER SECTION" in the OCR text if it is highlighted.
-
-Return a JSON object with this exact structure (include ALL fields, including seller fields):
-{
-  "seller_name": "string or null",
-  "seller_address": "string or null",
-  "seller_city": "string or null",
-  "seller_state": "string or null (e.g., PA, SC)",
-  "seller_zip_code": "string or null",
-  "seller_phone_number": "string or null (format: XXX-XXX-XXXX)",
-  "buyer_name": "string or null",
-  "buyer_address": "string or null",
-  "buyer_phone_number": "string or null (format: XXX-XXX-XXXX)",
-  "co_buyer_name": "string or null",
-  "co_buyer_address": "string or null",
-  "co_buyer_phone_number": "string or null (format: XXX-XXX-XXXX)",
-  "quantity": integer or null,
-  "items_purchased": "string or null",
-  "make_or_model": "string or null (use null for N/A)",
-  "amount_financed": number or null (decimal, no $ or commas),
-  "finance_charge": number or null (decimal, no $ or commas),
-  "apr": number or null (decimal, no % symbol),
-  "total_of_payments": number or null (decimal, no $ or commas),
-  "number_of_payments": integer or null,
-  "amount_of_payments": number or null (decimal, no $ or commas)
-}
-""")
+9. Pay special attention to the "SELLER SECTION" in the OCR text if it is highlighted."""
+        if fields is None:
+            instructions += "\n\nReturn a JSON object with this exact structure (include ALL fields, including seller fields):\n"
+        else:
+            instructions += "\n\nReturn a JSON object with this exact structure (include only these fields):\n"
+        prompt_parts.append(instructions + self._json_structure(fields) + "\n")
         
         return "\n".join(prompt_parts)
     
-    def _build_vision_prompt(self, ocr_result: OCRResult) -> str:
-        """Build prompt for vision-based extraction."""
-        prompt_parts = []
+    @staticmethod
+    def _append_ocr_text(prompt_parts: List[str], ocr_text: str) -> None:
+        """Append the OCR text, with the seller section highlighted if there is one."""
+        # Check if seller information is in the text
+        seller_section_start = ocr_text.lower().find('seller')
+        if seller_section_start >= 0:
+            # Include seller section and surrounding context (first 10000 chars to ensure seller info is included)
+            seller_context_start = max(0, seller_section_start - 500)
+            seller_context_end = min(len(ocr_text), seller_section_start + 2000)
+            seller_section = ocr_text[seller_context_start:seller_context_end]
+            # Also include beginning of document
+            beginning = ocr_text[:min(3000, seller_context_start)]
+            prompt_parts.append("=== OCR TEXT (Seller section highlighted) ===")
+            prompt_parts.append(beginning)
+            prompt_parts.append("\n--- SELLER SECTION (pay special attention to this) ---")
+            prompt_parts.append(seller_section)
+            if len(ocr_text) > seller_context_end:
+                prompt_parts.append(f"\n[Text continues. Total length: {len(ocr_text)} characters]")
+        else:
+            prompt_parts.append("=== OCR TEXT ===")
+            prompt_parts.append(ocr_text[:10000])  # Increased limit to ensure seller info is included
+            if len(ocr_text) > 10000:
+                prompt_parts.append(f"\n[Text truncated. Total length: {len(ocr_text)} characters]")
+    
+    def _build_vision_prompt(
+        self,
+        ocr_result: Optional[OCRResult],
+        fields: Optional[List[str]] = None,
+        ocr_text: Optional[str] = None
+    ) -> str:
+        """
+        Build prompt for vision-based extraction.
         
-        prompt_parts.append("=== OCR TEXT FROM GOOGLE CLOUD VISION ===")
-        prompt_parts.append(ocr_result.full_text[:10000])  # Include more context for vision
-        if len(ocr_result.full_text) > 10000:
-            prompt_parts.append(f"\n[Text truncated. Total length: {len(ocr_result.full_text)} characters]")
+        With ocr_result=None the prompt is image-only, used for speculative
+        extraction started before OCR has finished. With a fields subset, only
+        those fields are asked for, and the seller and buyer sections are
+        described only if one of their fields is requested. With ocr_text (lines
+        selected by a PromptBudget), that text replaces the full OCR text.
+        """
+        if fields is None:
+            task = "Your task is to extract ALL fields from this document."
+        else:
+            task = "Your task is to extract only the fields of the JSON structure below from this document."
+        prompt_parts = []
         
-        prompt_parts.append("\n=== INSTRUCTIONS ===")
-        prompt_parts.append("""
+        if ocr_result is not None:
+            if ocr_text is not None:
+                prompt_parts.append("=== OCR TEXT FROM GOOGLE CLOUD VISION (lines near field labels) ===")
+                prompt_parts.append(ocr_text)
+            else:
+                prompt_parts.append("=== OCR TEXT FROM GOOGLE CLOUD VISION ===")
+                prompt_parts.append(ocr_result.full_text[:10000])  # Include more context for vision
+                if len(ocr_result.full_text) > 10000:
+                    prompt_parts.append(f"\n[Text truncated. Total length: {len(ocr_result.full_text)} characters]")
+            
+            prompt_parts.append("\n=== INSTRUCTIONS ===")
+            prompt_parts.append("""
 You are analyzing an installment credit agreement document. You have access to:
 1. The actual image of the document (visible above)
 2. The OCR text extracted by Google Cloud Vision (shown above)
 
-Your task is to extract ALL fields from this document. Use BOTH the visual layout of the document AND the OCR text to accurately extract information.
+""" + task + """ Use BOTH the visual layout of the document AND the OCR text to accurately extract information.
+
+CRITICAL RULES:
+1. Use the visual layout to understand document structure - seller information appears in the SELLER section, buyer information in the BUYER section
+2. Use OCR text to get exact text values, but verify against the visual document""")
+        else:
+            prompt_parts.append("=== INSTRUCTIONS ===")
+            prompt_parts.append("""
+You are analyzing an installment credit agreement document. You have access to the actual image of the document.
+
+""" + task + """ Read every value carefully and exactly as printed or written.
 
 CRITICAL RULES:
 1. Use the visual layout to understand document structure - seller information appears in the SELLER section, buyer information in the BUYER section
-2. Use OCR text to get exact text values, but verify against the visual document
-3. Pay attention to spatial relationships - fields are often near their labels
+2. Copy text values exactly as they appear in the document""")
+
+        rules = """3. Pay attention to spatial relationships - fields are often near their labels
 4. NEVER hallucinate or guess - only extract what you can clearly see
 5. Normalize values according to schema rules:
    - Currency: Remove $ and commas, use decimal (e.g., 3644.28)
@@ -426,7 +1058,9 @@ CRITICAL RULES:
    - Integers: Use plain integer (e.g., 6)
    - Strings: Trim whitespace
 
-SELLER INFORMATION:
+"""
+        if self._requests_party(fields, 'seller'):
+            rules += """SELLER INFORMATION:
 - Look for the SELLER section (usually appears before BUYER section)
 - Seller name: Near "SELLER" or "Seller's Name" label
 - Seller address: Near "Seller's Address" label (e.g., "1901 FARRAGUT AVENUE")
@@ -434,44 +1068,42 @@ SELLER INFORMATION:
 - Seller phone: Near "Seller's Phone Number" label (e.g., "800-772-7786")
 - IMPORTANT: Do NOT confuse seller information with buyer information
 
-BUYER INFORMATION:
+"""
+        if self._requests_party(fields, 'buyer'):
+            rules += """BUYER INFORMATION:
 - Look for the BUYER section (usually appears after SELLER section)
 - Buyer 1: buyer_name, buyer_address, buyer_phone_number (near "Buyer 1's Name", "Buyer 1's Address", "Buyer 1's Phone Number")
 - Buyer 2 (Co-Buyer): co_buyer_name, co_buyer_address, co_buyer_phone_number (near "Buyer 2's Name", "Buyer 2's Address", "Buyer 2's Phone Number")
 - IMPORTANT: Extract address and phone number for BOTH buyer and co-buyer separately
 
-Return a JSON object with this exact structure (include ALL fields):
-{
-  "seller_name": "string or null",
-  "seller_address": "string or null",
-  "seller_city": "string or null",
-  "seller_state": "string or null (e.g., PA, SC)",
-  "seller_zip_code": "string or null",
-  "seller_phone_number": "string or null (format: XXX-XXX-XXXX)",
-  "buyer_name": "string or null",
-  "buyer_address": "string or null",
-  "buyer_phone_number": "string or null (format: XXX-XXX-XXXX)",
-  "co_buyer_name": "string or null",
-  "co_buyer_address": "string or null",
-  "co_buyer_phone_number": "string or null (format: XXX-XXX-XXXX)",
-  "quantity": integer or null,
-  "items_purchased": "string or null",
-  "make_or_model": "string or null (use null for N/A)",
-  "amount_financed": number or null (decimal, no $ or commas),
-  "finance_charge": number or null (decimal, no $ or commas),
-  "apr": number or null (decimal, no % symbol),
-  "total_of_payments": number or null (decimal, no $ or commas),
-  "number_of_payments": integer or null,
-  "amount_of_payments": number or null (decimal, no $ or commas)
-}
-""")
+"""
+        if fields is None:
+            rules += "Return a JSON object with this exact structure (include ALL fields):\n"
+        else:
+            rules += "Return a JSON object with this exact structure (include only these fields):\n"
+        prompt_parts.append(rules + self._json_structure(fields) + "\n")
         
         return "\n".join(prompt_parts)
     
+    def _json_structure(self, fields: Optional[List[str]] = None) -> str:
+        """JSON structure of the output, for all fields or only the requested ones."""
+        if fields is None:
+            names = list(self.FIELD_FORMATS)
+        else:
+            names = FieldTypes.select_fields(fields)
+        lines = [f'  "{name}": {self.FIELD_FORMATS.get(name, self.DEFAULT_FIELD_FORMAT)}' for name in names]
+        return "{\n" + ",\n".join(lines) + "\n}"
+    
+    @staticmethod
+    def _requests_party(fields: Optional[List[str]], party: str) -> bool:
+        """Whether all fields, or any field of a party ("seller", "buyer"), are requested."""
+        return fields is None or any(party in name for name in fields)
+    
     def _parse_openai_response(
         self,
         response_data: Dict[str, Any],
-        initial_schema: InstallmentAgreementSchema
+        initial_schema: InstallmentAgreementSchema,
+        fields: Optional[List[str]] = None
     ) -> InstallmentAgreementSchema:
         """
         Parse OpenAI response and create schema.
@@ -479,15 +1111,19 @@ Return a JSON object with this exact structure (include ALL fields):
         Args:
             response_data: Parsed JSON from OpenAI
             initial_schema: Initial schema (used as fallback for validation)
+            fields: Optional subset of requested fields; other keys of the
+                    response are ignored and left as None
         
         Returns:
             InstallmentAgreementSchema with improved values
         """
+        requested = set(FieldTypes.select_fields(fields))
+        
         # Clean and validate the response
         cleaned_data = {}
         
         for field_name in InstallmentAgreementSchema.model_fields.keys():
-            value = response_data.get(field_name)
+            value = response_data.get(field_name) if field_name in requested else None
             
             # If OpenAI returned null, None, empty string, or the field is missing, use None
             if value is None or value == "null" or value == "" or (isinstance(value, str) and value.strip() == ""):
@@ -0,0 +1,215 @@
+"""Token-budgeted compaction of OpenAI prompts."""
+
+import json
+import math
+import threading
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Average characters per token of English text, used without tiktoken
+CHARS_PER_TOKEN = 4
+
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str) -> Optional[Any]:
+    """tiktoken encoding for a model, or None if tiktoken cannot provide one."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                # Encodings are downloaded on first use; offline, fall back to the estimate
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    Count the tokens of a text for a model.
+    
+    Uses tiktoken when it is installed and its encoding can be loaded, otherwise
+    estimates one token per CHARS_PER_TOKEN characters.
+    
+    Args:
+        text: Prompt text
+        model: OpenAI model name
+    
+    Returns:
+        Token count
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def compact_json(data: Any) -> str:
+    """JSON without indentation or spaces after separators."""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+class PromptBudget:
+    """
+    Keep OpenAI prompts within a token budget.
+    
+    Instead of the first 10,000 characters of OCR text, only the lines around
+    field label matches are kept, whitespace is collapsed and the JSON parts of
+    the prompt are emitted without indentation. When the prompt would still
+    exceed max_prompt_tokens, lines farthest from any label are dropped first.
+    """
+    
+    DEFAULT_MAX_PROMPT_TOKENS = 3000
+    # Lines kept before and after each label line (values usually follow their label)
+    DEFAULT_LINES_BEFORE = 1
+    DEFAULT_LINES_AFTER = 2
+    # Marks skipped OCR lines
+    GAP = "..."
+    
+    def __init__(
+        self,
+        max_prompt_tokens: int = DEFAULT_MAX_PROMPT_TOKENS,
+        lines_before: int = DEFAULT_LINES_BEFORE,
+        lines_after: int = DEFAULT_LINES_AFTER,
+        model: str = "gpt-4o-mini"
+    ):
+        """
+        Initialize budget.
+        
+        Args:
+            max_prompt_tokens: Maximum tokens of the user prompt
+            lines_before: OCR lines kept before each line with a label match
+            lines_after: OCR lines kept after each line with a label match
+            model: Model whose tokenizer is used for counting
+        """
+        if max_prompt_tokens <= 0:
+            raise ValueError("max_prompt_tokens must be positive")
+        
+        self.max_prompt_tokens = max_prompt_tokens
+        self.lines_before = lines_before
+        self.lines_after = lines_after
+        self.model = model
+    
+    def count_tokens(self, text: str) -> int:
+        """Token count of a text for the configured model."""
+        return count_tokens(text, self.model)
+    
+    def compact(
+        self,
+        build: Callable[[str], str],
+        full_text: str,
+        label_spans: Sequence[Tuple[int, int]]
+    ) -> str:
+        """
+        Build a prompt whose OCR text fits the budget left by the rest of the prompt.
+        
+        Args:
+            build: Builds the prompt around the given OCR text
+            full_text: Complete OCR text
+            label_spans: (start, end) character offsets of label matches in full_text
+        
+        Returns:
+            The prompt
+        """
+        overhead = self.count_tokens(build(""))
+        return build(self.select_lines(full_text, label_spans, self.max_prompt_tokens - overhead))
+    
+    def select_lines(
+        self,
+        full_text: str,
+        label_spans: Sequence[Tuple[int, int]],
+        max_tokens: int
+    ) -> str:
+        """
+        OCR lines near label matches, within a token budget.
+        
+        Args:
+            full_text: Complete OCR text
+            label_spans: (start, end) character offsets of label matches in full_text
+            max_tokens: Token budget for the selected text
+        
+        Returns:
+            Selected lines with collapsed whitespace, in document order, with
+            GAP where lines were skipped. Without label matches the first lines
+            of the document are kept.
+        """
+        lines = full_text.split("\n")
+        starts = []
+        offset = 0
+        for line in lines:
+            starts.append(offset)
+            offset += len(line) + 1
+        
+        label_lines = sorted({bisect_right(starts, start) - 1 for start, _ in label_spans})
+        
+        # Priority of each candidate line: distance to the nearest label line
+        # (or position in the document when there are no labels)
+        priority: Dict[int, int] = {}
+        if label_lines:
+            for label_line in label_lines:
+                for index in range(max(0, label_line - self.lines_before), min(len(lines), label_line + self.lines_after + 1)):
+                    distance = abs(index - label_line)
+                    priority[index] = min(priority.get(index, distance), distance)
+        else:
+            priority = {index: index for index in range(len(lines))}
+        
+        selected = []
+        gap_tokens = self.count_tokens(self.GAP + "\n")
+        # Room for a gap marker before every line and one after the last
+        used = gap_tokens
+        for index in sorted(priority, key=lambda i: (priority[i], i)):
+            line = " ".join(lines[index].split())
+            if not line:
+                continue
+            tokens = self.count_tokens(line + "\n") + gap_tokens
+            if used + tokens > max_tokens:
+                continue
+            selected.append(index)
+            used += tokens
+        
+        parts = []
+        previous = -1
+        for index in sorted(selected):
+            if index > previous + 1:
+                parts.append(self.GAP)
+            parts.append(" ".join(lines[index].split()))
+            previous = index
+        if parts and previous < len(lines) - 1:
+            parts.append(self.GAP)
+        return "\n".join(parts)
+    
+    def report(self, stage: str, original_prompt: str, prompt: str) -> Dict[str, Any]:
+        """
+        Token savings of a compacted prompt.
+        
+        Args:
+            stage: Request the prompt is for (e.g. "vision_extraction")
+            original_prompt: Prompt as built without the budget
+            prompt: Compacted prompt
+        
+        Returns:
+            Dict with stage, original_tokens, prompt_tokens and tokens_saved
+        """
+        original_tokens = self.count_tokens(original_prompt)
+        prompt_tokens = self.count_tokens(prompt)
+        return {
+            'stage': stage,
+            'original_tokens': original_tokens,
+            'prompt_tokens': prompt_tokens,
+            'tokens_saved': original_tokens - prompt_tokens
+        }
+    
+    def __repr__(self) -> str:
+        return f"PromptBudget(max_prompt_tokens={self.max_prompt_tokens}, model={self.model!r})"
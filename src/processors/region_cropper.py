@@ -0,0 +1,347 @@
+"""Section crops of the page image for region-based vision requests."""
+
+import io
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from src.ocr import ImageSource
+from src.schema import FieldTypes
+from .image_preprocessor import VisionImagePreprocessor, estimate_vision_tokens
+
+Box = Tuple[float, float, float, float]
+
+
+class CropRegion:
+    """Pixel box (x0, y0, x1, y1) of one document section."""
+    
+    __slots__ = ('section', 'box')
+    
+    def __init__(self, section: str, box: Box):
+        self.section = section
+        self.box = box
+    
+    @property
+    def area(self) -> float:
+        """Area of the box in square pixels."""
+        x0, y0, x1, y1 = self.box
+        return max(0.0, x1 - x0) * max(0.0, y1 - y0)
+    
+    def __repr__(self) -> str:
+        x0, y0, x1, y1 = self.box
+        return f"CropRegion(section={self.section!r}, box=({x0:.0f}, {y0:.0f}, {x1:.0f}, {y1:.0f}))"
+
+
+class RegionCrops:
+    """Encoded crops of a page, ready to be sent instead of the full image."""
+    
+    def __init__(
+        self,
+        regions: List[CropRegion],
+        images: List[ImageSource],
+        sizes: List[Tuple[int, int]],
+        mosaic: bool,
+        original: ImageSource
+    ):
+        """
+        Initialize crops.
+        
+        Args:
+            regions: Cropped sections, in upload order
+            images: One image per region, or a single mosaic of all regions
+            sizes: (width, height) of each image
+            mosaic: Whether images is a single mosaic
+            original: Full page image the crops were taken from
+        """
+        self.regions = regions
+        self.images = images
+        self.sizes = sizes
+        self.mosaic = mosaic
+        self.original = original
+    
+    @property
+    def sections(self) -> List[str]:
+        """Section names in upload order (top to bottom in a mosaic)."""
+        return [region.section for region in self.regions]
+    
+    @property
+    def digest(self) -> str:
+        """Digest identifying the uploaded images (e.g. for response cache keys)."""
+        combined = "\n".join(image.sha256 for image in self.images)
+        return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+    
+    @property
+    def upload_bytes(self) -> int:
+        """Total size of the uploaded images."""
+        return sum(image.size_bytes for image in self.images)
+    
+    @property
+    def upload_tokens(self) -> int:
+        """Estimated image tokens of the uploaded images."""
+        return sum(estimate_vision_tokens(*size) for size in self.sizes)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Savings against sending the full page, in ImagePreprocessReport.to_dict() form."""
+        original_size = self.original.dimensions
+        original_tokens = estimate_vision_tokens(*original_size)
+        return {
+            'applied': True,
+            'sections': self.sections,
+            'mosaic': self.mosaic,
+            'original_bytes': self.original.size_bytes,
+            'upload_bytes': self.upload_bytes,
+            'bytes_saved': self.original.size_bytes - self.upload_bytes,
+            'original_size': list(original_size),
+            'upload_size': [list(size) for size in self.sizes],
+            'original_tokens': original_tokens,
+            'upload_tokens': self.upload_tokens,
+            'tokens_saved': original_tokens - self.upload_tokens
+        }
+    
+    def __repr__(self) -> str:
+        return f"RegionCrops(sections={self.sections}, mosaic={self.mosaic}, bytes={self.upload_bytes})"
+
+
+class RegionCropper:
+    """
+    Crop the sections of an agreement that hold the requested fields.
+    
+    Sections are located from OCR geometry: the anchor labels of their fields
+    (e.g. "Seller's Name", "Amount Financed"), grown to the OCR text blocks
+    containing them and to the blocks on the same rows, then padded. Only the
+    crops are uploaded, each named in the prompt, so the model reads seller
+    values from the seller crop and buyer values from the buyer crop. The full
+    OCR text is still part of the prompt.
+    
+    If a requested section cannot be located, or the crops would cover most of
+    the page anyway, no crops are made and the full page is sent.
+    """
+    
+    # Sections in page order, with the fields each one holds
+    SECTION_FIELDS = {
+        'seller': [
+            'seller_name', 'seller_address', 'seller_city', 'seller_state',
+            'seller_zip_code', 'seller_phone_number',
+        ],
+        'buyer': [
+            'buyer_name', 'buyer_address', 'buyer_phone_number',
+            'co_buyer_name', 'co_buyer_address', 'co_buyer_phone_number',
+            'street_address', 'phone_number',
+        ],
+        'purchase': ['quantity', 'items_purchased', 'make_or_model'],
+        'truth_in_lending': list(FieldTypes.TRUTH_IN_LENDING_FIELDS),
+    }
+    
+    # Names used for the crops in the prompt
+    SECTION_TITLES = {
+        'seller': "SELLER",
+        'buyer': "BUYER / CO-BUYER",
+        'purchase': "PURCHASE DETAILS",
+        'truth_in_lending': "TRUTH-IN-LENDING DISCLOSURE",
+    }
+    
+    # Generic labels ("Phone:", "Address:") also occur in the other party's
+    # section, so party sections are only anchored by labels naming the party
+    SECTION_ANCHOR_WORDS = {
+        'seller': ('seller', 'se[il]ler'),
+        'buyer': ('buyer', 'mailing'),
+    }
+    
+    DEFAULT_PADDING = 0.03
+    DEFAULT_MAX_AREA_FRACTION = 0.75
+    MOSAIC_GAP = 16
+    
+    def __init__(
+        self,
+        padding: float = DEFAULT_PADDING,
+        mosaic: bool = False,
+        max_area_fraction: float = DEFAULT_MAX_AREA_FRACTION,
+        encoder: Optional[VisionImagePreprocessor] = None
+    ):
+        """
+        Initialize cropper.
+        
+        Args:
+            padding: Margin added around each section, as a fraction of the page
+            mosaic: If True, stack the crops into one image (one image's base
+                    token cost instead of one per crop)
+            max_area_fraction: Send the full page instead when the crops cover
+                               more than this fraction of it
+            encoder: VisionImagePreprocessor used to resize and JPEG-encode the
+                     crops (default: JPEG quality 90, no resizing)
+        """
+        self.padding = padding
+        self.mosaic = mosaic
+        self.max_area_fraction = max_area_fraction
+        self.encoder = encoder or VisionImagePreprocessor(max_long_edge=None, jpeg_quality=90)
+    
+    def prepare(self, image: ImageSource, extractor, fields: Optional[List[str]] = None) -> Optional[RegionCrops]:
+        """
+        Locate and crop the sections holding the requested fields.
+        
+        Args:
+            image: Full page image the OCR ran on
+            extractor: DeterministicExtractor over the page's OCR result
+            fields: Fields to extract (None: all fields)
+        
+        Returns:
+            RegionCrops, or None if the full page should be sent instead
+        """
+        regions = self.locate(extractor, fields)
+        if regions is None:
+            return None
+        crops = self.crop(image, regions)
+        if crops.upload_bytes >= image.size_bytes and crops.upload_tokens >= estimate_vision_tokens(*image.dimensions):
+            return None
+        return crops
+    
+    def locate(self, extractor, fields: Optional[List[str]] = None) -> Optional[List[CropRegion]]:
+        """
+        Find the pixel box of each section holding a requested field.
+        
+        Args:
+            extractor: DeterministicExtractor over the page's OCR result
+            fields: Fields to extract (None: all fields)
+        
+        Returns:
+            CropRegions in page order, or None if a section cannot be located or
+            the sections cover more than max_area_fraction of the page
+        """
+        wanted = set(FieldTypes.select_fields(fields))
+        anchors = extractor.anchor_labels()
+        frame = extractor.fingerprint().frame
+        blocks = [_box(block['bounding_box']) for block in extractor.block_annotations]
+        blocks = [box for box in blocks if box is not None]
+        
+        regions = []
+        for section, section_fields in self.SECTION_FIELDS.items():
+            if not wanted.intersection(section_fields):
+                continue
+            seeds = self._section_seeds(section, section_fields, extractor.FIELD_LABELS, anchors)
+            if not seeds:
+                return None
+            
+            box = _union([_containing_block(seed, blocks) or seed for seed in seeds])
+            # Values often sit in their own block on the label's row (blocks
+            # much taller than the section are columns or page-wide text)
+            row_blocks = [
+                block for block in blocks
+                if box[1] <= (block[1] + block[3]) / 2 <= box[3]
+                and block[3] - block[1] <= 2 * (box[3] - box[1])
+            ]
+            box = _union([box] + row_blocks)
+            
+            pad_x = self.padding * frame.width
+            pad_y = self.padding * frame.height
+            regions.append(CropRegion(
+                section, (box[0] - pad_x, box[1] - pad_y, box[2] + pad_x, box[3] + pad_y)
+            ))
+        
+        if not regions:
+            return None
+        page_area = frame.width * frame.height
+        if sum(region.area for region in regions) > self.max_area_fraction * page_area:
+            return None
+        return regions
+    
+    def crop(self, image: ImageSource, regions: List[CropRegion]) -> RegionCrops:
+        """
+        Cut and encode the regions of an image.
+        
+        Coordinates are the OCR's, i.e. pixels of the stored image (EXIF
+        orientation is not applied).
+        
+        Args:
+            image: Full page image
+            regions: Regions from locate()
+        
+        Returns:
+            RegionCrops with one image per region, or one mosaic
+        """
+        with Image.open(io.BytesIO(image.data)) as img:
+            width, height = img.size
+            pieces = []
+            for region in regions:
+                x0, y0, x1, y1 = region.box
+                box = (
+                    max(0, int(x0)), max(0, int(y0)),
+                    min(width, int(round(x1))), min(height, int(round(y1)))
+                )
+                pieces.append(img.crop(box))
+        
+        if self.mosaic:
+            pieces = [self._stack(pieces)]
+        
+        images, sizes = [], []
+        for index, piece in enumerate(pieces):
+            data, size = self.encoder.encode(piece)
+            images.append(ImageSource(data=data, image_format='JPEG', name=f"{image.name}#{index + 1}"))
+            sizes.append(size)
+        return RegionCrops(regions, images, sizes, self.mosaic, image)
+    
+    def _section_seeds(
+        self,
+        section: str,
+        section_fields: List[str],
+        field_labels: Dict[str, List[str]],
+        anchors: Dict[str, Dict[str, Any]]
+    ) -> List[Box]:
+        """Bounding boxes of the anchor labels found for a section."""
+        words = self.SECTION_ANCHOR_WORDS.get(section)
+        seeds = []
+        for field_name in section_fields:
+            for pattern in field_labels.get(field_name, []):
+                if words and not any(word in pattern for word in words):
+                    continue
+                anchor = anchors.get(pattern)
+                if anchor is None:
+                    continue
+                box = _box(anchor['position']['bounding_box'])
+                if box is not None and box not in seeds:
+                    seeds.append(box)
+        return seeds
+    
+    def _stack(self, pieces: List[Image.Image]) -> Image.Image:
+        """Stack crops top to bottom on a white background."""
+        width = max(piece.width for piece in pieces)
+        height = sum(piece.height for piece in pieces) + self.MOSAIC_GAP * (len(pieces) - 1)
+        mosaic = Image.new('RGB', (width, height), (255, 255, 255))
+        
+        y = 0
+        for piece in pieces:
+            if piece.mode not in ('RGB', 'L'):
+                piece = piece.convert('RGB')
+            mosaic.paste(piece, (0, y))
+            y += piece.height + self.MOSAIC_GAP
+        return mosaic
+
+
+def _box(vertices) -> Optional[Box]:
+    """(x0, y0, x1, y1) of bounding box vertices, or None if there are none."""
+    xs = [vertex['x'] for vertex in vertices]
+    ys = [vertex['y'] for vertex in vertices]
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _union(boxes: List[Box]) -> Box:
+    """Smallest box enclosing all boxes."""
+    return (
+        min(box[0] for box in boxes), min(box[1] for box in boxes),
+        max(box[2] for box in boxes), max(box[3] for box in boxes)
+    )
+
+
+def _containing_block(box: Box, blocks: List[Box]) -> Optional[Box]:
+    """Smallest block containing the center of a box."""
+    x = (box[0] + box[2]) / 2
+    y = (box[1] + box[3]) / 2
+    containing = [
+        block for block in blocks
+        if block[0] <= x <= block[2] and block[1] <= y <= block[3]
+    ]
+    if not containing:
+        return None
+    return min(containing, key=lambda block: (block[2] - block[0]) * (block[3] - block[1]))
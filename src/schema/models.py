@@ -1,7 +1,7 @@
 """Canonical schema for installment credit agreement extracted fields."""
 
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 from pydantic import BaseModel, Field, field_validator, model_validator
 import re
 
@@ -263,6 +263,14 @@ class InstallmentAgreementSchema(BaseModel):
         
         return self
     
+    def restrict_to(self, fields: Optional[Iterable[str]]) -> "InstallmentAgreementSchema":
+        """Copy with only the given fields set and the others None (a full copy if fields is None)."""
+        values = self.model_dump()
+        if fields is not None:
+            requested = set(fields)
+            values = {name: value if name in requested else None for name, value in values.items()}
+        return InstallmentAgreementSchema(**values)
+    
     def to_dict(self) -> dict:
         """Convert schema to dictionary with proper serialization."""
         result = {}
@@ -329,6 +337,16 @@ class FieldTypes:
         'amount_of_payments': DECIMAL,
     }
     
+    # Truth-in-Lending disclosure fields (e.g. for payment reconciliation)
+    TRUTH_IN_LENDING_FIELDS = [
+        'amount_financed',
+        'finance_charge',
+        'apr',
+        'total_of_payments',
+        'number_of_payments',
+        'amount_of_payments',
+    ]
+    
     @classmethod
     def get_field_type(cls, field_name: str) -> type:
         """Get the type for a given field name."""
@@ -338,4 +356,29 @@ class FieldTypes:
     def get_all_fields(cls) -> list[str]:
         """Get all field names in the schema."""
         return list(cls.FIELD_TYPES.keys())
-
+    
+    @classmethod
+    def select_fields(cls, fields: Optional[Iterable[str]] = None) -> list[str]:
+        """
+        Validate a subset of fields to extract.
+        
+        Args:
+            fields: Field names, or None for all fields
+        
+        Returns:
+            The field names in schema order, without duplicates
+        
+        Raises:
+            ValueError: If a name is not a schema field or no field is given
+        """
+        if fields is None:
+            return cls.get_all_fields()
+        if isinstance(fields, str):
+            fields = [fields]
+        requested = set(fields)
+        unknown = sorted(requested - cls.FIELD_TYPES.keys())
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        if not requested:
+            raise ValueError("At least one field must be requested")
+        return [name for name in cls.FIELD_TYPES if name in requested]
@@ -1,6 +1,14 @@
 """Utility modules for logging and debugging."""
 
 from .logger import setup_logger, get_logger, DEBUG_MODE
+from .metrics import ExtractionTimings, MetricsSink, collect_timings, current_timings, timed
+from .client_registry import configure_clients, reset_clients
+from .response_cache import LLMResponseCache
 
-__all__ = ['setup_logger', 'get_logger', 'DEBUG_MODE']
+__all__ = [
+    'setup_logger', 'get_logger', 'DEBUG_MODE',
+    'ExtractionTimings', 'MetricsSink', 'collect_timings', 'current_timings', 'timed',
+    'configure_clients', 'reset_clients',
+    'LLMResponseCache'
+]
 
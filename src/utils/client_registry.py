@@ -0,0 +1,286 @@
+"""Process-wide registry of Vision and OpenAI clients.
+
+Creating a Vision client opens a gRPC channel and creating an OpenAI client
+opens an HTTP connection pool; both pay for TLS handshakes on first use. The
+registry creates each of them once per process (per event loop for async
+clients) and hands the same instance to every pipeline, OCR client, processor
+and validator. gRPC channels and httpx clients are safe to share between threads.
+"""
+
+import os
+import json
+import atexit
+import hashlib
+import tempfile
+import threading
+import asyncio
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+
+# Connection settings, see configure_clients
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    # OpenAI HTTP connection pool (httpx)
+    'openai_max_connections': 100,
+    'openai_max_keepalive_connections': 20,
+    'openai_keepalive_expiry': 30.0,  # seconds an idle connection is kept open
+    'openai_timeout': 60.0,  # seconds per request
+    'openai_max_retries': 2,
+    # Vision gRPC channel
+    'grpc_keepalive_time_ms': 30000,  # ping an idle channel every 30s
+    'grpc_keepalive_timeout_ms': 10000,
+    'grpc_max_message_bytes': 64 * 1024 * 1024,  # multi-image batch requests
+}
+
+# Endpoints served over plaintext gRPC (local fake servers / emulators)
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '[::1]')
+
+_settings: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+_lock = threading.Lock()
+
+# Sync clients keyed by configuration
+_clients: Dict[Tuple, Any] = {}
+
+# Async clients keyed by event loop, then configuration (they are loop-bound)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Credentials JSON content hash -> temp file path
+_credential_files: Dict[str, str] = {}
+
+
+def configure_clients(**settings) -> None:
+    """
+    Change connection pool and keepalive settings.
+    
+    Call before the first client is created; clients that already exist keep
+    their settings until reset_clients() is called.
+    
+    Args:
+        **settings: Any keys of DEFAULT_SETTINGS
+    """
+    unknown = set(settings) - set(DEFAULT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        _settings.update(settings)
+
+
+def get_settings() -> Dict[str, Any]:
+    """Current connection settings."""
+    with _lock:
+        return dict(_settings)
+
+
+def reset_clients() -> None:
+    """Close and forget all registered clients (e.g. after changing settings, or in tests)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _async_clients.clear()
+    for client in clients:
+        close = getattr(client, 'close', None)
+        if close is None:
+            transport = getattr(client, 'transport', None)
+            close = getattr(transport, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+
+def resolve_credentials(credentials: str) -> str:
+    """
+    Return a credentials file path for a path or inline service account JSON.
+    
+    Inline JSON (as set by Railway in GOOGLE_APPLICATION_CREDENTIALS) is written
+    to a temp file once per distinct content, not once per client.
+    
+    Args:
+        credentials: File path or JSON content
+    
+    Returns:
+        Path to a credentials file
+    
+    Raises:
+        ValueError: If the value looks like JSON but does not parse
+    """
+    if not credentials.strip().startswith('{'):
+        return credentials
+    
+    json.loads(credentials)  # Raises ValueError (JSONDecodeError) if malformed
+    
+    digest = hashlib.sha256(credentials.encode('utf-8')).hexdigest()
+    with _lock:
+        path = _credential_files.get(digest)
+        if path and os.path.exists(path):
+            return path
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            f.write(credentials)
+            path = f.name
+        _credential_files[digest] = path
+        return path
+
+
+def get_vision_client(api_endpoint: Optional[str] = None):
+    """
+    Shared sync ImageAnnotatorClient for an endpoint and the active credentials.
+    
+    Args:
+        api_endpoint: Optional "host:port". Local endpoints use a plaintext channel.
+    
+    Returns:
+        vision.ImageAnnotatorClient
+    """
+    key = ('vision', api_endpoint, os.getenv("GOOGLE_APPLICATION_CREDENTIALS"))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_vision_client(api_endpoint, use_async=False)
+            _clients[key] = client
+        return client
+
+
+def get_vision_async_client(api_endpoint: Optional[str] = None):
+    """
+    Shared ImageAnnotatorAsyncClient for the running event loop.
+    
+    gRPC asyncio channels are bound to the loop they were created on, so there
+    is one async client per loop.
+    
+    Args:
+        api_endpoint: Optional "host:port". Local endpoints use a plaintext channel.
+    
+    Returns:
+        vision.ImageAnnotatorAsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    key = ('vision', api_endpoint, os.getenv("GOOGLE_APPLICATION_CREDENTIALS"))
+    with _lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            client = _create_vision_client(api_endpoint, use_async=True)
+            loop_clients[key] = client
+        return client
+
+
+def get_openai_client(api_key: str):
+    """
+    Shared OpenAI client (one HTTP connection pool) for an API key.
+    
+    Args:
+        api_key: OpenAI API key
+    
+    Returns:
+        openai.OpenAI
+    """
+    key = ('openai', api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            import httpx
+            from openai import OpenAI
+            
+            client = OpenAI(
+                api_key=api_key,
+                max_retries=_settings['openai_max_retries'],
+                http_client=httpx.Client(
+                    limits=_httpx_limits(httpx),
+                    timeout=_settings['openai_timeout']
+                )
+            )
+            _clients[key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str):
+    """
+    Shared AsyncOpenAI client for an API key and the running event loop.
+    
+    httpx async connection pools must not be shared across event loops.
+    
+    Args:
+        api_key: OpenAI API key
+    
+    Returns:
+        openai.AsyncOpenAI
+    """
+    loop = asyncio.get_running_loop()
+    key = ('openai', api_key)
+    with _lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            import httpx
+            from openai import AsyncOpenAI
+            
+            client = AsyncOpenAI(
+                api_key=api_key,
+                max_retries=_settings['openai_max_retries'],
+                http_client=httpx.AsyncClient(
+                    limits=_httpx_limits(httpx),
+                    timeout=_settings['openai_timeout']
+                )
+            )
+            loop_clients[key] = client
+        return client
+
+
+def _httpx_limits(httpx):
+    """Connection pool limits from the current settings (lock held)."""
+    return httpx.Limits(
+        max_connections=_settings['openai_max_connections'],
+        max_keepalive_connections=_settings['openai_max_keepalive_connections'],
+        keepalive_expiry=_settings['openai_keepalive_expiry']
+    )
+
+
+def _grpc_options():
+    """gRPC channel options from the current settings (lock held)."""
+    return [
+        ('grpc.keepalive_time_ms', _settings['grpc_keepalive_time_ms']),
+        ('grpc.keepalive_timeout_ms', _settings['grpc_keepalive_timeout_ms']),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.max_send_message_length', _settings['grpc_max_message_bytes']),
+        ('grpc.max_receive_message_length', _settings['grpc_max_message_bytes']),
+    ]
+
+
+def _create_vision_client(api_endpoint: Optional[str], use_async: bool):
+    """Create a Vision client with a keepalive-configured channel (lock held)."""
+    import grpc
+    from google.cloud import vision
+    from google.cloud.vision_v1.services.image_annotator import transports
+    
+    client_class = vision.ImageAnnotatorAsyncClient if use_async else vision.ImageAnnotatorClient
+    transport_class = (
+        transports.ImageAnnotatorGrpcAsyncIOTransport if use_async
+        else transports.ImageAnnotatorGrpcTransport
+    )
+    
+    if api_endpoint and api_endpoint.startswith(LOCAL_HOSTS):
+        # Local fake server: plaintext channel, no Google credentials needed
+        channel_factory = grpc.aio.insecure_channel if use_async else grpc.insecure_channel
+        channel = channel_factory(api_endpoint, options=_grpc_options())
+    else:
+        host = api_endpoint or vision.ImageAnnotatorClient.DEFAULT_ENDPOINT
+        if ':' not in host:
+            host = f"{host}:443"
+        # Uses application default credentials (GOOGLE_APPLICATION_CREDENTIALS)
+        channel = transport_class.create_channel(host, options=_grpc_options())
+    
+    return client_class(transport=transport_class(channel=channel))
+
+
+@atexit.register
+def _remove_credential_files() -> None:
+    """Delete temp credential files written by resolve_credentials."""
+    for path in _credential_files.values():
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -3,6 +3,7 @@
 import os
 import logging
 import json
+import threading
 from typing import Optional, Dict, Any
 from functools import wraps
 
@@ -11,6 +12,7 @@ DEBUG_MODE = os.getenv("EXTRACTION_DEBUG", "false").lower() == "true"
 
 # Logger instance
 _logger: Optional[logging.Logger] = None
+_logger_lock = threading.Lock()
 
 
 def setup_logger(level: int = logging.INFO, debug_mode: bool = None) -> logging.Logger:
@@ -29,30 +31,33 @@ def setup_logger(level: int = logging.INFO, debug_mode: bool = None) -> logging.
     if debug_mode is not None:
         DEBUG_MODE = debug_mode
     
-    if _logger is None:
-        _logger = logging.getLogger("extraction_pipeline")
-        _logger.setLevel(logging.DEBUG if DEBUG_MODE else level)
-        
-        # Create console handler
-        handler = logging.StreamHandler()
-        handler.setLevel(logging.DEBUG if DEBUG_MODE else level)
-        
-        # Create formatter
-        if DEBUG_MODE:
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-        else:
-            formatter = logging.Formatter(
-                '%(levelname)s - %(message)s'
-            )
-        
-        handler.setFormatter(formatter)
-        _logger.addHandler(handler)
-        
-        # Prevent duplicate logs
-        _logger.propagate = False
+    # Pipelines may run on several threads (batch extraction); only the
+    # first caller should attach the handler
+    with _logger_lock:
+        if _logger is None:
+            _logger = logging.getLogger("extraction_pipeline")
+            _logger.setLevel(logging.DEBUG if DEBUG_MODE else level)
+            
+            # Create console handler
+            handler = logging.StreamHandler()
+            handler.setLevel(logging.DEBUG if DEBUG_MODE else level)
+            
+            # Create formatter
+            if DEBUG_MODE:
+                formatter = logging.Formatter(
+                    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S'
+                )
+            else:
+                formatter = logging.Formatter(
+                    '%(levelname)s - %(message)s'
+                )
+            
+            handler.setFormatter(formatter)
+            _logger.addHandler(handler)
+            
+            # Prevent duplicate logs
+            _logger.propagate = False
     
     return _logger
 
@@ -0,0 +1,228 @@
+"""Per-document stage timing and OpenAI usage metrics."""
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class ExtractionTimings:
+    """
+    Timing and cost record for one document.
+    
+    Stage durations (seconds) are accumulated by name, e.g. ``ocr_rpc``,
+    ``ocr_parse``, ``deterministic`` and ``validation``. Every OpenAI call is
+    recorded with its latency and token usage, cache lookups are counted, and
+    image preprocessing and prompt compaction savings are kept per request.
+    Safe to update from several threads (speculative and batch execution).
+    """
+    
+    def __init__(self):
+        """Initialize an empty timing record."""
+        self.stages: Dict[str, float] = {}
+        self.openai_calls: List[Dict[str, Any]] = []
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self.image_uploads: List[Dict[str, Any]] = []
+        self.prompt_compactions: List[Dict[str, Any]] = []
+        self.total: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """Add elapsed time to a stage."""
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def add_openai_call(
+        self,
+        stage: str,
+        model: Optional[str],
+        latency: float,
+        usage: Any = None
+    ) -> None:
+        """
+        Record one OpenAI chat completion.
+        
+        Args:
+            stage: What the call was for (e.g. "vision_extraction", "validation")
+            model: Model name
+            latency: Wall-clock seconds for the call
+            usage: ``response.usage`` object from the OpenAI SDK, if any
+        """
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None)
+        
+        with self._lock:
+            self.openai_calls.append({
+                'stage': stage,
+                'model': model,
+                'latency_seconds': latency,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'cached_tokens': cached_tokens
+            })
+    
+    def add_cache_lookup(self, cache: str, hit: bool) -> None:
+        """Count a cache hit or miss."""
+        with self._lock:
+            counts = self.cache.setdefault(cache, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+    
+    def add_image_upload(self, report: Dict[str, Any]) -> None:
+        """Record the byte and token savings of one preprocessed vision upload."""
+        with self._lock:
+            self.image_uploads.append(dict(report))
+    
+    def add_prompt_compaction(self, report: Dict[str, Any]) -> None:
+        """Record the prompt tokens saved by compacting one prompt."""
+        with self._lock:
+            self.prompt_compactions.append(dict(report))
+    
+    def merge(self, other: "ExtractionTimings") -> None:
+        """Add another record's stages, calls, cache counts, uploads and compactions to this one."""
+        for stage, seconds in other.stages.items():
+            self.add_stage(stage, seconds)
+        with self._lock:
+            self.openai_calls.extend(other.openai_calls)
+            self.image_uploads.extend(other.image_uploads)
+            self.prompt_compactions.extend(other.prompt_compactions)
+            for cache, counts in other.cache.items():
+                mine = self.cache.setdefault(cache, {'hits': 0, 'misses': 0})
+                mine['hits'] += counts['hits']
+                mine['misses'] += counts['misses']
+    
+    @property
+    def openai_seconds(self) -> float:
+        """Total latency of all OpenAI calls."""
+        return sum(call['latency_seconds'] for call in self.openai_calls)
+    
+    def token_totals(self) -> Dict[str, int]:
+        """Summed prompt, completion and cached token counts."""
+        totals = {'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0}
+        for call in self.openai_calls:
+            for key in totals:
+                totals[key] += call[key] or 0
+        return totals
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        with self._lock:
+            return {
+                'total_seconds': self.total,
+                'stages': dict(self.stages),
+                'openai_calls': [dict(call) for call in self.openai_calls],
+                'openai_seconds': sum(call['latency_seconds'] for call in self.openai_calls),
+                'tokens': self.token_totals(),
+                'cache': {name: dict(counts) for name, counts in self.cache.items()},
+                'image_uploads': [dict(upload) for upload in self.image_uploads],
+                'prompt_compactions': [dict(report) for report in self.prompt_compactions]
+            }
+    
+    def __repr__(self) -> str:
+        stages = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.stages.items())
+        return f"ExtractionTimings({stages}, openai_calls={len(self.openai_calls)})"
+
+
+# Signature of a metrics sink: called once per document with its timing record
+MetricsSink = Callable[[ExtractionTimings], None]
+
+# Record for the document being processed in the current thread / task
+_current_timings: ContextVar[Optional[ExtractionTimings]] = ContextVar(
+    "extraction_timings", default=None
+)
+
+
+def current_timings() -> Optional[ExtractionTimings]:
+    """Timing record of the document being processed, or None outside a pipeline run."""
+    return _current_timings.get()
+
+
+@contextmanager
+def collect_timings(timings: Optional[ExtractionTimings] = None) -> Iterator[ExtractionTimings]:
+    """
+    Make a timing record current for the enclosed code.
+    
+    Stages timed with ``timed`` and OpenAI calls made with ``call_openai`` inside
+    the block (including in ``asyncio.to_thread`` workers and tasks created in it)
+    are recorded on it.
+    
+    Args:
+        timings: Record to fill. A new one is created if None.
+    """
+    if timings is None:
+        timings = ExtractionTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Add the duration of the enclosed block to a stage of the current record."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_stage(stage, time.perf_counter() - start)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache hit or miss on the current record."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_cache_lookup(cache, hit)
+
+
+def record_image_upload(report: Dict[str, Any]) -> None:
+    """Add a preprocessed vision upload (ImagePreprocessReport.to_dict()) to the current record."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_image_upload(report)
+
+
+def record_prompt_compaction(report: Dict[str, Any]) -> None:
+    """Add a compacted prompt (PromptBudget.report()) to the current record."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_prompt_compaction(report)
+
+
+def call_openai(stage: str, create: Callable[..., Any], **kwargs) -> Any:
+    """
+    Call an OpenAI ``create`` method and record its latency and token usage.
+    
+    Args:
+        stage: What the call is for, used as the label in the timing record
+        create: e.g. ``client.chat.completions.create``
+        **kwargs: Arguments passed to ``create``
+    
+    Returns:
+        The OpenAI response
+    """
+    start = time.perf_counter()
+    response = create(**kwargs)
+    _record_openai_call(stage, kwargs.get('model'), time.perf_counter() - start, response)
+    return response
+
+
+async def call_openai_async(stage: str, create: Callable[..., Any], **kwargs) -> Any:
+    """Async variant of call_openai for AsyncOpenAI ``create`` methods."""
+    start = time.perf_counter()
+    response = await create(**kwargs)
+    _record_openai_call(stage, kwargs.get('model'), time.perf_counter() - start, response)
+    return response
+
+
+def _record_openai_call(stage: str, model: Optional[str], latency: float, response: Any) -> None:
+    """Add a completed call to the current record."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_openai_call(stage, model, latency, getattr(response, 'usage', None))
@@ -0,0 +1,231 @@
+"""Persistent cache of OpenAI chat completion responses."""
+
+import json
+import time
+import asyncio
+import hashlib
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import call_openai, call_openai_async, record_cache_lookup
+from .tiered_cache import TieredCache
+
+
+class LLMResponseCache(TieredCache):
+    """
+    Two-tier (memory LRU + disk) cache of OpenAI chat completion responses.
+    
+    Keys are a hash of the whole request: model, every message (system prompt
+    and built prompt), the image digest and the sampling parameters. A change
+    to any prompt template therefore changes the keys of the requests built
+    from it, so stale responses are never returned; their entries age out by
+    TTL or size eviction. Bump FORMAT_VERSION to drop every entry at once.
+    
+    Only deterministic requests (temperature 0) are cached, and JSON-mode
+    responses only if they parse. The cache is safe to share between threads
+    and processes sharing cache_dir.
+    """
+    
+    # Part of every key; bump when the cached response format changes
+    FORMAT_VERSION = 1
+    
+    DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 1 week
+    DEFAULT_MAX_MEMORY_ENTRIES = 256
+    DEFAULT_MAX_DISK_BYTES = 64 * 1024 * 1024  # 64 MB
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES
+    ):
+        """
+        Initialize response cache.
+        
+        Args:
+            cache_dir: Directory for the disk tier. If None, only the memory tier is used.
+            ttl_seconds: Age after which an entry is no longer returned (None: no expiry)
+            max_memory_entries: Maximum number of responses kept in memory (0 disables the memory tier)
+            max_disk_bytes: Maximum total size of the disk tier before oldest entries are evicted
+        """
+        super().__init__(cache_dir, max_memory_entries, max_disk_bytes)
+        self.ttl_seconds = ttl_seconds
+    
+    @classmethod
+    def cacheable(cls, request: Dict[str, Any]) -> bool:
+        """Whether a request is deterministic enough to be answered from the cache."""
+        return request.get('temperature', 1.0) == 0.0
+    
+    @classmethod
+    def make_key(cls, request: Dict[str, Any], image_digest: Optional[str] = None) -> str:
+        """
+        Build a cache key from the arguments of ``chat.completions.create``.
+        
+        Image parts of the messages are keyed by image_digest (e.g.
+        ImageSource.sha256) instead of by their base64 data URL.
+        
+        Args:
+            request: Keyword arguments of the create call (model, messages, ...)
+            image_digest: Digest of the image sent with the request, if any
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        messages = []
+        for message in request.get('messages', []):
+            content = message.get('content')
+            if isinstance(content, list):
+                content = [
+                    {'type': 'image_url', 'image': image_digest or cls._hash_url(part)}
+                    if part.get('type') == 'image_url' else part
+                    for part in content
+                ]
+            messages.append({**message, 'content': content})
+        
+        keyed = {key: value for key, value in request.items() if key != 'messages'}
+        keyed['messages'] = messages
+        keyed['format_version'] = cls.FORMAT_VERSION
+        
+        payload = json.dumps(keyed, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Response message content if cached and not expired, otherwise None
+        """
+        entry = super().get(key)
+        return entry['content'] if entry is not None else None
+    
+    def put(self, key: str, content: str, model: Optional[str] = None) -> None:
+        """
+        Store a response in both tiers.
+        
+        Args:
+            key: Cache key from make_key
+            content: Response message content
+            model: Model that produced the response (kept for inspection)
+        """
+        super().put(key, {'content': content, 'model': model, 'created': time.time()})
+    
+    @staticmethod
+    def _hash_url(part: Dict[str, Any]) -> str:
+        """Digest of an image part's URL, for callers that pass no image digest."""
+        url = part.get('image_url', {}).get('url', '')
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+    
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        """Whether an entry is older than the TTL."""
+        return self.ttl_seconds is not None and time.time() - entry['created'] > self.ttl_seconds
+    
+    def _decode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Entry from its JSON dict, with only the known keys."""
+        return {'content': data['content'], 'model': data.get('model'), 'created': float(data['created'])}
+
+
+class CachedCompletion:
+    """
+    Chat completion served from an LLMResponseCache.
+    
+    Exposes ``choices[0].message.content`` like an SDK response. ``usage`` is
+    None: no tokens were billed for it.
+    """
+    
+    def __init__(self, content: str, model: Optional[str] = None):
+        self.model = model
+        self.choices = [SimpleNamespace(index=0, message=SimpleNamespace(role="assistant", content=content))]
+        self.usage = None
+
+
+def call_openai_cached(
+    cache: Optional[LLMResponseCache],
+    stage: str,
+    create: Callable[..., Any],
+    image_digest: Optional[str] = None,
+    **kwargs
+) -> Any:
+    """
+    call_openai, answered from a response cache when possible.
+    
+    Args:
+        cache: LLMResponseCache, or None to always call OpenAI
+        stage: What the call is for, used as the label in the timing record
+        create: e.g. ``client.chat.completions.create``
+        image_digest: Digest of the image in the messages, if any (see make_key)
+        **kwargs: Arguments passed to ``create``
+    
+    Returns:
+        The OpenAI response, or a CachedCompletion
+    """
+    if cache is None or not cache.cacheable(kwargs):
+        return call_openai(stage, create, **kwargs)
+    
+    key = cache.make_key(kwargs, image_digest)
+    content = cache.get(key)
+    record_cache_lookup("openai", content is not None)
+    if content is not None:
+        return CachedCompletion(content, kwargs.get('model'))
+    
+    response = call_openai(stage, create, **kwargs)
+    _store(cache, key, response, kwargs)
+    return response
+
+
+async def call_openai_cached_async(
+    cache: Optional[LLMResponseCache],
+    stage: str,
+    create: Callable[..., Any],
+    image_digest: Optional[str] = None,
+    **kwargs
+) -> Any:
+    """Async variant of call_openai_cached; disk reads and writes run in worker threads."""
+    if cache is None or not cache.cacheable(kwargs):
+        return await call_openai_async(stage, create, **kwargs)
+    
+    key = cache.make_key(kwargs, image_digest)
+    content = await asyncio.to_thread(cache.get, key)
+    record_cache_lookup("openai", content is not None)
+    if content is not None:
+        return CachedCompletion(content, kwargs.get('model'))
+    
+    response = await call_openai_async(stage, create, **kwargs)
+    await asyncio.to_thread(_store, cache, key, response, kwargs)
+    return response
+
+
+def _store(cache: LLMResponseCache, key: str, response: Any, request: Dict[str, Any]) -> None:
+    """Cache a response's content unless it is empty or, in JSON mode, not valid JSON."""
+    try:
+        content = response.choices[0].message.content
+    except (AttributeError, IndexError):
+        return
+    if not isinstance(content, str) or not content.strip():
+        return
+    
+    response_format = request.get('response_format') or {}
+    if response_format.get('type') == 'json_object':
+        try:
+            json.loads(_strip_code_fence(content))
+        except ValueError:
+            # Do not pin a malformed answer; a retry may get a valid one
+            return
+    
+    cache.put(key, content, request.get('model'))
+
+
+def _strip_code_fence(text: str) -> str:
+    """Text without a surrounding markdown code block."""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
@@ -0,0 +1,234 @@
+"""Two-tier (memory LRU + disk) cache shared by the OCR and OpenAI response caches."""
+
+import os
+import json
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class TieredCache:
+    """
+    Memory LRU in front of a size-bounded directory of JSON files.
+    
+    Subclasses build the keys and convert values to and from JSON
+    (_encode/_decode); they may also expire entries (_is_expired). Disk
+    writes are atomic and the oldest files are evicted first, so the cache
+    is safe to share between threads and processes sharing cache_dir.
+    """
+    
+    DEFAULT_MAX_MEMORY_ENTRIES = 128
+    DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024  # 512 MB
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES
+    ):
+        """
+        Initialize both tiers.
+        
+        Args:
+            cache_dir: Directory for the disk tier. If None, only the memory tier is used.
+            max_memory_entries: Maximum number of values kept in memory (0 disables the memory tier)
+            max_disk_bytes: Maximum total size of the disk tier before oldest entries are evicted
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.expired = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        
+        self._disk_bytes = 0
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value, first in memory, then on disk.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The cached value if present and not expired, otherwise None
+        """
+        expired = False
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                if not self._is_expired(value):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+                expired = True
+        
+        # Another process sharing cache_dir may have stored a newer value
+        value = self._read_disk(key)
+        if value is not None and self._is_expired(value):
+            self._delete_disk(key)
+            value, expired = None, True
+        
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                self.expired += expired
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._put_memory(key, value)
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._put_memory(key, value)
+        self._write_disk(key, value)
+    
+    def clear(self) -> None:
+        """Remove all entries from both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            if self.cache_dir:
+                for path in self.cache_dir.glob("*.json"):
+                    path.unlink(missing_ok=True)
+                self._disk_bytes = 0
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/expiry/eviction counters and current tier sizes."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'expired': self.expired,
+                'memory_evictions': self.memory_evictions,
+                'disk_evictions': self.disk_evictions,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes
+            }
+    
+    def _encode(self, value: Any) -> Any:
+        """JSON-serializable form of a value for the disk tier."""
+        return value
+    
+    def _decode(self, data: Any) -> Any:
+        """Value from its disk form; may raise KeyError, TypeError or ValueError if malformed."""
+        return data
+    
+    def _is_expired(self, value: Any) -> bool:
+        """Whether a value must no longer be returned (never, unless a subclass says so)."""
+        return False
+    
+    def _put_memory(self, key: str, value: Any) -> None:
+        """Insert into the memory tier and evict least recently used entries (lock held)."""
+        if self.max_memory_entries <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+    
+    def _disk_path(self, key: str) -> Path:
+        """Path of the disk entry for a key."""
+        return self.cache_dir / f"{key}.json"
+    
+    def _read_disk(self, key: str) -> Optional[Any]:
+        """Load an entry from the disk tier, or None if absent or unreadable."""
+        if not self.cache_dir:
+            return None
+        
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = self._decode(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        
+        # Touch so size-based eviction drops least recently used entries first
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+    
+    def _delete_disk(self, key: str) -> None:
+        """Remove an entry from the disk tier."""
+        path = self._disk_path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+    
+    def _write_disk(self, key: str, value: Any) -> None:
+        """Write an entry to the disk tier and enforce the size limit."""
+        if not self.cache_dir:
+            return
+        
+        path = self._disk_path(key)
+        # Write to a temp file first so concurrent readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._encode(value), f, ensure_ascii=False)
+            previous_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except (OSError, TypeError, ValueError):
+            # Disk tier is best-effort, the memory tier still holds the value
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+        
+        with self._lock:
+            self._disk_bytes += size - previous_size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk(keep=path)
+    
+    def _evict_disk(self, keep: Path) -> None:
+        """Delete least recently used disk entries until under the size limit (lock held)."""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        # Re-sync with the directory, other processes may share it
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            self._disk_bytes -= size
+            self.disk_evictions += 1
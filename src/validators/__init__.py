@@ -1,6 +1,7 @@
 """Validation and correction modules."""
 
 from .ai_validator import AIValidator, ValidationResult
+from .rule_corrector import RuleBasedCorrector
 
-__all__ = ['AIValidator', 'ValidationResult']
+__all__ = ['AIValidator', 'ValidationResult', 'RuleBasedCorrector']
 
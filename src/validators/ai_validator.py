@@ -3,18 +3,22 @@
 import os
 import json
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from decimal import Decimal
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
+    AsyncOpenAI = None
 
 from src.schema import InstallmentAgreementSchema
 from src.ocr import OCRResult
+from src.utils.response_cache import LLMResponseCache, call_openai_cached, call_openai_cached_async
+from src.utils.client_registry import get_openai_client, get_async_openai_client
+from .rule_corrector import RuleBasedCorrector
 
 
 class ValidationIssue:
@@ -38,12 +42,14 @@ class ValidationResult:
         corrected_schema: InstallmentAgreementSchema,
         issues_found: List[ValidationIssue],
         corrections_applied: List[str],
-        used_ai: bool
+        used_ai: bool,
+        used_rules: bool = False
     ):
         self.corrected_schema = corrected_schema
         self.issues_found = issues_found
         self.corrections_applied = corrections_applied
         self.used_ai = used_ai
+        self.used_rules = used_rules
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -58,20 +64,27 @@ class ValidationResult:
                 for issue in self.issues_found
             ],
             'corrections_applied': self.corrections_applied,
-            'used_ai': self.used_ai
+            'used_ai': self.used_ai,
+            'used_rules': self.used_rules
         }
 
 
 class AIValidator:
     """AI-powered validator for normalizing and correcting extracted data."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        response_cache: Optional[LLMResponseCache] = None
+    ):
         """
         Initialize AI validator.
         
         Args:
             api_key: OpenAI API key. If None, uses OPENAI_API_KEY env var.
             model: OpenAI model to use (default: gpt-4o-mini)
+            response_cache: Optional LLMResponseCache for correction requests
         """
         if not OPENAI_AVAILABLE:
             raise ImportError("openai package not installed. Install with: pip install openai")
@@ -80,60 +93,139 @@ class AIValidator:
         if not self.api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY env var or pass api_key parameter.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        # Shared per process so every pipeline reuses one HTTP connection pool
+        self.client = get_openai_client(self.api_key)
         self.model = model
+        self.response_cache = response_cache
+    
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        """Shared AsyncOpenAI client for the running event loop."""
+        return get_async_openai_client(self.api_key)
     
     def validate_and_correct(
         self,
         schema: InstallmentAgreementSchema,
-        ocr_result: OCRResult
+        ocr_result: OCRResult,
+        allow_ai: bool = True
     ) -> ValidationResult:
         """
         Validate and correct extracted schema using AI.
         
         This method:
         1. Detects validation issues (name mismatches, address problems, etc.)
-        2. Uses AI to normalize and correct issues
-        3. Ensures buyer/co-buyer consistency (shared last names, addresses)
-        4. Returns corrected schema with applied fixes
+        2. Applies deterministic fixes from OCR tokens (RuleBasedCorrector)
+        3. Uses AI to normalize and correct only the issues the rules could not resolve
+        4. Ensures buyer/co-buyer consistency (shared last names, addresses)
+        5. Returns corrected schema with applied fixes
         
         Args:
             schema: Initial extracted schema
             ocr_result: OCR result for context
+            allow_ai: If False, only the rule-based fixes are applied (e.g. for
+                      documents of a known layout)
         
         Returns:
             ValidationResult with corrected schema and issues found
         """
-        # Step 1: Detect issues
-        issues = self._detect_issues(schema, ocr_result)
+        # Step 1 & 2: Detect issues and fix what the rules can
+        schema, issues, remaining, rule_corrections = self._apply_rules(schema, ocr_result)
         
-        # Step 2: Determine if AI correction is needed
-        needs_correction = any(
+        # Step 3: Determine if AI correction is still needed
+        needs_correction = allow_ai and any(
             issue.severity in ['medium', 'high'] 
-            for issue in issues
+            for issue in remaining
+        )
+        
+        if not needs_correction:
+            return ValidationResult(
+                corrected_schema=schema,
+                issues_found=issues,
+                corrections_applied=rule_corrections,
+                used_ai=False,
+                used_rules=bool(rule_corrections)
+            )
+        
+        # Step 4: Use AI to correct remaining issues
+        try:
+            corrected_schema = self._ai_correct(schema, ocr_result, remaining)
+            corrections = rule_corrections + [
+                f"Corrected {issue.field}: {issue.description}" for issue in remaining
+            ]
+            
+            return ValidationResult(
+                corrected_schema=corrected_schema,
+                issues_found=issues,
+                corrections_applied=corrections,
+                used_ai=True,
+                used_rules=bool(rule_corrections)
+            )
+        except Exception as e:
+            # If AI correction fails, return the rule-corrected schema
+            try:
+                from src.utils import get_logger
+                logger = get_logger()
+                logger.warning(f"AI validation failed: {e}, returning original schema")
+            except ImportError:
+                pass
+            
+            return ValidationResult(
+                corrected_schema=schema,
+                issues_found=issues,
+                corrections_applied=rule_corrections,
+                used_ai=False,
+                used_rules=bool(rule_corrections)
+            )
+    
+    async def validate_and_correct_async(
+        self,
+        schema: InstallmentAgreementSchema,
+        ocr_result: OCRResult,
+        allow_ai: bool = True
+    ) -> ValidationResult:
+        """
+        Async variant of validate_and_correct using AsyncOpenAI.
+        
+        Args:
+            schema: Initial extracted schema
+            ocr_result: OCR result for context
+            allow_ai: If False, only the rule-based fixes are applied
+        
+        Returns:
+            ValidationResult with corrected schema and issues found
+        """
+        # Issue detection and rule fixes are string checks, cheap enough for the loop
+        schema, issues, remaining, rule_corrections = self._apply_rules(schema, ocr_result)
+        
+        needs_correction = allow_ai and any(
+            issue.severity in ['medium', 'high']
+            for issue in remaining
         )
         
         if not needs_correction:
             return ValidationResult(
                 corrected_schema=schema,
                 issues_found=issues,
-                corrections_applied=[],
-                used_ai=False
+                corrections_applied=rule_corrections,
+                used_ai=False,
+                used_rules=bool(rule_corrections)
             )
         
-        # Step 3: Use AI to correct issues
         try:
-            corrected_schema = self._ai_correct(schema, ocr_result, issues)
-            corrections = [f"Corrected {issue.field}: {issue.description}" for issue in issues]
+            corrected_schema = await self._ai_correct_async(schema, ocr_result, remaining)
+            corrections = rule_corrections + [
+                f"Corrected {issue.field}: {issue.description}" for issue in remaining
+            ]
             
             return ValidationResult(
                 corrected_schema=corrected_schema,
                 issues_found=issues,
                 corrections_applied=corrections,
-                used_ai=True
+                used_ai=True,
+                used_rules=bool(rule_corrections)
             )
         except Exception as e:
-            # If AI correction fails, return original schema
+            # If AI correction fails, return the rule-corrected schema
             try:
                 from src.utils import get_logger
                 logger = get_logger()
@@ -144,10 +236,34 @@ class AIValidator:
             return ValidationResult(
                 corrected_schema=schema,
                 issues_found=issues,
-                corrections_applied=[],
-                used_ai=False
+                corrections_applied=rule_corrections,
+                used_ai=False,
+                used_rules=bool(rule_corrections)
             )
     
+    def _apply_rules(
+        self,
+        schema: InstallmentAgreementSchema,
+        ocr_result: OCRResult
+    ) -> Tuple[InstallmentAgreementSchema, List[ValidationIssue], List[ValidationIssue], List[str]]:
+        """
+        Detect issues and resolve what RuleBasedCorrector can without OpenAI.
+        
+        Returns:
+            Tuple of (rule-corrected schema, issues found on the input,
+            issues still needing AI, rule corrections applied)
+        """
+        issues = self._detect_issues(schema, ocr_result)
+        
+        corrector = RuleBasedCorrector(ocr_result)
+        schema, rule_corrections = corrector.correct(schema, issues)
+        
+        # Re-check after local fixes, then drop issues the OCR confirms are fine
+        remaining = self._detect_issues(schema, ocr_result) if rule_corrections else issues
+        remaining = corrector.unresolved(remaining, schema)
+        
+        return schema, issues, remaining, rule_corrections
+    
     def _detect_issues(
         self,
         schema: InstallmentAgreementSchema,
@@ -324,6 +440,49 @@ class AIValidator:
         issues: List[ValidationIssue]
     ) -> InstallmentAgreementSchema:
         """Use AI to correct detected issues."""
+        messages, logger = self._prepare_correction_request(schema, ocr_result, issues)
+        
+        # Call OpenAI
+        response = call_openai_cached(
+            self.response_cache,
+            "validation",
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+        
+        return self._parse_correction_response(response, logger)
+    
+    async def _ai_correct_async(
+        self,
+        schema: InstallmentAgreementSchema,
+        ocr_result: OCRResult,
+        issues: List[ValidationIssue]
+    ) -> InstallmentAgreementSchema:
+        """Use AI to correct detected issues without blocking the event loop."""
+        messages, logger = self._prepare_correction_request(schema, ocr_result, issues)
+        
+        response = await call_openai_cached_async(
+            self.response_cache,
+            "validation",
+            self.async_client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+        
+        return self._parse_correction_response(response, logger)
+    
+    def _prepare_correction_request(
+        self,
+        schema: InstallmentAgreementSchema,
+        ocr_result: OCRResult,
+        issues: List[ValidationIssue]
+    ) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Build chat messages for AI correction."""
         # Build correction prompt
         prompt = self._build_correction_prompt(schema, ocr_result, issues)
         
@@ -335,23 +494,24 @@ class AIValidator:
         except ImportError:
             logger = None
         
-        # Call OpenAI
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._get_correction_system_prompt()
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.0,
-            response_format={"type": "json_object"}
-        )
-        
+        messages = [
+            {
+                "role": "system",
+                "content": self._get_correction_system_prompt()
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        return messages, logger
+    
+    def _parse_correction_response(
+        self,
+        response: Any,
+        logger: Optional[Any]
+    ) -> InstallmentAgreementSchema:
+        """Decode the correction completion into a schema."""
         # Parse response
         response_text = response.choices[0].message.content.strip()
         
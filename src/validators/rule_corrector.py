@@ -0,0 +1,232 @@
+"""Deterministic corrections applied before falling back to AI validation."""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple, Any
+
+from src.schema import InstallmentAgreementSchema
+from src.ocr import OCRResult
+
+
+class RuleBasedCorrector:
+    """
+    Fix common extraction problems locally from OCR tokens and word confidences.
+    
+    Handles the corrections AIValidator used to send to OpenAI most often:
+    - Buyer/co-buyer surnames that differ only by OCR errors are unified to the
+      spelling the OCR read with higher confidence
+    - A missing co-buyer address is copied from the buyer when they share a surname
+    - Phone numbers that leaked into an address are stripped
+    - A missing street number is restored from the OCR word preceding the address
+    - "Possible OCR error" flags are cleared when every word of the value was read
+      with high confidence
+    
+    Issues it cannot resolve are left for the AI correction call.
+    """
+    
+    # Minimum SequenceMatcher ratio for two surnames to count as OCR variants
+    SURNAME_SIMILARITY_THRESHOLD = 0.6
+    
+    # Minimum word confidence for OCR tokens used to confirm or fill values
+    MIN_WORD_CONFIDENCE = 0.9
+    
+    PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[\s.\-]*\d{3}[\s.\-]*\d{4}')
+    
+    def __init__(self, ocr_result: OCRResult):
+        """
+        Initialize corrector.
+        
+        Args:
+            ocr_result: OCR result providing word tokens and confidences
+        """
+        self.words = [
+            word for word in ocr_result.word_annotations
+            if self._normalize(word.get('text', ''))
+        ]
+        
+        # Best confidence seen for each normalized token
+        self.token_confidence: Dict[str, float] = {}
+        for word in self.words:
+            token = self._normalize(word['text'])
+            confidence = word.get('confidence')
+            confidence = 0.0 if confidence is None else confidence
+            if confidence > self.token_confidence.get(token, -1.0):
+                self.token_confidence[token] = confidence
+    
+    def correct(
+        self,
+        schema: InstallmentAgreementSchema,
+        issues: List[Any]
+    ) -> Tuple[InstallmentAgreementSchema, List[str]]:
+        """
+        Apply deterministic fixes for the given issues.
+        
+        Args:
+            schema: Extracted schema
+            issues: ValidationIssue list from AIValidator._detect_issues
+        
+        Returns:
+            Tuple of (corrected schema, descriptions of corrections applied)
+        """
+        data = schema.model_dump()
+        corrections: List[str] = []
+        issue_types = {(issue.field, issue.issue_type) for issue in issues}
+        
+        if ("buyer_name/co_buyer_name", "last_name_mismatch") in issue_types:
+            self._unify_surnames(data, corrections)
+        
+        for field in ("street_address", "buyer_address", "co_buyer_address", "seller_address"):
+            if not data.get(field):
+                continue
+            # _detect_issues checks the legacy street_address, which mirrors buyer_address
+            flagged = {t for f, t in issue_types if f == field}
+            if field in ("buyer_address", "co_buyer_address"):
+                flagged |= {t for f, t in issue_types if f == "street_address"}
+            
+            if "address_contains_phone" in flagged or self.PHONE_PATTERN.search(data[field]):
+                self._strip_phone(data, field, corrections)
+            if "missing_street_number" in flagged:
+                self._restore_street_number(data, field, corrections)
+        
+        self._copy_co_buyer_address(data, corrections)
+        
+        if not corrections:
+            return schema, corrections
+        
+        try:
+            return InstallmentAgreementSchema(**data), corrections
+        except Exception:
+            # Never make things worse than the input
+            return schema, []
+    
+    def unresolved(self, issues: List[Any], schema: InstallmentAgreementSchema) -> List[Any]:
+        """
+        Drop issues that the OCR evidence shows are not real problems.
+        
+        Args:
+            issues: ValidationIssue list for the (corrected) schema
+            schema: Schema the issues were detected on
+        
+        Returns:
+            Issues that still need AI correction
+        """
+        remaining = []
+        for issue in issues:
+            if issue.issue_type == "possible_ocr_error":
+                value = getattr(schema, issue.field, None)
+                if value and self._confirmed_by_ocr(value):
+                    continue
+            remaining.append(issue)
+        return remaining
+    
+    def _unify_surnames(self, data: Dict[str, Any], corrections: List[str]) -> None:
+        """Give buyer and co-buyer the same surname when they differ by OCR errors."""
+        buyer_parts = (data.get("buyer_name") or "").split()
+        co_buyer_parts = (data.get("co_buyer_name") or "").split()
+        if len(buyer_parts) < 2 or len(co_buyer_parts) < 2:
+            return
+        
+        buyer_last, co_buyer_last = buyer_parts[-1], co_buyer_parts[-1]
+        similarity = SequenceMatcher(None, buyer_last.lower(), co_buyer_last.lower()).ratio()
+        if similarity < self.SURNAME_SIMILARITY_THRESHOLD:
+            # Likely different surnames, leave the decision to the AI
+            return
+        
+        buyer_confidence = self.token_confidence.get(self._normalize(buyer_last), 0.0)
+        co_buyer_confidence = self.token_confidence.get(self._normalize(co_buyer_last), 0.0)
+        
+        if co_buyer_confidence > buyer_confidence:
+            data["buyer_name"] = " ".join(buyer_parts[:-1] + [co_buyer_last])
+            corrections.append(
+                f"Rule: buyer_name surname '{buyer_last}' -> '{co_buyer_last}' "
+                f"(OCR confidence {co_buyer_confidence:.2f} vs {buyer_confidence:.2f})"
+            )
+        else:
+            data["co_buyer_name"] = " ".join(co_buyer_parts[:-1] + [buyer_last])
+            corrections.append(
+                f"Rule: co_buyer_name surname '{co_buyer_last}' -> '{buyer_last}' "
+                f"(OCR confidence {buyer_confidence:.2f} vs {co_buyer_confidence:.2f})"
+            )
+    
+    def _strip_phone(self, data: Dict[str, Any], field: str, corrections: List[str]) -> None:
+        """Remove a phone number that leaked into an address."""
+        original = data[field]
+        cleaned = self.PHONE_PATTERN.sub(" ", original)
+        cleaned = re.sub(r'\s+', ' ', cleaned).strip(" ,;-")
+        if cleaned == original or not cleaned:
+            return
+        data[field] = cleaned
+        corrections.append(f"Rule: removed phone number from {field}: '{original}' -> '{cleaned}'")
+    
+    def _restore_street_number(self, data: Dict[str, Any], field: str, corrections: List[str]) -> None:
+        """Prepend the street number the OCR read just before the address."""
+        address = data[field]
+        if re.match(r'^\d+', address):
+            return
+        
+        tokens = [self._normalize(part) for part in address.split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return
+        
+        start = self._find_sequence(tokens)
+        if start is None or start == 0:
+            return
+        
+        previous = self.words[start - 1]
+        number = previous['text'].strip()
+        confidence = previous.get('confidence') or 0.0
+        if not re.fullmatch(r'\d+[A-Za-z]?', number) or confidence < self.MIN_WORD_CONFIDENCE:
+            return
+        if not self._same_line(previous, self.words[start]):
+            return
+        
+        data[field] = f"{number} {address}"
+        corrections.append(f"Rule: restored street number in {field}: '{address}' -> '{data[field]}'")
+    
+    def _copy_co_buyer_address(self, data: Dict[str, Any], corrections: List[str]) -> None:
+        """Copy the buyer address to a co-buyer with the same surname and no address."""
+        buyer_address = data.get("buyer_address") or data.get("street_address")
+        if not buyer_address or data.get("co_buyer_address"):
+            return
+        
+        buyer_parts = (data.get("buyer_name") or "").split()
+        co_buyer_parts = (data.get("co_buyer_name") or "").split()
+        if len(buyer_parts) < 2 or len(co_buyer_parts) < 2:
+            return
+        if buyer_parts[-1].lower() != co_buyer_parts[-1].lower():
+            return
+        
+        data["co_buyer_address"] = buyer_address
+        corrections.append(f"Rule: copied buyer address to co_buyer_address: '{buyer_address}'")
+    
+    def _confirmed_by_ocr(self, value: str) -> bool:
+        """Whether every word of a value was read by OCR with high confidence."""
+        tokens = [self._normalize(part) for part in value.split()]
+        tokens = [token for token in tokens if token]
+        return bool(tokens) and all(
+            self.token_confidence.get(token, 0.0) >= self.MIN_WORD_CONFIDENCE
+            for token in tokens
+        )
+    
+    def _find_sequence(self, tokens: List[str]) -> Optional[int]:
+        """Index of the first OCR word starting the given token sequence."""
+        normalized = [self._normalize(word['text']) for word in self.words]
+        for i in range(len(normalized) - len(tokens) + 1):
+            if normalized[i:i + len(tokens)] == tokens:
+                return i
+        return None
+    
+    @staticmethod
+    def _same_line(word_a: Dict[str, Any], word_b: Dict[str, Any]) -> bool:
+        """Whether two words overlap vertically."""
+        ys_a = [v.get('y', 0) for v in word_a.get('bounding_box', [])]
+        ys_b = [v.get('y', 0) for v in word_b.get('bounding_box', [])]
+        if not ys_a or not ys_b:
+            return True
+        return min(ys_a) <= max(ys_b) and min(ys_b) <= max(ys_a)
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Uppercase alphanumeric form of a token for matching."""
+        return re.sub(r'[^A-Z0-9]', '', text.upper())
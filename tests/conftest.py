@@ -2,6 +2,8 @@
 
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
+from src.ocr import OCRResult
 from src.pipeline import ExtractionPipeline
 
 # Test data paths
@@ -10,6 +12,52 @@ TEST_IMAGES_DIR = PROJECT_ROOT / "examples"
 CREDENTIALS_PATH = PROJECT_ROOT / "matt-481014-e5ff3d867b2a.json"
 
 
+def make_box(x, y, width=40, height=20):
+    """Bounding box vertices in the VisionOCRClient format."""
+    return [
+        {'x': x, 'y': y}, {'x': x + width, 'y': y},
+        {'x': x + width, 'y': y + height}, {'x': x, 'y': y + height}
+    ]
+
+
+def make_word(text, x, y, width=40, height=20, confidence=0.9):
+    """Word annotation in the VisionOCRClient format."""
+    return {'text': text, 'bounding_box': make_box(x, y, width, height), 'confidence': confidence}
+
+
+def make_ocr_result(full_text, words=None, blocks=None, confidence_scores=None):
+    """OCR result built from text and annotations, without a raw response."""
+    return OCRResult(
+        full_text=full_text,
+        word_annotations=list(words or []),
+        block_annotations=list(blocks or []),
+        confidence_scores=confidence_scores or {},
+        raw_response={},
+        warnings=[]
+    )
+
+
+
+def make_async_openai_client(content, requests=None, error=None):
+    """
+    Stand-in for AsyncOpenAI whose chat completions return one message.
+    
+    Args:
+        content: Message content of every completion
+        requests: Optional list receiving the keyword arguments of each call
+        error: Optional exception raised instead of answering
+    """
+    async def create(**kwargs):
+        if requests is not None:
+            requests.append(kwargs)
+        if error is not None:
+            raise error
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+    
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
 @pytest.fixture
 def pipeline():
     """Create extraction pipeline instance."""
@@ -0,0 +1,73 @@
+"""Tests for packed OCR annotations."""
+
+import json
+
+from src.ocr import OCRResult, PackedAnnotations
+from src.extractors.word_table import WordTable
+from tests.conftest import make_word
+
+
+class TestPackedAnnotations:
+    """Test PackedAnnotations storage and dict views."""
+    
+    def test_views_match_dicts(self):
+        """Indexing returns views equal to the original dicts."""
+        words = [make_word("Seller:", 10, 10), make_word("ACME", 60, 10, confidence=None)]
+        packed = PackedAnnotations(words)
+        
+        assert len(packed) == 2
+        assert packed[0] == words[0]
+        assert packed[-1]['confidence'] is None
+        assert packed[1].get('bounding_box') == words[1]['bounding_box']
+        assert packed == words
+        assert packed.to_list() == words
+    
+    def test_optional_keys_are_preserved(self):
+        """Missing confidences stay missing and extra keys are kept."""
+        blocks = [
+            {'text': "a", 'bounding_box': [{'x': 1, 'y': 2}], 'block_type': 'TEXT'},
+            {'text': "b", 'bounding_box': [{'x': 3, 'y': 4}], 'confidence': 0.5},
+        ]
+        packed = PackedAnnotations(blocks)
+        
+        assert 'confidence' not in packed[0]
+        assert packed[0].get('confidence', 1.0) == 1.0
+        assert packed[0]['block_type'] == 'TEXT'
+        assert 'block_type' not in packed[1]
+        assert packed.to_list() == blocks
+    
+    def test_float_coordinates(self):
+        """Non-integer vertices switch the coordinate column to floats."""
+        packed = PackedAnnotations([make_word("a", 0, 0)])
+        packed.append("b", [(0.5, 1.5), (2.5, 3.5)], 0.8)
+        
+        assert packed[0]['bounding_box'][1] == {'x': 40, 'y': 0}
+        assert packed[1]['bounding_box'] == [{'x': 0.5, 'y': 1.5}, {'x': 2.5, 'y': 3.5}]
+    
+    def test_ocr_result_round_trip(self):
+        """OCRResult packs annotations and serializes them as plain dicts."""
+        words = [make_word("Quantity:", 10, 10), make_word("2", 120, 10)]
+        result = OCRResult(
+            full_text="Quantity: 2",
+            word_annotations=words,
+            block_annotations=[],
+            confidence_scores={},
+            raw_response={},
+            warnings=[]
+        )
+        
+        assert isinstance(result.word_annotations, PackedAnnotations)
+        data = json.loads(json.dumps(result.to_dict()))
+        assert data['word_annotations'] == words
+        assert OCRResult.from_dict(data).word_annotations == words
+    
+    def test_word_table_from_packed(self):
+        """WordTable builds the same columns from packed annotations as from dicts."""
+        words = [make_word("Phone:", 10, 10), make_word("215-555-0100", 80, 12, confidence=None)]
+        words.append({'text': "x", 'bounding_box': [{'x': 5, 'y': 50}]})
+        
+        expected = WordTable(words)
+        table = WordTable(PackedAnnotations(words))
+        
+        for index in range(len(words)):
+            assert table.row(index) == expected.row(index)
@@ -0,0 +1,136 @@
+"""Tests for concurrent batch extraction."""
+
+import threading
+import time
+
+import pytest
+from src.pipeline import BatchItemResult
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SIGNATURE = b'\xff\xd8\xff\xe0'
+
+
+@pytest.fixture
+def fake_stages(pipeline, monkeypatch):
+    """Replace batch OCR and the per-document stages with fakes."""
+    calls = {'ocr_batches': [], 'fields': []}
+    
+    def fake_extract_text_batch(images, save_raw_output=False, output_dir=None, return_exceptions=False):
+        calls['ocr_batches'].append(len(images))
+        results = []
+        for source in images:
+            if source.name.startswith("bad_ocr"):
+                results.append(RuntimeError("API Error: bad image"))
+            else:
+                results.append(source.image_format)
+        return results
+    
+    def fake_run(source, save_raw_ocr, start_time, ocr_result=None, timings=None, fields=None):
+        calls['fields'].append(fields)
+        # Later inputs finish first
+        time.sleep(0.05 if source.name == "a.png" else 0.0)
+        return (source.name, ocr_result)
+    
+    monkeypatch.setattr(pipeline.ocr_client, "extract_text_batch", fake_extract_text_batch)
+    monkeypatch.setattr(pipeline, "_run", fake_run)
+    return calls
+
+
+def write_image(tmp_path, name, signature=PNG_SIGNATURE):
+    """Write a file with an image signature and return its path."""
+    path = tmp_path / name
+    path.write_bytes(signature + b"data")
+    return str(path)
+
+
+class TestExtractBatch:
+    """Test ExtractionPipeline.extract_batch ordering, errors and concurrency."""
+    
+    def test_results_in_input_order(self, pipeline, fake_stages, tmp_path):
+        """Results should come back in input order even if they finish out of order."""
+        a = write_image(tmp_path, "a.png")
+        b = write_image(tmp_path, "b.jpg", JPEG_SIGNATURE)
+        
+        results = pipeline.extract_batch(
+            [a, PNG_SIGNATURE + b"data", b, JPEG_SIGNATURE + b"data"],
+            max_workers=4
+        )
+        
+        assert [r.index for r in results] == [0, 1, 2, 3]
+        assert [r.result for r in results] == [
+            ("a.png", "PNG"), ("batch_1", "PNG"), ("b.jpg", "JPEG"), ("batch_3", "JPEG")
+        ]
+        assert [r.source for r in results] == [a, "<bytes>", b, "<bytes>"]
+        assert all(isinstance(r, BatchItemResult) and r.ok for r in results)
+    
+    def test_per_document_errors(self, pipeline, fake_stages, tmp_path):
+        """A failing document should not abort the batch."""
+        ok = write_image(tmp_path, "ok.png")
+        bad_ocr = write_image(tmp_path, "bad_ocr.png")
+        missing = str(tmp_path / "missing.png")
+        
+        results = pipeline.extract_batch([ok, missing, b"not an image", bad_ocr])
+        
+        assert results[0].ok
+        assert isinstance(results[1].error, FileNotFoundError)
+        assert isinstance(results[2].error, ValueError)
+        assert isinstance(results[3].error, RuntimeError)
+        assert results[1].to_dict()['error'].startswith("FileNotFoundError")
+    
+    def test_ocr_is_batched(self, pipeline, fake_stages, tmp_path):
+        """OCR should be requested in chunks of the Vision batch size."""
+        batch_size = pipeline.ocr_client.MAX_BATCH_SIZE
+        paths = [write_image(tmp_path, f"{i}.png") for i in range(batch_size + 4)]
+        
+        results = pipeline.extract_batch(paths)
+        
+        assert fake_stages['ocr_batches'] == [batch_size, 4]
+        assert all(r.ok for r in results)
+    
+    def test_fields_passed_to_each_document(self, pipeline, fake_stages, tmp_path):
+        """A fields subset reaches the stages of every document."""
+        paths = [write_image(tmp_path, f"{i}.png") for i in range(3)]
+        
+        results = pipeline.extract_batch(paths, fields=['apr', 'amount_financed'])
+        
+        assert all(r.ok for r in results)
+        assert fake_stages['fields'] == [['apr', 'amount_financed']] * 3
+    
+    def test_unknown_fields_rejected_before_ocr(self, pipeline, fake_stages, tmp_path):
+        """Unknown field names fail the whole batch before any OCR request."""
+        with pytest.raises(ValueError):
+            pipeline.extract_batch([write_image(tmp_path, "a.png")], fields=['not_a_field'])
+        
+        assert fake_stages['ocr_batches'] == []
+    
+    def test_in_flight_limit(self, pipeline, fake_stages, tmp_path, monkeypatch):
+        """No more than max_workers documents should run at once."""
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+        
+        def fake_run(source, save_raw_ocr, start_time, ocr_result=None, timings=None, fields=None):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.02)
+            with lock:
+                state['active'] -= 1
+            return source.name
+        
+        monkeypatch.setattr(pipeline, "_run", fake_run)
+        
+        paths = [write_image(tmp_path, f"{i}.png") for i in range(12)]
+        results = pipeline.extract_batch(paths, max_workers=3)
+        
+        assert len(results) == 12
+        assert state['peak'] <= 3
+    
+    def test_invalid_max_workers(self, pipeline):
+        """max_workers must be positive."""
+        with pytest.raises(ValueError):
+            pipeline.extract_batch(["a.png"], max_workers=0)
+    
+    def test_empty_batch(self, pipeline):
+        """An empty batch returns an empty list."""
+        assert pipeline.extract_batch([]) == []
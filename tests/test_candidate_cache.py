@@ -0,0 +1,60 @@
+"""Tests for per-document memoization of deterministic field candidates."""
+
+from src.extractors import DeterministicExtractor
+from src.extractors.enhanced_extractor import EnhancedExtractor
+from src.schema import InstallmentAgreementSchema
+from tests.conftest import make_word, make_ocr_result
+
+
+def make_result():
+    """OCR result with a quantity and an amount financed."""
+    words = [
+        make_word("Quantity:", 10, 100), make_word("2", 120, 100),
+        make_word("Amount", 10, 200), make_word("Financed:", 60, 200),
+        make_word("$1,234.56", 160, 200),
+    ]
+    return make_ocr_result("Quantity: 2\nAmount Financed: $1,234.56", words)
+
+
+class TestCandidateCache:
+    """Test that each field is searched once per document."""
+    
+    def test_candidates_searched_once(self, monkeypatch):
+        """Repeated lookups return the list found by extract_all_fields."""
+        extractor = DeterministicExtractor(make_result())
+        calls = []
+        search = extractor._search_field_candidates
+        
+        def counting_search(field_name):
+            calls.append(field_name)
+            return search(field_name)
+        
+        monkeypatch.setattr(extractor, "_search_field_candidates", counting_search)
+        
+        extractor.extract_all_fields()
+        first = extractor._find_field_candidates('quantity')
+        assert extractor._find_field_candidates('quantity') is first
+        assert sorted(calls) == sorted(InstallmentAgreementSchema.model_fields.keys())
+    
+    def test_resolve_does_not_reorder_cached_candidates(self):
+        """Resolving a field leaves the cached candidate order unchanged."""
+        extractor = DeterministicExtractor(make_result())
+        candidates = extractor._find_field_candidates('amount_financed')
+        before = list(candidates)
+        
+        extractor._resolve_candidates('amount_financed', candidates)
+        
+        assert candidates == before
+    
+    def test_enhanced_extractor_reuses_candidates(self, monkeypatch):
+        """OpenAI context is built without searching the document again."""
+        extractor = EnhancedExtractor(make_result())
+        extractor.deterministic_extractor.extract_all_fields()
+        
+        def fail(field_name):
+            raise AssertionError(f"{field_name} searched twice")
+        
+        monkeypatch.setattr(extractor.deterministic_extractor, "_search_field_candidates", fail)
+        
+        candidate_values = extractor._collect_candidate_values()
+        assert '2' in candidate_values['quantity']
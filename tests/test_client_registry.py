@@ -0,0 +1,101 @@
+"""Tests for the process-wide client registry."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.utils import client_registry
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Start each test with default settings and no shared clients."""
+    client_registry.reset_clients()
+    yield
+    client_registry.reset_clients()
+    client_registry.configure_clients(**client_registry.DEFAULT_SETTINGS)
+
+
+class TestResolveCredentials:
+    """Test resolve_credentials."""
+    
+    def test_file_path_is_returned_unchanged(self):
+        """A path is used as-is."""
+        assert client_registry.resolve_credentials("/secrets/creds.json") == "/secrets/creds.json"
+    
+    def test_json_is_written_once(self):
+        """The same JSON content maps to one temp file."""
+        content = json.dumps({"type": "service_account", "project_id": "test"})
+        
+        first = client_registry.resolve_credentials(content)
+        second = client_registry.resolve_credentials(content)
+        
+        assert first == second
+        with open(first) as f:
+            assert json.load(f)["project_id"] == "test"
+    
+    def test_invalid_json_raises(self):
+        """Malformed JSON content is rejected."""
+        with pytest.raises(ValueError):
+            client_registry.resolve_credentials("{not json")
+
+
+class TestConfigureClients:
+    """Test configure_clients."""
+    
+    def test_updates_settings(self):
+        """Known settings are changed."""
+        client_registry.configure_clients(openai_max_connections=7)
+        
+        assert client_registry.get_settings()['openai_max_connections'] == 7
+    
+    def test_rejects_unknown_settings(self):
+        """Typos are reported instead of silently ignored."""
+        with pytest.raises(ValueError, match="max_conections"):
+            client_registry.configure_clients(max_conections=7)
+
+
+class TestOpenAIClients:
+    """Test shared OpenAI clients."""
+    
+    def test_sync_client_is_shared(self):
+        """One client per API key."""
+        pytest.importorskip("openai")
+        
+        first = client_registry.get_openai_client("sk-test")
+        
+        assert client_registry.get_openai_client("sk-test") is first
+        assert client_registry.get_openai_client("sk-other") is not first
+    
+    def test_async_client_is_shared_per_loop(self):
+        """Async clients are reused within an event loop but not across loops."""
+        pytest.importorskip("openai")
+        
+        async def get_twice():
+            return (
+                client_registry.get_async_openai_client("sk-test"),
+                client_registry.get_async_openai_client("sk-test")
+            )
+        
+        first, second = asyncio.run(get_twice())
+        third, _ = asyncio.run(get_twice())
+        
+        assert first is second
+        assert third is not first
+
+
+class TestVisionClients:
+    """Test shared Vision clients."""
+    
+    def test_client_is_shared_per_endpoint(self):
+        """VisionOCRClients for the same endpoint share one channel."""
+        pytest.importorskip("grpc")
+        from src.ocr import VisionOCRClient
+        
+        first = VisionOCRClient(api_endpoint="localhost:50051")
+        second = VisionOCRClient(api_endpoint="localhost:50051")
+        other = VisionOCRClient(api_endpoint="localhost:50052")
+        
+        assert first.client is second.client
+        assert other.client is not first.client
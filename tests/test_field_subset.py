@@ -0,0 +1,131 @@
+"""Tests for extracting a subset of the schema fields."""
+
+import json
+
+import pytest
+
+from src.extractors import DeterministicExtractor
+from src.processors import OpenAIProcessor
+from src.schema import FieldTypes
+from tests.conftest import make_word, make_ocr_result
+
+
+def make_result():
+    """OCR result with a quantity, an amount financed and a seller address."""
+    words = [
+        make_word("Quantity:", 10, 100), make_word("2", 120, 100),
+        make_word("Amount", 10, 400), make_word("Financed:", 60, 400),
+        make_word("$1,234.56", 160, 400),
+        make_word("Seller", 10, 700), make_word("Address:", 60, 700),
+        make_word("1901", 160, 700), make_word("Farragut", 210, 700), make_word("Ave", 260, 700),
+    ]
+    return make_ocr_result("Quantity: 2\nAmount Financed: $1,234.56\nSeller Address: 1901 Farragut Ave", words)
+
+
+class TestSelectFields:
+    """Test validation of field subsets."""
+    
+    def test_schema_order(self):
+        """Fields are returned in schema order without duplicates."""
+        assert FieldTypes.select_fields(['apr', 'quantity', 'apr']) == ['quantity', 'apr']
+    
+    def test_all_fields_by_default(self):
+        """None selects every field."""
+        assert FieldTypes.select_fields(None) == FieldTypes.get_all_fields()
+    
+    def test_unknown_field(self):
+        """Unknown names are rejected."""
+        with pytest.raises(ValueError, match="aprr"):
+            FieldTypes.select_fields(['aprr'])
+    
+    def test_empty_subset(self):
+        """An empty subset is rejected."""
+        with pytest.raises(ValueError):
+            FieldTypes.select_fields([])
+
+
+class TestDeterministicSubset:
+    """Test rule-based extraction of a field subset."""
+    
+    def test_only_requested_fields_searched(self, monkeypatch):
+        """Fields outside the subset are neither searched nor set."""
+        extractor = DeterministicExtractor(make_result())
+        calls = []
+        search = extractor._search_field_candidates
+        
+        def counting_search(field_name):
+            calls.append(field_name)
+            return search(field_name)
+        
+        monkeypatch.setattr(extractor, "_search_field_candidates", counting_search)
+        
+        schema = extractor.extract_all_fields(fields=['quantity', 'amount_financed'])
+        
+        assert sorted(calls) == ['amount_financed', 'quantity']
+        assert schema.quantity == 2
+        assert schema.amount_financed is not None
+        assert schema.seller_address is None
+    
+    def test_derived_field_searches_its_source(self, monkeypatch):
+        """Seller city is parsed from the seller address, so both are searched."""
+        extractor = DeterministicExtractor(make_result())
+        calls = []
+        search = extractor._search_field_candidates
+        
+        def counting_search(field_name):
+            calls.append(field_name)
+            return search(field_name)
+        
+        monkeypatch.setattr(extractor, "_search_field_candidates", counting_search)
+        
+        schema = extractor.extract_all_fields(fields=['seller_city'])
+        
+        assert sorted(calls) == ['seller_address', 'seller_city']
+        assert schema.seller_address is None
+    
+    def test_subset_matches_full_extraction(self):
+        """Requested fields get the same values as in a full extraction."""
+        full = DeterministicExtractor(make_result()).extract_all_fields()
+        subset = DeterministicExtractor(make_result()).extract_all_fields(
+            fields=FieldTypes.TRUTH_IN_LENDING_FIELDS
+        )
+        
+        for field_name in FieldTypes.TRUTH_IN_LENDING_FIELDS:
+            assert getattr(subset, field_name) == getattr(full, field_name)
+
+
+class TestPromptSubset:
+    """Test that the OpenAI prompts ask only for the requested fields."""
+    
+    def test_vision_prompt_structure(self):
+        """The output structure lists only the requested fields."""
+        # Prompt building needs no client
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        
+        prompt = processor._build_vision_prompt(None, fields=['apr', 'amount_financed'])
+        structure = prompt[prompt.index('{'):]
+        
+        assert '"amount_financed"' in structure
+        assert '"apr"' in structure
+        assert '"seller_name"' not in structure
+        assert "SELLER INFORMATION" not in prompt
+    
+    def test_full_prompt_unchanged_without_subset(self):
+        """Without a subset every field is still requested."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        
+        prompt = processor._build_vision_prompt(None)
+        
+        for field_name in OpenAIProcessor.FIELD_FORMATS:
+            assert f'"{field_name}"' in prompt
+        assert "SELLER INFORMATION" in prompt
+    
+    def test_response_keys_outside_subset_ignored(self):
+        """Values the model returns for other fields are dropped."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        response = json.loads('{"apr": 21, "seller_name": "ACME"}')
+        
+        schema = processor._parse_openai_response(response, None, fields=['apr'])
+        
+        assert schema.apr == 21
+        assert schema.seller_name is None
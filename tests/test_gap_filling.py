@@ -0,0 +1,155 @@
+"""Tests for targeted OpenAI requests for unresolved fields only."""
+
+import asyncio
+import threading
+from decimal import Decimal
+
+from src.extractors.enhanced_extractor import EnhancedExtractor
+from src.processors import OpenAIProcessor
+from src.schema import InstallmentAgreementSchema
+from tests.conftest import make_word, make_ocr_result
+
+
+FILLER = "Buyer agrees to pay the amounts below according to the payment schedule."
+
+
+def make_result(quantity_confidence=0.95):
+    """OCR result with a quantity and an amount financed."""
+    words = [
+        make_word("Quantity:", 10, 100), make_word("2", 120, 100, confidence=quantity_confidence),
+        make_word("Amount", 10, 500), make_word("Financed:", 60, 500),
+        make_word("$1,234.56", 120, 500),
+    ]
+    return make_ocr_result("Quantity: 2\nAmount Financed: $1,234.56", words)
+
+
+class RecordingProcessor:
+    """Stands in for OpenAIProcessor and records gap-filling requests."""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def should_use_openai(self, ocr_result):
+        return False
+    
+    def fill_gaps(self, ocr_result, initial_schema, fields, candidate_values=None, extractor=None):
+        self.requests.append(fields)
+        return initial_schema.model_copy(update={'quantity': 3})
+    
+    async def fill_gaps_async(self, ocr_result, initial_schema, fields, candidate_values=None, extractor=None):
+        return self.fill_gaps(ocr_result, initial_schema, fields, candidate_values, extractor)
+
+
+class TestGapFields:
+    """Test which fields are sent to OpenAI."""
+    
+    def test_missing_fields(self):
+        """Fields without a value are gaps, extracted ones are not."""
+        extractor = EnhancedExtractor(make_result())
+        schema = extractor.deterministic_extractor.extract_all_fields(['quantity', 'amount_financed', 'apr'])
+        
+        assert extractor.gap_fields(schema, ['quantity', 'amount_financed', 'apr']) == ['apr']
+    
+    def test_low_confidence_fields(self):
+        """A value read from low-confidence OCR words is a gap."""
+        extractor = EnhancedExtractor(make_result(quantity_confidence=0.4))
+        schema = extractor.deterministic_extractor.extract_all_fields(['quantity', 'amount_financed'])
+        
+        assert extractor.gap_fields(schema, ['quantity', 'amount_financed']) == ['quantity']
+    
+    def test_inconsistent_disclosure(self):
+        """Values breaking a Truth-in-Lending identity are all sent."""
+        extractor = EnhancedExtractor(make_result())
+        fields = ['amount_financed', 'finance_charge', 'total_of_payments']
+        schema = InstallmentAgreementSchema(
+            amount_financed=Decimal("1234.56"), finance_charge=Decimal("100.00"),
+            total_of_payments=Decimal("1334.56")
+        )
+        assert extractor.gap_fields(schema, fields) == []
+        
+        schema = schema.model_copy(update={'total_of_payments': Decimal("1934.56")})
+        assert extractor.gap_fields(schema, fields) == fields
+    
+    def test_all_fields_skip_legacy(self):
+        """Without a subset, the legacy fields are not asked for."""
+        extractor = EnhancedExtractor(make_result())
+        
+        gaps = extractor.gap_fields(InstallmentAgreementSchema())
+        
+        assert 'street_address' not in gaps
+        assert 'phone_number' not in gaps
+        assert 'buyer_address' in gaps
+
+
+class TestGapFillingExtraction:
+    """Test gap filling in EnhancedExtractor."""
+    
+    def test_only_gaps_are_requested(self):
+        """OpenAI is asked for the gaps only and the answers are merged."""
+        processor = RecordingProcessor()
+        extractor = EnhancedExtractor(make_result(quantity_confidence=0.4), processor, gap_filling=True)
+        
+        schema = extractor.extract_all_fields(['quantity', 'amount_financed'])
+        
+        assert processor.requests == [['quantity']]
+        assert extractor.filled_gaps == ['quantity']
+        assert schema.quantity == 3
+        assert schema.amount_financed == Decimal("1234.56")
+    
+    def test_complete_extraction_makes_no_request(self):
+        """A document the rules extract completely needs no OpenAI call."""
+        processor = RecordingProcessor()
+        extractor = EnhancedExtractor(make_result(), processor, gap_filling=True)
+        
+        schema = extractor.extract_all_fields(['quantity', 'amount_financed'])
+        
+        assert processor.requests == []
+        assert schema.quantity == 2
+    
+    def test_async_gap_search_runs_off_the_loop(self, monkeypatch):
+        """The async path finds gaps and their candidates in worker threads."""
+        processor = RecordingProcessor()
+        extractor = EnhancedExtractor(make_result(quantity_confidence=0.4), processor, gap_filling=True)
+        threads = []
+        gap_fields = extractor.gap_fields
+        
+        def recording_gap_fields(*args):
+            threads.append(threading.get_ident())
+            return gap_fields(*args)
+        
+        monkeypatch.setattr(extractor, "gap_fields", recording_gap_fields)
+        
+        async def run():
+            schema = await extractor.extract_all_fields_async(['quantity', 'amount_financed'])
+            return schema, threading.get_ident()
+        
+        schema, loop_thread = asyncio.run(run())
+        
+        assert processor.requests == [['quantity']]
+        assert schema.quantity == 3
+        assert threads and loop_thread not in threads
+
+
+class TestGapRequest:
+    """Test the minimal prompt of a gap-filling request."""
+    
+    def test_prompt_has_only_gap_fields_and_their_lines(self):
+        """The prompt asks for the gap fields with the OCR lines near their labels."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        processor.model = "gpt-4o-mini"
+        processor.region_cropper = None
+        processor.prompt_budget = None
+        # Label lines are found in the text, no word geometry is needed
+        ocr_result = make_ocr_result("\n".join(["Quantity: 2"] + [FILLER] * 30 + ["Amount Financed: $1,234.56"]))
+        
+        messages, _ = processor._prepare_gap_request(
+            ocr_result, InstallmentAgreementSchema(quantity=2), ['amount_financed'],
+            {'amount_financed': ['$1,234.56']}, None
+        )
+        
+        prompt = messages[1]['content']
+        assert "Amount Financed: $1,234.56" in prompt
+        assert "- amount_financed: null" in prompt
+        assert '"amount_financed":' in prompt
+        assert '"quantity"' not in prompt
+        assert prompt.count(FILLER) == 1
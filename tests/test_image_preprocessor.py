@@ -0,0 +1,102 @@
+"""Tests for image preprocessing before OpenAI Vision upload."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from src.ocr import ImageSource
+from src.processors import VisionImagePreprocessor, estimate_vision_tokens
+from src.processors.openai_processor import OpenAIProcessor
+from src.utils.metrics import collect_timings
+
+
+def make_image(width, height, image_format="PNG", mode="RGB", quality=None):
+    """ImageSource of a noisy page so re-encoding has something to compress."""
+    img = Image.effect_noise((width, height), 64).convert(mode)
+    buffer = io.BytesIO()
+    options = {"quality": quality} if quality else {}
+    img.save(buffer, format=image_format, **options)
+    return ImageSource.from_bytes(buffer.getvalue(), image_format=image_format, name="page.png")
+
+
+class TestEstimateVisionTokens:
+    """Test the OpenAI Vision token estimate."""
+    
+    def test_square_image(self):
+        """1024x1024 is scaled to 768x768: four tiles."""
+        assert estimate_vision_tokens(1024, 1024) == 85 + 170 * 4
+    
+    def test_large_portrait_photo(self):
+        """Large images are scaled to fit 2048, then to a 768 short side."""
+        assert estimate_vision_tokens(2048, 4096) == 85 + 170 * 6
+    
+    def test_small_image_and_low_detail(self):
+        """One tile for small images, flat cost at low detail."""
+        assert estimate_vision_tokens(300, 200) == 85 + 170
+        assert estimate_vision_tokens(4000, 3000, detail="low") == 85
+
+
+class TestVisionImagePreprocessor:
+    """Test downscaling, re-encoding and the savings report."""
+    
+    def test_downscale_and_reencode(self):
+        """Large PNGs are resized to the long edge and sent as JPEG."""
+        source = make_image(1200, 800)
+        
+        prepared, report = VisionImagePreprocessor(max_long_edge=600).prepare(source)
+        
+        assert prepared.image_format == 'JPEG'
+        assert prepared.dimensions == (600, 400)
+        assert report.applied
+        assert report.upload_size == (600, 400)
+        assert report.bytes_saved == source.size_bytes - prepared.size_bytes > 0
+        assert report.tokens_saved == (
+            estimate_vision_tokens(1200, 800) - estimate_vision_tokens(600, 400)
+        )
+    
+    def test_grayscale(self):
+        """Grayscale output is a single-channel JPEG."""
+        prepared, _ = VisionImagePreprocessor(max_long_edge=200, grayscale=True).prepare(make_image(400, 300))
+        
+        with Image.open(io.BytesIO(prepared.data)) as img:
+            assert img.mode == 'L'
+    
+    def test_transparent_png(self):
+        """Images with an alpha channel are flattened before JPEG encoding."""
+        prepared, report = VisionImagePreprocessor(max_long_edge=200).prepare(
+            make_image(400, 300, mode="RGBA")
+        )
+        
+        assert report.applied
+        assert prepared.dimensions == (200, 150)
+    
+    def test_original_kept_when_not_smaller(self):
+        """An already compact JPEG is not re-encoded at higher quality."""
+        source = make_image(200, 150, image_format="JPEG", quality=20)
+        
+        prepared, report = VisionImagePreprocessor(jpeg_quality=95).prepare(source)
+        
+        assert prepared is source
+        assert not report.applied
+        assert report.bytes_saved == 0
+    
+    def test_invalid_settings(self):
+        """Out of range settings are rejected."""
+        with pytest.raises(ValueError):
+            VisionImagePreprocessor(max_long_edge=0)
+        with pytest.raises(ValueError):
+            VisionImagePreprocessor(jpeg_quality=100)
+    
+    def test_processor_records_savings(self):
+        """The processor uploads the preprocessed image and records the report."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        processor.image_preprocessor = VisionImagePreprocessor(max_long_edge=600)
+        source = make_image(1200, 800)
+        
+        with collect_timings() as timings:
+            prepared = processor._prepare_upload(source)
+        
+        assert prepared.dimensions == (600, 400)
+        assert "image_preprocess" in timings.stages
+        assert timings.to_dict()['image_uploads'][0]['bytes_saved'] > 0
@@ -0,0 +1,50 @@
+"""Tests for the single-pass label matcher."""
+
+import re
+
+import pytest
+
+from src.extractors import DeterministicExtractor
+from src.extractors.label_matcher import LabelMatcher
+
+
+SAMPLE_TEXTS = [
+    "Seller: ACME Furniture\nBuyer 1's Name: John Smith\nCo-Buyer: Jane Smith\n"
+    "Amount Financed $3,644.28 Finance Charge $1,002.00 Total of Payments $4,646.28\n"
+    "Number of Payments 24 Amount of Payments: $193.60 Phone Number (215) 555-0100",
+    # Overlapping and repeated labels, mixed case
+    "SELLER'S NAME: x seller: y reseller name QTY.: 2 qty: 3 APR: 21% make/model",
+    # Case folding that changes text length falls back to per-pattern scanning
+    "Straße Address: 1 Main St Seller: Müller",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_matches_per_pattern_finditer(text):
+    """Every pattern gets exactly the matches re.finditer would return."""
+    matcher = DeterministicExtractor.LABEL_MATCHER
+    table = matcher.find_all(text)
+    
+    for pattern in matcher.patterns:
+        expected = [m.span() for m in re.finditer(pattern, text, re.IGNORECASE)]
+        assert [m.span() for m in table[pattern]] == expected, pattern
+
+
+def test_patterns_are_compiled_once():
+    """Labels shared by several fields are compiled and matched once."""
+    matcher = LabelMatcher({
+        'buyer_phone_number': [r"phone\s+number", r"phone\s*:"],
+        'phone_number': [r"phone\s+number", r"phone\s*:"],
+    })
+    
+    assert list(matcher.patterns) == [r"phone\s+number", r"phone\s*:"]
+
+
+def test_pattern_without_leading_literal():
+    """Patterns that start with a character class are still found."""
+    matcher = LabelMatcher({'seller_name': [r"[sS]eller\s*:"]})
+    
+    table = matcher.find_all("Seller: ACME seller: B")
+    
+    assert [m.group() for m in table[r"[sS]eller\s*:"]] == ["Seller:", "seller:"]
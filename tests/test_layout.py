@@ -0,0 +1,137 @@
+"""Tests for layout fingerprinting and per-template extraction plans."""
+
+from src.extractors import DeterministicExtractor
+from src.extractors.layout import LayoutClassifier, LayoutTemplate
+from tests.conftest import make_box, make_word, make_ocr_result
+
+
+def make_result(buyer, amount, scale=1.0, offset=(0, 0), blocks=None):
+    """
+    OCR result of a small form, optionally scaled and shifted on the page.
+    
+    Args:
+        buyer: Buyer name words
+        amount: Amount financed word
+        scale: Scale factor applied to every coordinate
+        offset: (dx, dy) added to every coordinate
+        blocks: Block annotations replacing the form's own
+    """
+    dx, dy = offset
+    
+    def word(text, x, y, width=60):
+        return make_word(text, int(x * scale + dx), int(y * scale + dy), int(width * scale), int(20 * scale))
+    
+    lines = [
+        [("Buyer", 10), ("Name:", 80)] + [(text, 200 + 70 * i) for i, text in enumerate(buyer.split())],
+        [("Amount", 10), ("Financed:", 80), (amount, 200)],
+    ]
+    words = []
+    for row, line in enumerate(lines):
+        words.extend(word(text, x, 100 + 200 * row) for text, x in line)
+    
+    blocks = blocks if blocks is not None else [
+        {'text': "", 'bounding_box': make_box(int(10 * scale + dx), int(100 * scale + dy), int(500 * scale), int(20 * scale))},
+        {'text': "", 'bounding_box': make_box(int(10 * scale + dx), int(300 * scale + dy), int(500 * scale), int(20 * scale))},
+    ]
+    return make_ocr_result("\n".join(" ".join(text for text, _ in line) for line in lines), words, blocks)
+
+
+def make_template(skip_llm=False):
+    """Template built from a reference copy of the form."""
+    reference = DeterministicExtractor(make_result("John Smith", "$1,234.56"))
+    return LayoutTemplate.from_reference(
+        "form_a",
+        reference,
+        {'buyer_name': "John Smith", 'amount_financed': "1,234.56"},
+        skip_llm=skip_llm
+    )
+
+
+class TestLayoutTemplate:
+    """Test template building and serialization."""
+    
+    def test_from_reference_records_regions(self):
+        """Regions are recorded for the values found in the reference."""
+        template = make_template()
+        
+        assert set(template.regions) == {'buyer_name', 'amount_financed'}
+        assert template.regions['buyer_name'].max_words == 2
+        assert template.regions['amount_financed'].max_words == 1
+        assert len(template.blocks) == 2
+    
+    def test_round_trip(self, tmp_path):
+        """A saved template loads back unchanged."""
+        template = make_template(skip_llm=True)
+        path = tmp_path / "form_a.json"
+        template.save(path)
+        
+        loaded = LayoutTemplate.load(path)
+        
+        assert loaded.to_dict() == template.to_dict()
+        assert loaded.skip_llm
+        
+        classifier = LayoutClassifier.from_directory(tmp_path)
+        assert [t.name for t in classifier.templates] == ["form_a"]
+
+
+class TestLayoutClassifier:
+    """Test layout recognition and plan-based extraction."""
+    
+    def test_recognizes_scaled_and_shifted_scan(self):
+        """The same form at another scale and offset matches the template."""
+        classifier = LayoutClassifier([make_template()])
+        extractor = DeterministicExtractor(
+            make_result("Jane Doe", "$987.65", scale=1.5, offset=(40, 25)),
+            layout_classifier=classifier
+        )
+        
+        layout = extractor.layout
+        
+        assert layout is not None
+        assert layout.template.name == "form_a"
+        assert layout.score == 1.0
+    
+    def test_plan_reads_new_values(self):
+        """Values of a recognized form are read from the template's regions."""
+        classifier = LayoutClassifier([make_template()])
+        extractor = DeterministicExtractor(
+            make_result("Jane Doe", "$987.65", scale=1.5, offset=(40, 25)),
+            layout_classifier=classifier
+        )
+        
+        buyer = extractor._find_field_candidates('buyer_name')
+        amount = extractor._find_field_candidates('amount_financed')
+        
+        assert [c.value for c in buyer] == ["Jane Doe"]
+        assert buyer[0].label_match == "layout:form_a"
+        assert [c.value for c in amount] == ["$987.65"]
+    
+    def test_different_layout_falls_back(self):
+        """A document whose blocks do not match uses the proximity search."""
+        classifier = LayoutClassifier([make_template()])
+        result = make_result("Jane Doe", "$987.65", blocks=[
+            {'text': "", 'bounding_box': make_box(10, 700, 500, 20)}
+        ])
+        extractor = DeterministicExtractor(result, layout_classifier=classifier)
+        
+        assert extractor.layout is None
+        candidates = extractor._find_field_candidates('buyer_name')
+        assert all(not c.label_match.startswith("layout:") for c in candidates)
+    
+    def test_score_counts_anchors_and_blocks(self):
+        """The score is the lower of the anchor and block match fractions."""
+        template = make_template()
+        classifier = LayoutClassifier([template])
+        fingerprint = DeterministicExtractor(make_result("Jane Doe", "$987.65")).fingerprint()
+        
+        assert classifier.score(template, fingerprint) == 1.0
+        
+        fingerprint.blocks = fingerprint.blocks[:1]
+        assert classifier.score(template, fingerprint) == 0.5
+        assert classifier.classify(fingerprint) is None
+    
+    def test_no_classifier_keeps_generic_search(self):
+        """Without a classifier no layout is looked up."""
+        extractor = DeterministicExtractor(make_result("Jane Doe", "$987.65"))
+        
+        assert extractor.layout is None
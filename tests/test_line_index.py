@@ -0,0 +1,52 @@
+"""Tests for line segmentation of OCR words."""
+
+from src.extractors.line_index import LineIndex
+from src.extractors.word_table import WordTable
+from tests.conftest import make_word
+
+
+def line_texts(lines, table):
+    """Text of each line, words joined left to right."""
+    return [" ".join(table.texts[i] for i in line.words) for line in lines.lines]
+
+
+class TestLineIndex:
+    """Test LineIndex segmentation."""
+    
+    def test_groups_skewed_words_into_lines(self):
+        """Words a few pixels apart vertically share a line, ordered left to right."""
+        words = [
+            make_word("Smith", 160, 104),
+            make_word("Buyer:", 10, 100),
+            make_word("John", 90, 98),
+            make_word("500", 10, 140),
+            make_word("Ricky", 60, 143),
+            make_word("Street", 120, 139),
+        ]
+        table = WordTable(words)
+        lines = LineIndex(table)
+        
+        assert line_texts(lines, table) == ["Buyer: John Smith", "500 Ricky Street"]
+        assert lines.line_of == [0, 0, 0, 1, 1, 1]
+        assert lines.line_for_word(4).line_id == 1
+    
+    def test_line_geometry(self):
+        """Lines report their vertical extent, baseline and horizontal span."""
+        table = WordTable([make_word("Seller:", 10, 100), make_word("ACME", 80, 102)])
+        line = LineIndex(table)[0]
+        
+        assert (line.top, line.bottom) == (100, 122)
+        assert line.baseline == 121
+        assert line.span == (10, 120)
+    
+    def test_reading_order(self):
+        """Reading order sorts by line first, then by x."""
+        words = [make_word("b", 200, 50), make_word("a", 10, 52), make_word("c", 5, 90)]
+        table = WordTable(words)
+        lines = LineIndex(table)
+        
+        assert sorted(range(3), key=lines.reading_order) == [1, 0, 2]
+    
+    def test_empty_document(self):
+        """No words, no lines."""
+        assert len(LineIndex(WordTable([]))) == 0
@@ -0,0 +1,74 @@
+"""Tests for per-stage timing and OpenAI usage metrics."""
+
+import asyncio
+from types import SimpleNamespace
+
+from src.utils.metrics import (
+    ExtractionTimings, collect_timings, current_timings, timed,
+    call_openai, record_cache_lookup
+)
+
+
+def fake_completion(**kwargs):
+    """Stand-in for chat.completions.create returning usage counts."""
+    return SimpleNamespace(usage=SimpleNamespace(
+        prompt_tokens=1200,
+        completion_tokens=300,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1024)
+    ))
+
+
+class TestExtractionTimings:
+    """Test timing collection and reporting."""
+    
+    def test_stages_calls_and_cache_are_recorded(self):
+        """Timed stages, OpenAI usage and cache lookups land on the current record."""
+        with collect_timings() as timings:
+            with timed("ocr_rpc"):
+                pass
+            with timed("ocr_rpc"):
+                pass
+            call_openai("vision_extraction", fake_completion, model="gpt-4o-mini")
+            record_cache_lookup("ocr", hit=False)
+        
+        data = timings.to_dict()
+        assert set(data['stages']) == {"ocr_rpc"}
+        assert data['openai_calls'][0]['stage'] == "vision_extraction"
+        assert data['openai_calls'][0]['model'] == "gpt-4o-mini"
+        assert data['tokens'] == {'prompt_tokens': 1200, 'completion_tokens': 300, 'cached_tokens': 1024}
+        assert data['cache'] == {'ocr': {'hits': 0, 'misses': 1}}
+    
+    def test_no_record_outside_pipeline(self):
+        """Instrumented code is a no-op when no record is active."""
+        assert current_timings() is None
+        with timed("deterministic"):
+            pass
+        call_openai("validation", fake_completion, model="gpt-4o-mini")
+        assert current_timings() is None
+    
+    def test_worker_threads_inherit_record(self):
+        """Stages timed in asyncio.to_thread workers are recorded on the caller's record."""
+        def work():
+            with timed("deterministic"):
+                pass
+        
+        async def run():
+            with collect_timings() as timings:
+                await asyncio.to_thread(work)
+            return timings
+        
+        timings = asyncio.run(run())
+        assert "deterministic" in timings.stages
+    
+    def test_merge(self):
+        """Merging adds stage times, calls and cache counts."""
+        chunk = ExtractionTimings()
+        chunk.add_stage("ocr_rpc", 0.5)
+        chunk.add_cache_lookup("ocr", hit=True)
+        
+        timings = ExtractionTimings()
+        timings.add_stage("ocr_rpc", 0.25)
+        timings.merge(chunk)
+        
+        assert timings.stages["ocr_rpc"] == 0.75
+        assert timings.cache["ocr"] == {'hits': 1, 'misses': 0}
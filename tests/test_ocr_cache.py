@@ -0,0 +1,78 @@
+"""Tests for the content-addressed OCR result cache."""
+
+import json
+
+import pytest
+from src.ocr import OCRCache, OCRResult
+from tests.conftest import make_word, make_ocr_result
+
+
+def make_result(text: str) -> OCRResult:
+    """Create a small OCR result for caching."""
+    return make_ocr_result(
+        text, [make_word(text, 0, 0)], confidence_scores={"word_level": {"mean": 0.9, "min": 0.9, "max": 0.9}}
+    )
+
+
+class TestOCRCache:
+    """Test OCR cache tiers, eviction and counters."""
+    
+    def test_key_depends_on_content_and_settings(self):
+        """Different bytes or settings must not share a key."""
+        settings = {"feature": "DOCUMENT_TEXT_DETECTION", "parser_version": 1}
+        key = OCRCache.make_key(b"image", settings)
+        
+        assert key == OCRCache.make_key(b"image", dict(settings))
+        assert key != OCRCache.make_key(b"other", settings)
+        assert key != OCRCache.make_key(b"image", {**settings, "parser_version": 2})
+    
+    def test_memory_lru_eviction(self):
+        """Least recently used entries are evicted from memory first."""
+        cache = OCRCache(max_memory_entries=2)
+        cache.put("a", make_result("a"))
+        cache.put("b", make_result("b"))
+        cache.get("a")  # a is now most recently used
+        cache.put("c", make_result("c"))
+        
+        assert cache.get("b") is None
+        assert cache.get("a").full_text == "a"
+        assert cache.stats["memory_evictions"] == 1
+        assert cache.stats["misses"] == 1
+    
+    def test_disk_tier_round_trip(self, tmp_path):
+        """Results written to disk are readable by a new cache instance."""
+        OCRCache(cache_dir=str(tmp_path)).put("key", make_result("Buyer's Name"))
+        
+        cache = OCRCache(cache_dir=str(tmp_path))
+        result = cache.get("key")
+        
+        assert result.full_text == "Buyer's Name"
+        assert result.word_annotations[0]["confidence"] == 0.9
+        assert cache.stats["disk_hits"] == 1
+        
+        # Second lookup is served from memory
+        cache.get("key")
+        assert cache.stats["memory_hits"] == 1
+    
+    def test_raw_response_not_written(self, tmp_path):
+        """The raw Vision response stays out of the disk tier."""
+        result = make_result("Buyer's Name")
+        result.raw_response = {'fullTextAnnotation': {'pages': [{'blocks': []}]}}
+        OCRCache(cache_dir=str(tmp_path)).put("key", result)
+        
+        data = json.loads((tmp_path / "key.json").read_text(encoding="utf-8"))
+        
+        assert 'raw_response' not in data
+        assert OCRCache(cache_dir=str(tmp_path)).get("key").raw_response == {}
+    
+    def test_disk_size_eviction(self, tmp_path):
+        """Disk tier stays under its size limit."""
+        entry_size = len(json.dumps(make_result("x" * 50).to_dict(), ensure_ascii=False))
+        cache = OCRCache(max_memory_entries=0, cache_dir=str(tmp_path), max_disk_bytes=entry_size * 2)
+        for i in range(5):
+            cache.put(f"key{i}", make_result("x" * 50))
+        
+        assert cache.stats["disk_evictions"] >= 1
+        assert cache.stats["disk_bytes"] <= entry_size * 2
+        # The newest entry is always kept
+        assert cache.get("key4") is not None
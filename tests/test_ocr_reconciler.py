@@ -0,0 +1,95 @@
+"""Tests for reconciling speculative vision extraction against OCR text."""
+
+import asyncio
+
+from src.processors import OCRReconciler, OpenAIProcessor
+from src.schema import InstallmentAgreementSchema
+from tests.conftest import make_ocr_result, make_async_openai_client
+
+
+OCR_TEXT = """SELLER ABC HOME IMPROVEMENT
+Seller's Phone Number (800) 772-7786
+Buyer 1's Name JOHN SMITH
+Amount Financed $3,644.28
+ANNUAL PERCENTAGE RATE 21 %
+Number of Payments 60"""
+
+
+class TestOCRReconciler:
+    """Test OCRReconciler agreement checks."""
+    
+    def test_matching_values_are_supported(self):
+        """Values present in the OCR text, in any formatting, agree."""
+        schema = InstallmentAgreementSchema(
+            seller_name="ABC Home Improvement",
+            seller_phone_number="800-772-7786",
+            buyer_name="John Smith",
+            amount_financed="3644.28",
+            apr="21.00",
+            number_of_payments=60
+        )
+        
+        reconciler = OCRReconciler(make_ocr_result(OCR_TEXT))
+        
+        assert reconciler.unsupported_fields(schema) == []
+    
+    def test_misread_values_are_reported(self):
+        """Values missing from the OCR text are listed for follow-up."""
+        schema = InstallmentAgreementSchema(
+            buyer_name="John Smyth",
+            amount_financed="3664.28",
+            seller_phone_number="800-772-7736",
+            number_of_payments=60
+        )
+        
+        reconciler = OCRReconciler(make_ocr_result(OCR_TEXT))
+        
+        assert reconciler.unsupported_fields(schema) == [
+            'seller_phone_number', 'buyer_name', 'amount_financed'
+        ]
+    
+    def test_null_fields_are_ignored(self):
+        """Null values never need a follow-up."""
+        reconciler = OCRReconciler(make_ocr_result(""))
+        
+        assert reconciler.unsupported_fields(InstallmentAgreementSchema()) == []
+
+
+class TestRefineRequest:
+    """Test the prompt re-checking disagreeing fields."""
+    
+    def test_prompt_has_lines_near_disagreeing_labels(self):
+        """Only the OCR lines around the disagreeing fields' labels are sent."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        processor.model = "gpt-4o-mini"
+        processor.region_cropper = None
+        processor.prompt_budget = None
+        filler = "Buyer agrees to pay the amounts below according to the payment schedule."
+        text = "\n".join(["SELLER ABC HOME IMPROVEMENT"] + [filler] * 40 + ["Amount Financed $3,644.28"])
+        schema = InstallmentAgreementSchema(amount_financed="3664.28")
+        
+        messages, _ = processor._prepare_refine_request(make_ocr_result(text), schema, ['amount_financed'])
+        
+        prompt = messages[1]['content']
+        assert "Amount Financed $3,644.28" in prompt
+        assert "- amount_financed: 3664.28" in prompt
+        assert "SELLER ABC HOME IMPROVEMENT" not in prompt
+        assert prompt.count(filler) < 5
+    
+    def test_null_answer_keeps_vision_value(self, monkeypatch):
+        """A field the text-only answer leaves null keeps its vision value."""
+        client = make_async_openai_client('{"amount_financed": null, "apr": "21.00"}')
+        monkeypatch.setattr(OpenAIProcessor, "async_client", property(lambda self: client))
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        processor.model = "gpt-4o-mini"
+        processor.response_cache = None
+        processor.region_cropper = None
+        processor.prompt_budget = None
+        schema = InstallmentAgreementSchema(amount_financed="3664.28", apr="12.00")
+        
+        refined = asyncio.run(processor.refine_fields_async(
+            make_ocr_result(OCR_TEXT), schema, ['amount_financed', 'apr']
+        ))
+        
+        assert str(refined.amount_financed) == "3664.28"
+        assert str(refined.apr) == "21.00"
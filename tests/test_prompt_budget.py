@@ -0,0 +1,201 @@
+"""Tests for token-budgeted prompt compaction."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.schema import InstallmentAgreementSchema
+from src.extractors import DeterministicExtractor
+from src.processors import PromptBudget, OpenAIProcessor
+from src.processors.prompt_budget import compact_json
+from src.utils.metrics import collect_timings
+from tests.conftest import make_ocr_result, make_async_openai_client
+
+
+FILLER = "This agreement is governed by the laws of the state where it was signed and delivered."
+
+TEXT = "\n".join(
+    ["RETAIL INSTALLMENT CONTRACT"]
+    + [FILLER] * 20
+    + [
+        "Seller's Name: ACME Furniture",
+        "1901 Farragut Ave",
+        "Bristol, PA 19007",
+    ]
+    + [FILLER] * 20
+    + [
+        "Amount Financed",
+        "$1,234.56",
+    ]
+    + [FILLER] * 20
+)
+
+
+def make_result(text=TEXT):
+    """OCR result with text only (no geometry is needed to find label lines)."""
+    return make_ocr_result(text, confidence_scores={'mean': 0.9, 'min': 0.5})
+
+
+def spans(text, *labels):
+    """Character spans of some label strings in a text."""
+    return [(text.index(label), text.index(label) + len(label)) for label in labels]
+
+
+class TestSelectLines:
+    """Test picking OCR lines near label matches."""
+    
+    def test_label_lines_and_context(self):
+        """Label lines are kept with the lines after them; skipped lines become a gap."""
+        budget = PromptBudget()
+        
+        text = budget.select_lines(TEXT, spans(TEXT, "Seller's Name", "Amount Financed"), 1000)
+        
+        lines = text.split("\n")
+        assert "Seller's Name: ACME Furniture" in lines
+        assert "Bristol, PA 19007" in lines
+        assert "$1,234.56" in lines
+        assert "RETAIL INSTALLMENT CONTRACT" not in lines
+        assert lines[0] == lines[-1] == PromptBudget.GAP
+        assert lines.count(FILLER) == 3
+    
+    def test_whitespace_is_collapsed(self):
+        """Runs of spaces and tabs become single spaces."""
+        text = "Amount  Financed\t \t$1,234.56"
+        
+        assert PromptBudget().select_lines(text, spans(text, "Amount"), 100) == "Amount Financed $1,234.56"
+    
+    def test_budget_drops_far_lines_first(self):
+        """With a tight budget the label lines are kept and their context dropped."""
+        budget = PromptBudget()
+        label_spans = spans(TEXT, "Seller's Name", "Amount Financed")
+        
+        text = budget.select_lines(TEXT, label_spans, 20)
+        
+        assert budget.count_tokens(text) <= 20
+        assert "Seller's Name: ACME Furniture" in text
+        assert "Amount Financed" in text
+        assert FILLER not in text
+    
+    def test_no_labels_keeps_first_lines(self):
+        """Without label matches the beginning of the document is kept."""
+        text = PromptBudget().select_lines(TEXT, [], 60)
+        
+        assert text.startswith("RETAIL INSTALLMENT CONTRACT\n" + FILLER)
+        assert text.endswith(PromptBudget.GAP)
+    
+    def test_invalid_budget(self):
+        """The token limit must be positive."""
+        with pytest.raises(ValueError):
+            PromptBudget(max_prompt_tokens=0)
+
+
+class TestCompactJson:
+    """Test JSON without indentation."""
+    
+    def test_no_whitespace(self):
+        """Separators carry no spaces and non-ASCII text is kept as is."""
+        assert compact_json({'a': 1, 'b': [1, 2], 'c': "Café"}) == '{"a":1,"b":[1,2],"c":"Café"}'
+
+
+class TestLabelSpans:
+    """Test label spans of the deterministic extractor."""
+    
+    def test_spans_of_requested_fields(self):
+        """Only the labels of the requested fields are returned."""
+        extractor = DeterministicExtractor(make_result())
+        
+        all_spans = extractor.label_spans()
+        apr_spans = extractor.label_spans(['amount_financed'])
+        
+        assert apr_spans
+        assert set(apr_spans) < set(all_spans)
+        assert all(TEXT[start:end].lower().startswith("amount financed") for start, end in apr_spans)
+
+
+class TestProcessorPrompts:
+    """Test compacted prompts in OpenAIProcessor."""
+    
+    def make_processor(self, prompt_budget=None):
+        """Processor without a client (prompts only)."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        processor.model = "gpt-4o-mini"
+        processor.region_cropper = None
+        processor.prompt_budget = prompt_budget
+        return processor
+    
+    def test_full_prompt_without_budget(self):
+        """Without a budget the prompt carries the OCR text as before."""
+        processor = self.make_processor()
+        ocr_result = make_result()
+        
+        messages, _ = processor._prepare_improve_request(ocr_result, InstallmentAgreementSchema(), None)
+        
+        assert messages[1]['content'] == processor._build_prompt(ocr_result, InstallmentAgreementSchema(), None)
+        assert "=== OCR TEXT (Seller section highlighted) ===" in messages[1]['content']
+    
+    def test_compacted_prompts_are_smaller(self):
+        """With a budget both prompts shrink and the savings are recorded."""
+        budget = PromptBudget()
+        processor = self.make_processor(budget)
+        ocr_result = make_result()
+        schema = InstallmentAgreementSchema()
+        
+        with collect_timings() as timings:
+            improve, _ = processor._prepare_improve_request(ocr_result, schema, None)
+            vision = processor._build_vision_prompt(ocr_result)
+            compacted_vision = processor._compact_prompt(
+                "vision_extraction",
+                lambda ocr_text: processor._build_vision_prompt(ocr_result, None, ocr_text),
+                ocr_result, None, None
+            )
+        
+        prompt = improve[1]['content']
+        assert "Seller's Name: ACME Furniture" in prompt
+        assert prompt.count(FILLER) < 60
+        assert '"seller_name":null' in prompt
+        assert budget.count_tokens(compacted_vision) < budget.count_tokens(vision)
+        
+        reports = timings.to_dict()['prompt_compactions']
+        assert [report['stage'] for report in reports] == ['improve_extraction', 'vision_extraction']
+        assert all(report['tokens_saved'] > 0 for report in reports)
+    
+    def test_budget_is_respected(self):
+        """The compacted prompt fits max_prompt_tokens when the instructions do."""
+        budget = PromptBudget(max_prompt_tokens=1500)
+        processor = self.make_processor(budget)
+        ocr_result = make_result()
+        
+        prompt = processor._compact_prompt(
+            "vision_extraction",
+            lambda ocr_text: processor._build_vision_prompt(ocr_result, ['amount_financed'], ocr_text),
+            ocr_result, ['amount_financed'], None
+        )
+        
+        assert budget.count_tokens(prompt) <= 1500
+        assert "$1,234.56" in prompt
+        assert "ACME" not in prompt
+    
+    def test_async_prompt_is_built_off_the_loop(self, monkeypatch):
+        """Label matching and token counting run in a worker thread, not on the event loop."""
+        processor = self.make_processor(PromptBudget())
+        processor.response_cache = None
+        threads = []
+        prepare = processor._prepare_improve_request
+        
+        def recording_prepare(*args):
+            threads.append(threading.get_ident())
+            return prepare(*args)
+        
+        client = make_async_openai_client('{"quantity": 2}')
+        monkeypatch.setattr(OpenAIProcessor, "async_client", property(lambda self: client))
+        monkeypatch.setattr(processor, "_prepare_improve_request", recording_prepare)
+        
+        async def run():
+            schema = await processor.improve_extraction_async(make_result(), InstallmentAgreementSchema())
+            return schema, threading.get_ident()
+        
+        schema, loop_thread = asyncio.run(run())
+        
+        assert schema.quantity == 2
+        assert threads and loop_thread not in threads
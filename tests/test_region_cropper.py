@@ -0,0 +1,132 @@
+"""Tests for section crops in region-based vision requests."""
+
+import io
+
+from PIL import Image
+
+from src.ocr import ImageSource
+from src.extractors import DeterministicExtractor
+from src.processors import RegionCropper, OpenAIProcessor
+from tests.conftest import make_box, make_word, make_ocr_result
+
+
+# (y, [(text, x), ...]) per line of a small agreement
+LINES = [
+    (100, [("Seller's", 50), ("Name:", 130), ("ACME", 300), ("Furniture", 370)]),
+    (150, [("Seller", 50), ("Address:", 130), ("1901", 300), ("Farragut", 370), ("Ave", 460)]),
+    (500, [("Buyer's", 50), ("Name:", 130), ("John", 300), ("Smith", 370)]),
+    (800, [("Quantity:", 50), ("2", 300)]),
+    (1100, [("Amount", 50), ("Financed", 130), ("$1,234.56", 400)]),
+    (1150, [("Finance", 50), ("Charge", 130), ("$100.00", 400)]),
+]
+
+
+def make_result(lines=LINES):
+    """OCR result with one text block per line."""
+    words = []
+    blocks = []
+    for y, line in lines:
+        for text, x in line:
+            words.append(make_word(text, x, y, 70, 20))
+        blocks.append({'text': "", 'bounding_box': make_box(40, y - 5, 520, 30)})
+    return make_ocr_result("\n".join(" ".join(text for text, _ in line) for _, line in lines), words, blocks)
+
+
+def make_page(width=800, height=1300):
+    """Full page PNG (noise, so it does not compress to nothing)."""
+    img = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return ImageSource.from_bytes(buffer.getvalue(), image_format="PNG", name="page.png")
+
+
+class TestLocate:
+    """Test finding section boxes from labels and blocks."""
+    
+    def test_sections_in_page_order(self):
+        """Every section with a located label gets a region."""
+        regions = RegionCropper().locate(DeterministicExtractor(make_result()))
+        
+        assert [region.section for region in regions] == ['seller', 'buyer', 'purchase', 'truth_in_lending']
+    
+    def test_regions_cover_labels_and_values(self):
+        """A section box spans its label rows and the values next to them."""
+        regions = {r.section: r.box for r in RegionCropper(padding=0).locate(DeterministicExtractor(make_result()))}
+        
+        x0, y0, x1, y1 = regions['seller']
+        assert y0 <= 100 and y1 >= 170
+        assert x1 >= 530
+        # The buyer crop does not reach into the seller section
+        assert regions['buyer'][1] > 170
+    
+    def test_only_requested_sections(self):
+        """A field subset crops only the sections holding those fields."""
+        regions = RegionCropper().locate(DeterministicExtractor(make_result()), fields=['apr', 'amount_financed'])
+        
+        assert [region.section for region in regions] == ['truth_in_lending']
+    
+    def test_missing_section_sends_full_page(self):
+        """If a requested section has no label on the page, nothing is cropped."""
+        lines = [line for line in LINES if line[0] != 500]
+        
+        assert RegionCropper().locate(DeterministicExtractor(make_result(lines))) is None
+    
+    def test_large_crops_send_full_page(self):
+        """Crops covering most of the page are not worth it."""
+        cropper = RegionCropper(padding=0.4)
+        
+        assert cropper.locate(DeterministicExtractor(make_result())) is None
+
+
+class TestCrop:
+    """Test cutting and encoding crops."""
+    
+    def test_one_image_per_section(self):
+        """Each section is uploaded as its own, smaller JPEG."""
+        page = make_page()
+        crops = RegionCropper().prepare(page, DeterministicExtractor(make_result()))
+        
+        assert len(crops.images) == 4
+        assert all(image.image_format == 'JPEG' for image in crops.images)
+        report = crops.to_dict()
+        assert report['sections'] == ['seller', 'buyer', 'purchase', 'truth_in_lending']
+        assert report['bytes_saved'] > 0
+    
+    def test_mosaic(self):
+        """A mosaic stacks the crops into one image."""
+        page = make_page()
+        crops = RegionCropper(mosaic=True).prepare(page, DeterministicExtractor(make_result()))
+        
+        assert len(crops.images) == 1
+        width, height = crops.sizes[0]
+        assert width <= page.width
+        assert height < page.height
+        assert crops.upload_tokens < crops.to_dict()['original_tokens']
+
+
+class TestVisionRequest:
+    """Test the vision message built from crops."""
+    
+    def test_crops_are_named(self):
+        """Each crop is preceded by the name of its section."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        page = make_page()
+        crops = RegionCropper().prepare(page, DeterministicExtractor(make_result()), fields=['seller_name', 'buyer_name'])
+        
+        parts = processor._image_parts(page, crops)
+        
+        texts = [part['text'] for part in parts if part['type'] == 'text']
+        images = [part for part in parts if part['type'] == 'image_url']
+        assert "SELLER section:" in texts
+        assert "BUYER / CO-BUYER section:" in texts
+        assert len(images) == 2
+        assert images[0]['image_url']['url'] == crops.images[0].data_url
+    
+    def test_full_page_without_crops(self):
+        """Without crops the single page image is sent as before."""
+        processor = OpenAIProcessor.__new__(OpenAIProcessor)
+        page = make_page(100, 100)
+        
+        assert processor._image_parts(page, None) == [
+            {"type": "image_url", "image_url": {"url": page.data_url}}
+        ]
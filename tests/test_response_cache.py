@@ -0,0 +1,161 @@
+"""Tests for the OpenAI response cache."""
+
+import json
+import time
+from types import SimpleNamespace
+
+from src.utils.metrics import collect_timings
+from src.utils.response_cache import LLMResponseCache, call_openai_cached
+
+
+def make_request(prompt="Extract the fields", model="gpt-4o-mini", image_url=None, temperature=0.0):
+    """Keyword arguments of a chat.completions.create call."""
+    content = prompt
+    if image_url is not None:
+        content = [
+            {"type": "text", "text": prompt},
+            {"type": "image_url", "image_url": {"url": image_url}}
+        ]
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": "You are a data extraction assistant."},
+            {"role": "user", "content": content}
+        ],
+        "temperature": temperature,
+        "response_format": {"type": "json_object"}
+    }
+
+
+class FakeCreate:
+    """Stand-in for client.chat.completions.create that counts calls."""
+    
+    def __init__(self, content='{"apr": 21}'):
+        self.content = content
+        self.calls = 0
+    
+    def __call__(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class TestLLMResponseCache:
+    """Test keys, tiers, expiry and eviction."""
+    
+    def test_key_covers_model_prompt_and_image(self):
+        """Any change to the request or image changes the key."""
+        url = "data:image/png;base64,AAAA"
+        key = LLMResponseCache.make_key(make_request(image_url=url), "digest")
+        
+        assert key == LLMResponseCache.make_key(make_request(image_url=url), "digest")
+        assert key != LLMResponseCache.make_key(make_request(prompt="Extract all fields", image_url=url), "digest")
+        assert key != LLMResponseCache.make_key(make_request(model="gpt-4o", image_url=url), "digest")
+        assert key != LLMResponseCache.make_key(make_request(image_url=url), "other")
+    
+    def test_image_keyed_by_digest_not_url(self):
+        """The same image digest matches regardless of the data URL."""
+        first = make_request(image_url="data:image/png;base64,AAAA")
+        second = make_request(image_url="data:image/jpeg;base64,BBBB")
+        
+        assert LLMResponseCache.make_key(first, "digest") == LLMResponseCache.make_key(second, "digest")
+        assert LLMResponseCache.make_key(first) != LLMResponseCache.make_key(second)
+    
+    def test_only_deterministic_requests_cacheable(self):
+        """Sampled requests are never answered from the cache."""
+        assert LLMResponseCache.cacheable(make_request())
+        assert not LLMResponseCache.cacheable(make_request(temperature=0.7))
+    
+    def test_disk_tier_round_trip(self, tmp_path):
+        """Responses written to disk are readable by a new cache instance."""
+        LLMResponseCache(cache_dir=str(tmp_path)).put("key", '{"apr": 21}', "gpt-4o-mini")
+        
+        cache = LLMResponseCache(cache_dir=str(tmp_path))
+        
+        assert cache.get("key") == '{"apr": 21}'
+        assert cache.stats["hits"] == 1
+        assert cache.stats["memory_entries"] == 1
+    
+    def test_expired_entries_ignored(self, tmp_path, monkeypatch):
+        """Entries older than the TTL are misses and are removed from disk."""
+        cache = LLMResponseCache(cache_dir=str(tmp_path), ttl_seconds=60)
+        cache.put("key", '{"apr": 21}')
+        
+        now = time.time()
+        monkeypatch.setattr("src.utils.response_cache.time.time", lambda: now + 120)
+        
+        assert cache.get("key") is None
+        assert cache.stats["expired"] == 1
+        assert cache.stats["misses"] == 1
+        assert not list(tmp_path.glob("*.json"))
+    
+    def test_disk_size_eviction(self, tmp_path):
+        """Disk tier stays under its size limit."""
+        content = json.dumps({"buyer_name": "x" * 50})
+        entry_size = len(json.dumps({"content": content, "model": None, "created": 0.0}))
+        cache = LLMResponseCache(cache_dir=str(tmp_path), max_memory_entries=0, max_disk_bytes=entry_size * 3)
+        for i in range(5):
+            cache.put(f"key{i}", content)
+        
+        assert cache.stats["disk_evictions"] >= 1
+        assert cache.stats["disk_bytes"] <= entry_size * 3
+        # The newest entry is always kept
+        assert cache.get("key4") == content
+
+
+class TestCallOpenAICached:
+    """Test answering OpenAI calls from the cache."""
+    
+    def test_second_call_served_from_cache(self):
+        """An identical request does not reach OpenAI again."""
+        cache = LLMResponseCache()
+        create = FakeCreate()
+        
+        with collect_timings() as timings:
+            first = call_openai_cached(cache, "vision_extraction", create, image_digest="d", **make_request())
+            second = call_openai_cached(cache, "vision_extraction", create, image_digest="d", **make_request())
+        
+        assert create.calls == 1
+        assert second.choices[0].message.content == first.choices[0].message.content
+        assert second.usage is None
+        assert timings.cache["openai"] == {"hits": 1, "misses": 1}
+    
+    def test_changed_prompt_misses(self):
+        """A different prompt is sent to OpenAI."""
+        cache = LLMResponseCache()
+        create = FakeCreate()
+        
+        call_openai_cached(cache, "improve_extraction", create, **make_request())
+        call_openai_cached(cache, "improve_extraction", create, **make_request(prompt="Extract the apr"))
+        
+        assert create.calls == 2
+    
+    def test_invalid_json_not_stored(self):
+        """A malformed JSON answer is not pinned in the cache."""
+        cache = LLMResponseCache()
+        create = FakeCreate(content='{"apr": ')
+        
+        call_openai_cached(cache, "validation", create, **make_request())
+        call_openai_cached(cache, "validation", create, **make_request())
+        
+        assert create.calls == 2
+    
+    def test_sampled_requests_bypass_cache(self):
+        """Requests with a non-zero temperature always call OpenAI."""
+        cache = LLMResponseCache()
+        create = FakeCreate()
+        
+        call_openai_cached(cache, "improve_extraction", create, **make_request(temperature=0.7))
+        call_openai_cached(cache, "improve_extraction", create, **make_request(temperature=0.7))
+        
+        assert create.calls == 2
+        assert cache.stats["memory_entries"] == 0
+    
+    def test_no_cache(self):
+        """Without a cache every call reaches OpenAI."""
+        create = FakeCreate()
+        
+        call_openai_cached(None, "refine_fields", create, **make_request())
+        call_openai_cached(None, "refine_fields", create, **make_request())
+        
+        assert create.calls == 2
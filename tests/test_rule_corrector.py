@@ -0,0 +1,76 @@
+"""Tests for deterministic corrections ahead of AI validation."""
+
+from src.schema import InstallmentAgreementSchema
+from src.validators import RuleBasedCorrector
+from src.validators.ai_validator import ValidationIssue
+from tests.conftest import make_word, make_ocr_result
+
+
+def make_grid_result(words):
+    """Create an OCR result from (text, confidence, y) tuples on a simple grid."""
+    return make_ocr_result(
+        " ".join(text for text, _, _ in words),
+        [make_word(text, i * 50, y, confidence=confidence) for i, (text, confidence, y) in enumerate(words)]
+    )
+
+
+class TestRuleBasedCorrector:
+    """Test RuleBasedCorrector fixes."""
+    
+    def test_unifies_surname_to_higher_confidence_spelling(self):
+        """Co-buyer gets the buyer's surname when OCR read it more confidently."""
+        ocr_result = make_grid_result([
+            ("JOHN", 0.99, 0), ("HORNBERGER", 0.98, 0),
+            ("JANE", 0.99, 100), ("HORNBERSE", 0.62, 100)
+        ])
+        schema = InstallmentAgreementSchema(
+            buyer_name="JOHN HORNBERGER",
+            co_buyer_name="JANE HORNBERSE"
+        )
+        issues = [ValidationIssue("buyer_name/co_buyer_name", "last_name_mismatch", "", "high")]
+        
+        corrected, corrections = RuleBasedCorrector(ocr_result).correct(schema, issues)
+        
+        assert corrected.co_buyer_name == "JANE HORNBERGER"
+        assert corrected.buyer_name == "JOHN HORNBERGER"
+        assert any("co_buyer_name" in c for c in corrections)
+    
+    def test_copies_address_and_strips_phone(self):
+        """Phone numbers leave the address, and the co-buyer inherits it."""
+        ocr_result = make_grid_result([("500", 0.99, 0), ("RICKY", 0.99, 0), ("STREET", 0.99, 0)])
+        schema = InstallmentAgreementSchema(
+            buyer_name="JOHN SMITH",
+            co_buyer_name="JANE SMITH",
+            buyer_address="500 RICKY STREET 215-555-1234"
+        )
+        
+        corrected, corrections = RuleBasedCorrector(ocr_result).correct(schema, [])
+        
+        assert corrected.buyer_address == "500 RICKY STREET"
+        assert corrected.co_buyer_address == "500 RICKY STREET"
+        assert len(corrections) == 2
+    
+    def test_restores_street_number_from_ocr(self):
+        """A confident number just before the address on the same line is prepended."""
+        ocr_result = make_grid_result([
+            ("Address", 0.99, 0), ("1901", 0.97, 0), ("FARRAGUT", 0.99, 0), ("AVENUE", 0.99, 0)
+        ])
+        schema = InstallmentAgreementSchema(seller_address="FARRAGUT AVENUE")
+        issues = [ValidationIssue("seller_address", "missing_street_number", "", "medium")]
+        
+        corrected, _ = RuleBasedCorrector(ocr_result).correct(schema, issues)
+        
+        assert corrected.seller_address == "1901 FARRAGUT AVENUE"
+    
+    def test_confident_names_are_not_sent_to_ai(self):
+        """Possible OCR errors are dropped only when OCR read every word confidently."""
+        ocr_result = make_grid_result([("BERNARD", 0.99, 0), ("SMITH", 0.99, 0), ("CLARK", 0.55, 0)])
+        schema = InstallmentAgreementSchema(buyer_name="BERNARD SMITH", co_buyer_name="CLARK SMITH")
+        issues = [
+            ValidationIssue("buyer_name", "possible_ocr_error", "", "medium"),
+            ValidationIssue("co_buyer_name", "possible_ocr_error", "", "medium")
+        ]
+        
+        remaining = RuleBasedCorrector(ocr_result).unresolved(issues, schema)
+        
+        assert [issue.field for issue in remaining] == ["co_buyer_name"]
@@ -0,0 +1,46 @@
+"""Tests for the word-center spatial index."""
+
+import random
+
+from src.extractors.spatial_index import SpatialIndex
+
+
+def brute_force(points, x_min, x_max, y_min, y_max):
+    """Reference: scan every point."""
+    return [
+        i for i, (x, y) in enumerate(points)
+        if x_min <= x <= x_max and y_min <= y <= y_max
+    ]
+
+
+class TestSpatialIndex:
+    """Test SpatialIndex.query."""
+    
+    def test_matches_brute_force(self):
+        """Window queries return the same words as a full scan, in index order."""
+        rng = random.Random(7)
+        points = [(rng.uniform(0, 2500), rng.uniform(0, 3300)) for _ in range(2000)]
+        index = SpatialIndex(points)
+        
+        for _ in range(200):
+            x, y = rng.uniform(-100, 2600), rng.uniform(-100, 3400)
+            window = (x - 500, x + 50, y - 200, y + 100)
+            assert index.query(*window) == brute_force(points, *window)
+    
+    def test_bounds_are_inclusive(self):
+        """Points exactly on the window edge are included."""
+        index = SpatialIndex([(100.0, 100.0), (200.0, 50.0)])
+        
+        assert index.query(100, 200, 50, 100) == [0, 1]
+    
+    def test_unbounded_sides(self):
+        """Omitted bounds extend to the edge of the page."""
+        points = [(10.0, 10.0), (5000.0, 20.0), (-30.0, 15.0), (50.0, 900.0)]
+        index = SpatialIndex(points)
+        
+        assert index.query(y_min=0, y_max=100) == [0, 1, 2]
+        assert index.query(x_min=0, y_min=0, y_max=100) == [0, 1]
+    
+    def test_empty_index(self):
+        """An image without words returns nothing."""
+        assert SpatialIndex([]).query(0, 100, 0, 100) == []
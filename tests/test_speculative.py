@@ -0,0 +1,88 @@
+"""Tests for the speculative vision thread pool of ExtractionPipeline."""
+
+from concurrent.futures import Future
+
+import pytest
+
+from src.pipeline import ExtractionPipeline
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class FakeProcessor:
+    """Stands in for OpenAIProcessor's vision extraction."""
+    
+    use_vision = True
+    
+    def extract_from_image_and_ocr(self, image=None, ocr_result=None, fields=None, extractor=None):
+        raise AssertionError("the speculative call should not run")
+
+
+class RecordingExecutor:
+    """Executor that queues submitted calls without running them."""
+    
+    def __init__(self):
+        self.futures = []
+    
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.futures.append(future)
+        return future
+    
+    def shutdown(self, wait=True):
+        pass
+
+
+@pytest.fixture
+def failing_ocr_pipeline(monkeypatch):
+    """Speculative pipeline whose OCR stage always fails."""
+    pipeline = ExtractionPipeline(speculative=True)
+    pipeline.close()
+    pipeline.openai_processor = FakeProcessor()
+    
+    def fail_extract_text(image_path=None, save_raw_output=True, output_dir=None, image=None):
+        raise RuntimeError("OCR failed")
+    
+    monkeypatch.setattr(pipeline.ocr_client, "extract_text", fail_extract_text)
+    return pipeline
+
+
+class TestSpeculationExecutor:
+    """Test shutting down the speculative vision threads."""
+    
+    def test_close_shuts_down_executor(self):
+        """close() stops the thread pool and turns speculation off."""
+        pipeline = ExtractionPipeline(speculative=True)
+        executor = pipeline._speculation_executor
+        
+        pipeline.close()
+        pipeline.close()
+        
+        assert executor._shutdown
+        assert pipeline._speculation_executor is None
+        assert not pipeline.speculative
+    
+    def test_context_manager_closes(self):
+        """Leaving a with block closes the pipeline."""
+        with ExtractionPipeline(speculative=True) as pipeline:
+            executor = pipeline._speculation_executor
+            assert not executor._shutdown
+        
+        assert executor._shutdown
+    
+    def test_ocr_failure_cancels_speculative_call(self, failing_ocr_pipeline):
+        """A failing OCR call cancels the queued vision call before re-raising."""
+        executor = RecordingExecutor()
+        failing_ocr_pipeline._speculation_executor = executor
+        
+        with pytest.raises(RuntimeError):
+            failing_ocr_pipeline.extract_image(PNG_SIGNATURE + b"data")
+        
+        assert len(executor.futures) == 1
+        assert executor.futures[0].cancelled()
+    
+    def test_no_speculation_after_close(self, failing_ocr_pipeline):
+        """Documents started after close() run without a speculative call."""
+        with pytest.raises(RuntimeError, match="OCR failed"):
+            failing_ocr_pipeline.extract_image(PNG_SIGNATURE + b"data")
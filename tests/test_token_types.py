@@ -0,0 +1,46 @@
+"""Tests for OCR word value type classification."""
+
+from src.extractors.token_types import TokenType, classify_token, has_types
+
+
+class TestClassifyToken:
+    """Test classify_token bitmasks and normalized forms."""
+    
+    def test_currency(self):
+        """Amounts with dollar signs and separators are normalized."""
+        types, digits, amount = classify_token(" $3,644.28 ")
+        
+        assert has_types(types, TokenType.CURRENCY | TokenType.DIGIT)
+        assert not has_types(types, TokenType.INTEGER)
+        assert digits == "364428"
+        assert amount == "3644.28"
+    
+    def test_phone(self):
+        """Formatted phone numbers have phone bits but are not amounts."""
+        types, digits, amount = classify_token("215-555-0100")
+        
+        assert has_types(types, TokenType.PHONE | TokenType.PHONE_FORMAT | TokenType.LEADING_DIGIT)
+        assert not has_types(types, TokenType.CURRENCY)
+        assert amount is None
+    
+    def test_zip_and_integer(self):
+        """A five digit word is both a ZIP code and an integer."""
+        types, _, amount = classify_token("19007")
+        
+        assert has_types(types, TokenType.ZIP | TokenType.INTEGER | TokenType.CURRENCY)
+        assert not has_types(types, TokenType.PHONE)
+        assert amount == "19007"
+    
+    def test_words(self):
+        """Letters set ALPHA; single characters are not MULTI_CHAR."""
+        name, _, _ = classify_token("Smith")
+        initial, _, _ = classify_token("J")
+        
+        assert has_types(name, TokenType.ALPHA | TokenType.MULTI_CHAR)
+        assert not has_types(name, TokenType.DIGIT)
+        assert has_types(initial, TokenType.ALPHA)
+        assert not has_types(initial, TokenType.MULTI_CHAR)
+    
+    def test_empty(self):
+        """Whitespace has no types at all."""
+        assert classify_token("  ") == (0, "", None)
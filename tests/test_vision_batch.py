@@ -0,0 +1,155 @@
+"""Tests for multi-image Vision OCR batching against a local fake Vision server."""
+
+import asyncio
+from concurrent import futures
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+from google.cloud import vision
+
+from src.ocr import VisionOCRClient, OCRCache, ImageSource
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class FakeVisionServer:
+    """In-process gRPC server implementing ImageAnnotator.BatchAnnotateImages."""
+    
+    def __init__(self):
+        self.batch_sizes = []
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        handler = grpc.method_handlers_generic_handler(
+            "google.cloud.vision.v1.ImageAnnotator",
+            {
+                "BatchAnnotateImages": grpc.unary_unary_rpc_method_handler(
+                    self.batch_annotate_images,
+                    request_deserializer=vision.BatchAnnotateImagesRequest.deserialize,
+                    response_serializer=vision.BatchAnnotateImagesResponse.serialize
+                )
+            }
+        )
+        self.server.add_generic_rpc_handlers((handler,))
+        self.port = self.server.add_insecure_port("localhost:0")
+    
+    def batch_annotate_images(self, request, context):
+        """Echo each image's payload back as its OCR text."""
+        self.batch_sizes.append(len(request.requests))
+        responses = []
+        for image_request in request.requests:
+            text = image_request.image.content[len(PNG_SIGNATURE):].decode("utf-8")
+            if text == "error":
+                responses.append(vision.AnnotateImageResponse(error={"message": "bad image"}))
+            else:
+                responses.append(vision.AnnotateImageResponse(
+                    full_text_annotation=vision.TextAnnotation(text=text)
+                ))
+        return vision.BatchAnnotateImagesResponse(responses=responses)
+
+
+@pytest.fixture
+def fake_server():
+    """Run a fake Vision server for the duration of a test."""
+    server = FakeVisionServer()
+    server.server.start()
+    yield server
+    server.server.stop(None)
+
+
+def make_image(text):
+    """PNG-signed bytes whose payload the fake server echoes back."""
+    return PNG_SIGNATURE + text.encode("utf-8")
+
+
+class TestExtractTextBatch:
+    """Test VisionOCRClient.extract_text_batch."""
+    
+    def test_splits_responses_per_image(self, fake_server):
+        """Each input gets its own OCRResult, in input order."""
+        client = VisionOCRClient(api_endpoint=f"localhost:{fake_server.port}")
+        
+        results = client.extract_text_batch([make_image(f"doc {i}") for i in range(3)])
+        
+        assert [r.full_text for r in results] == ["doc 0", "doc 1", "doc 2"]
+        assert fake_server.batch_sizes == [3]
+    
+    def test_packs_up_to_batch_limit(self, fake_server):
+        """Images are sent in as few requests as the per-request limit allows."""
+        client = VisionOCRClient(api_endpoint=f"localhost:{fake_server.port}")
+        count = client.MAX_BATCH_SIZE * 2 + 1
+        
+        results = client.extract_text_batch([make_image(f"doc {i}") for i in range(count)])
+        
+        assert len(results) == count
+        assert fake_server.batch_sizes == [client.MAX_BATCH_SIZE, client.MAX_BATCH_SIZE, 1]
+    
+    def test_duplicates_and_cache_skip_the_api(self, fake_server):
+        """Identical images are sent once and cached images are not sent at all."""
+        client = VisionOCRClient(
+            api_endpoint=f"localhost:{fake_server.port}",
+            cache=OCRCache()
+        )
+        
+        client.extract_text_batch([make_image("same"), make_image("same")])
+        results = client.extract_text_batch([
+            ImageSource.from_bytes(make_image("same")), make_image("new")
+        ])
+        
+        assert [r.full_text for r in results] == ["same", "new"]
+        assert fake_server.batch_sizes == [1, 1]
+    
+    def test_per_image_errors(self, fake_server):
+        """With return_exceptions, one failing image does not fail the batch."""
+        client = VisionOCRClient(api_endpoint=f"localhost:{fake_server.port}")
+        images = [make_image("ok"), make_image("error")]
+        
+        results = client.extract_text_batch(images, return_exceptions=True)
+        
+        assert results[0].full_text == "ok"
+        assert "bad image" in str(results[1])
+        
+        with pytest.raises(Exception, match="bad image"):
+            client.extract_text_batch(images)
+
+
+class TestExtractTextAsync:
+    """Test VisionOCRClient.extract_text_async on the async gRPC client."""
+    
+    def test_one_image_batch(self, fake_server):
+        """One image is sent as a one-image batch and parsed off the loop."""
+        client = VisionOCRClient(api_endpoint=f"localhost:{fake_server.port}")
+        
+        result = asyncio.run(client.extract_text_async(
+            image=ImageSource.from_bytes(make_image("doc")), save_raw_output=False
+        ))
+        
+        assert result.full_text == "doc"
+        assert fake_server.batch_sizes == [1]
+    
+    def test_cache_skips_the_api(self, fake_server):
+        """A cached image is answered without a request."""
+        client = VisionOCRClient(api_endpoint=f"localhost:{fake_server.port}", cache=OCRCache())
+        
+        async def run():
+            return [
+                await client.extract_text_async(image=ImageSource.from_bytes(make_image("same")), save_raw_output=False)
+                for _ in range(2)
+            ]
+        
+        first, second = asyncio.run(run())
+        
+        assert second.full_text == first.full_text == "same"
+        assert fake_server.batch_sizes == [1]
+
+
+class TestWarmUp:
+    """Test VisionOCRClient.warm_up."""
+    
+    def test_sends_empty_batch(self, fake_server):
+        """Warm-up opens the channel with a request that contains no images."""
+        client = VisionOCRClient(api_endpoint=f"localhost:{fake_server.port}")
+        
+        client.warm_up()
+        
+        assert fake_server.batch_sizes == [0]
@@ -0,0 +1,105 @@
+"""Tests for the columnar OCR word table."""
+
+import random
+
+import pytest
+
+from src.extractors import word_table
+from src.extractors.token_types import TokenType
+from src.extractors.word_table import WordTable
+from tests.conftest import make_word
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure-python"])
+def numpy_mode(request, monkeypatch):
+    """Run a test with and without NumPy."""
+    if request.param and not word_table.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(word_table, "NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+class TestWordTable:
+    """Test WordTable columns and queries."""
+    
+    def test_rows_match_annotations(self, numpy_mode):
+        """Rows expose the same fields the extractor used to keep per word."""
+        table = WordTable([make_word("Seller:", 10, 10), make_word("ACME", 60, 10, confidence=None)])
+        
+        first, second = table[0], table[1]
+        
+        assert first['text'] == "Seller:"
+        assert first['center'] == (30.0, 20.0)
+        assert (first['char_start'], first['char_end']) == (0, 7)
+        assert (second['char_start'], second['char_end']) == (8, 12)
+        assert second['confidence'] is None
+    
+    def test_window_matches_brute_force(self, numpy_mode):
+        """Window queries return words with centers inside the bounds, in index order."""
+        rng = random.Random(3)
+        words = [make_word("w", rng.randint(0, 2000), rng.randint(0, 3000)) for _ in range(500)]
+        table = WordTable(words)
+        
+        for _ in range(50):
+            x, y = rng.randint(0, 2000), rng.randint(0, 3000)
+            bounds = (x - 50, x + 500, y - 200, y + 200)
+            expected = [
+                i for i, row in enumerate(table)
+                if bounds[0] <= row['center'][0] <= bounds[1]
+                and bounds[2] <= row['center'][1] <= bounds[3]
+            ]
+            assert table.window(*bounds) == expected
+    
+    def test_distances_and_deltas(self, numpy_mode):
+        """Distances are measured between word centers and a point."""
+        table = WordTable([make_word("a", 0, 0, width=6, height=8), make_word("b", 100, 100)])
+        
+        assert table.distances([0], 0, 0) == [5.0]
+        assert table.deltas([0, 1], 3, 4) == ([0.0, 117.0], [0.0, 106.0])
+    
+    def test_character_offsets(self, numpy_mode):
+        """Offsets map to the word covering them, including the following space."""
+        table = WordTable([make_word("Seller:", 0, 0), make_word("ACME", 50, 0), make_word("Inc", 100, 0)])
+        
+        assert table.word_at_char(0) == 0
+        assert table.word_at_char(7) == 0
+        assert table.word_at_char(8) == 1
+        assert table.in_char_range(8, 13) == [1, 2]
+        assert table.in_char_range(9, 12) == []
+    
+    def test_offsets_aligned_with_full_text(self, numpy_mode):
+        """With full_text, offsets follow its line breaks and spacing."""
+        words = [make_word(t, 0, 0) for t in ["Seller:", "ACME", "Furni", "ture", "Buyer:"]]
+        full_text = "Seller:\nACME  Furni-\nture\n\nBuyer:"
+        table = WordTable(words, full_text)
+        
+        for index, text in enumerate(["Seller:", "ACME", "Furni", "ture", "Buyer:"]):
+            start = table.char_start[index]
+            assert full_text[start:table.char_end[index]] == text
+        assert table.word_at_char(full_text.index("Buyer:")) == 4
+        assert table.in_char_range(8, 21) == [1, 2, 3]
+    
+    def test_unaligned_word_keeps_offsets_sorted(self, numpy_mode):
+        """A word missing from full_text gets an empty span; later words still align."""
+        words = [make_word(t, 0, 0) for t in ["Seller:", "ACNE", "Furniture"]]
+        full_text = "Seller: ACME Furniture"
+        table = WordTable(words, full_text)
+        
+        assert list(table.char_start) == [0, 7, 13]
+        assert table.char_start[1] == table.char_end[1]
+        assert table.word_at_char(full_text.index("Furniture")) == 2
+    
+    def test_of_type_filters_by_token_types(self, numpy_mode):
+        """Words are kept only if they have every required type bit."""
+        words = [
+            make_word("Phone:", 10, 10), make_word("215-555-0100", 80, 10),
+            make_word("$1,250.00", 10, 50), make_word("12", 80, 50)
+        ]
+        table = WordTable(words)
+        
+        assert table.of_type([0, 1, 2, 3], TokenType.PHONE) == [1]
+        assert table.of_type([0, 1, 2, 3], TokenType.CURRENCY) == [2, 3]
+        assert table.of_type([3, 2], TokenType.CURRENCY | TokenType.INTEGER) == [3]
+        assert table.of_type([], TokenType.DIGIT) == []
+        assert table.amounts[2] == "1250.00"
+        assert table.digits[1] == "2155550100"